@@ -0,0 +1,9 @@
+# backend - Token Scanner Backend (run as `python -m backend`)
+import os
+import sys
+
+# The scripts import each other by flat module name; keep that working when
+# they're loaded through the package. Nothing heavy is imported here.
+_BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+if _BACKEND_DIR not in sys.path:
+    sys.path.insert(0, _BACKEND_DIR)
@@ -0,0 +1,269 @@
+# __main__.py - Backend CLI (python -m backend <command>)
+"""Single entry point for the backend scripts.
+
+Only the standard library loads at startup. Each command imports its
+modules (web3, NumPy, the scanner) when it runs, so a cron job scanning a
+few blocks doesn't pay for the other commands. `bench` measures this and
+fails if the CLI itself starts importing heavy dependencies or a
+command can't be imported."""
+import argparse
+import json
+import os
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Third-party packages that must not load before a command runs
+HEAVY_MODULES = ("web3", "eth_abi", "hexbytes", "numpy", "pandas", "matplotlib", "requests", "httpx")
+# Import cost of the CLI itself, everything before arguments are parsed
+IMPORT_BUDGET_MS = 150.0
+
+# What each command imports when it runs, measured by `bench`
+COMMAND_MODULES = {
+    "scan": ["multichain_scanner", "scan_cursor"],
+    "check-token": ["token_checker"],
+    "check-lp": ["lp_checker"],
+    "price-history": ["multichain_scanner", "get_price_history", "candles"]
+}
+# Commands that work without the NumPy/pandas stack and must stay that way
+LIGHT_COMMANDS = {"check-token": ("numpy", "pandas", "matplotlib"), "check-lp": ("numpy", "pandas", "matplotlib")}
+
+
+def _write_json(path, data):
+    """Write results to `path` ("-" for stdout); nothing if no path was given"""
+    if not path:
+        return
+    if path == "-":
+        json.dump(data, sys.stdout, indent=2)
+        print()
+        return
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
+    print(f"💾 Saved: {path}")
+
+
+def cmd_scan(args) -> int:
+    from multichain_scanner import MultiChainTokenScanner
+    from scan_cursor import ScanCursorStore
+
+    scanner = MultiChainTokenScanner()
+    scanner.use_dexscreener = not args.no_dexscreener
+    if args.logs:
+        scanner.discovery_mode = "logs"
+    chains = scanner.get_op_stack_chains() if args.op_stack else (args.chain or ["base"])
+
+    cursor_store = None
+    if args.minutes:
+        results = {}
+        for chain_name in chains:
+            chain_scanner = scanner.for_chain(chain_name)
+            results[chain_name] = chain_scanner.scan_recent_minutes(args.minutes) if chain_scanner else []
+    else:
+        cursor_store = ScanCursorStore() if args.resume else None
+        results = scanner.scan_multiple_chains(chains, block_count=args.blocks, cursor_store=cursor_store)
+
+    scanner.save_results(results, args.output, cursor_store=cursor_store)
+    scanner.generate_superchain_summary(results)
+    return 0
+
+
+def cmd_check_token(args) -> int:
+    from token_checker import TokenChecker
+
+    checked = TokenChecker().check_many(args.addresses)
+    results = [{"contract_address": address, "metadata": checked[address]} for address in args.addresses]
+    tokens = [r for r in results if r["metadata"].get("is_token")]
+    print(f"\n📊 Summary: {len(tokens)}/{len(results)} contracts are tokens")
+    _write_json(args.output, results)
+    return 0
+
+
+def cmd_check_lp(args) -> int:
+    from lp_checker import LPChecker
+
+    # ADDRESS or ADDRESS:SYMBOL
+    tokens = []
+    for value in args.tokens:
+        address, _, symbol = value.partition(":")
+        tokens.append({"address": address, "symbol": symbol or "TOKEN"})
+    results = LPChecker().check_many_liquidity(tokens)
+    with_lp = [r for r in results if r["has_liquidity"]]
+    print(f"\n📊 Summary: {len(with_lp)}/{len(results)} tokens have liquidity")
+    _write_json(args.output, results)
+    return 0
+
+
+def cmd_price_history(args) -> int:
+    from multichain_scanner import MultiChainTokenScanner
+    from get_price_history import PriceHistoryEngine
+    from candles import CandleStore
+
+    scanner = MultiChainTokenScanner()
+    if not scanner.set_chain(args.chain):
+        return 1
+    engine = PriceHistoryEngine(scanner.rpc, scanner.multicall, scanner.log_fetcher, scanner.block_times)
+    to_timestamp = int(time.time())
+    from_timestamp = to_timestamp - int(args.hours * 3600)
+
+    if args.candles:
+        store = CandleStore()
+        store.load()
+        key = CandleStore.key(args.pair, args.chain)
+        store.add_price_history(key, engine, args.pair, from_timestamp, to_timestamp, quote=args.quote)
+        store.save()
+        print(f"🕯️ {len(store.series(key, args.interval))} {args.interval} candles for {key} in {store.path}")
+        return 0
+
+    series = engine.price_series(args.pair, from_timestamp, to_timestamp, quote=args.quote)
+    rows = [{
+        "timestamp": timestamp,
+        "block": block,
+        "price": price,
+        "amount0": amount0,
+        "amount1": amount1
+    } for timestamp, block, price, amount0, amount1 in zip(
+        series["timestamp"].tolist(), series["block"].tolist(), series["price"].tolist(),
+        series["amount0"].tolist(), series["amount1"].tolist()
+    )]
+    if rows:
+        print(f"📈 {len(rows)} swaps, price {rows[0]['price']:.6g} -> {rows[-1]['price']:.6g}")
+    else:
+        print(f"📈 No swaps for {args.pair} in the last {args.hours:g}h")
+    _write_json(args.output, rows)
+    return 0
+
+
+def _import_profile(statement: str) -> dict:
+    """Modules `statement` imports in a fresh interpreter and their total cost (-X importtime),
+    not counting what the interpreter loads at startup"""
+    import subprocess
+
+    def run(code):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            cwd=os.path.dirname(BACKEND_DIR), capture_output=True, text=True
+        )
+        costs, errors = {}, []
+        for line in proc.stderr.splitlines():
+            if not line.startswith("import time:"):
+                errors.append(line)
+                continue
+            fields = line[len("import time:"):].split("|")
+            try:
+                costs[fields[2].strip()] = int(fields[0])  # self time in µs
+            except (IndexError, ValueError):
+                continue  # Column header
+        return proc.returncode, costs, errors
+
+    _, baseline, _ = run("pass")
+    returncode, costs, errors = run(statement)
+    loaded = {name: us for name, us in costs.items() if name not in baseline}
+    return {
+        "ok": returncode == 0,
+        "error": errors[-1] if errors else "",
+        "ms": sum(loaded.values()) / 1000.0,
+        "packages": {name.split(".")[0] for name in loaded}
+    }
+
+
+def cmd_bench(args) -> int:
+    commands = args.commands or list(COMMAND_MODULES)
+    unknown = [command for command in commands if command not in COMMAND_MODULES]
+    if unknown:
+        print(f"❌ Unknown command: {', '.join(unknown)}")
+        return 2
+
+    print(f"⏱️ Import cost in a fresh interpreter (startup excluded, best of {args.repeat}):")
+    failed = False
+
+    # The CLI itself: within budget and free of heavy imports
+    profiles = [_import_profile("import backend.__main__") for _ in range(args.repeat)]
+    cli = min(profiles, key=lambda p: p["ms"])
+    eager = sorted(set(HEAVY_MODULES) & cli["packages"])
+    if not cli["ok"]:
+        print(f"   ❌ cli: {cli['error']}")
+        failed = True
+    else:
+        within = cli["ms"] <= args.budget_ms
+        print(f"   {'✅' if within else '❌'} {'cli':<14} {cli['ms']:8.1f} ms (budget {args.budget_ms:g} ms)")
+        failed |= not within
+    if eager:
+        print(f"   ❌ cli imports heavy modules at startup: {', '.join(eager)}")
+        failed = True
+
+    # Each command's own imports, for reference; light commands must stay off NumPy/pandas
+    for command in commands:
+        statement = "import backend; import " + ", ".join(COMMAND_MODULES[command])
+        profile = min((_import_profile(statement) for _ in range(args.repeat)), key=lambda p: p["ms"])
+        if not profile["ok"]:
+            print(f"   ❌ {command:<14} import failed: {profile['error']}")
+            failed = True
+            continue
+        print(f"   ℹ️ {command:<14} {profile['ms']:8.1f} ms")
+        unexpected = sorted(set(LIGHT_COMMANDS.get(command, ())) & profile["packages"])
+        if unexpected:
+            print(f"   ❌ {command} pulls in {', '.join(unexpected)}")
+            failed = True
+
+    print("❌ Import check failed" if failed else "✅ Startup within budget")
+    return 1 if failed else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m backend", description="Token scanner backend")
+    commands = parser.add_subparsers(dest="command", metavar="command")
+    commands.required = True
+
+    scan = commands.add_parser("scan", help="Scan chains for new token deployments")
+    scan.add_argument("--chain", action="append", help="Chain to scan, repeatable (default: base)")
+    scan.add_argument("--op-stack", action="store_true", help="Scan every OP Stack chain")
+    scan.add_argument("--blocks", type=int, default=20, help="Recent blocks per chain (default: 20)")
+    scan.add_argument("--minutes", type=int, help="Scan the last N minutes instead of N blocks")
+    scan.add_argument("--resume", action="store_true", help="Continue from each chain's checkpoint")
+    scan.add_argument("--logs", action="store_true", help="Discover tokens from mint logs")
+    scan.add_argument("--no-dexscreener", action="store_true", help="On-chain prices only")
+    scan.add_argument("--output", default="superchain_tokens_scan.json", help="File name under public/")
+    scan.set_defaults(handler=cmd_scan)
+
+    check_token = commands.add_parser("check-token", help="Check whether contracts are ERC-20 tokens (Base)")
+    check_token.add_argument("addresses", nargs="+")
+    check_token.add_argument("-o", "--output", help="Write results as JSON (- for stdout)")
+    check_token.set_defaults(handler=cmd_check_token)
+
+    check_lp = commands.add_parser("check-lp", help="Find Uniswap V2/V3 pools of tokens (Base)")
+    check_lp.add_argument("tokens", nargs="+", metavar="ADDRESS[:SYMBOL]")
+    check_lp.add_argument("-o", "--output", help="Write results as JSON (- for stdout)")
+    check_lp.set_defaults(handler=cmd_check_lp)
+
+    history = commands.add_parser("price-history", help="Swap price series of a pair/pool")
+    history.add_argument("pair", help="Uniswap V2 pair or V3 pool address")
+    history.add_argument("--chain", default="base")
+    history.add_argument("--hours", type=float, default=24.0)
+    history.add_argument("--quote", choices=["token0", "token1"], default="token1", help="Price unit (default: token1)")
+    history.add_argument("--candles", action="store_true", help="Fold into public/candles.json instead")
+    history.add_argument("--interval", default="5m", help="Candle interval to report with --candles")
+    history.add_argument("-o", "--output", help="Write swaps as JSON (- for stdout)")
+    history.set_defaults(handler=cmd_price_history)
+
+    bench = commands.add_parser("bench", help="Check CLI startup against the import-time budget")
+    bench.add_argument("commands", nargs="*", metavar="command",
+                       help=f"Commands to measure: {', '.join(COMMAND_MODULES)} (default: all)")
+    bench.add_argument("--budget-ms", type=float, default=IMPORT_BUDGET_MS)
+    bench.add_argument("--repeat", type=int, default=3)
+    bench.set_defaults(handler=cmd_bench)
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    try:
+        return args.handler(args)
+    except KeyboardInterrupt:
+        print("\n⏹️ Interrupted")
+        return 130
+
+
+if __name__ == "__main__":
+    sys.exit(main())
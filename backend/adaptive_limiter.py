@@ -0,0 +1,124 @@
+# adaptive_limiter.py - AIMD Concurrency Limits and Jittered Retries per Endpoint
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+from urllib.parse import urlsplit
+import requests
+from http_pool import httpx
+
+# JSON-RPC error codes providers use for "slow down"
+RATE_LIMIT_CODES = {-32005, -32029, -32090, 429}
+RATE_LIMIT_HINTS = ("rate limit", "too many requests", "request limit reached", "over capacity", "throttl")
+
+TIMEOUT_ERRORS = (requests.Timeout,) + ((httpx.TimeoutException,) if httpx else ())
+CONNECTION_ERRORS = (requests.ConnectionError,) + ((httpx.TransportError,) if httpx else ())
+
+
+def _status_code(error: Exception) -> Optional[int]:
+    response = getattr(error, "response", None)
+    return getattr(response, "status_code", None)
+
+
+def is_rate_limited(error: Exception) -> bool:
+    """True if the error means the endpoint wants us to slow down (429, timeout, rate-limit RPC error)"""
+    if isinstance(error, TIMEOUT_ERRORS):
+        return True
+    if _status_code(error) == 429:
+        return True
+    if getattr(error, "code", None) in RATE_LIMIT_CODES:
+        return True
+    message = str(getattr(error, "message", None) or error).lower()
+    return any(hint in message for hint in RATE_LIMIT_HINTS)
+
+
+def is_retryable(error: Exception) -> bool:
+    """Rate limits plus transient transport failures (dropped connections, 5xx)"""
+    if is_rate_limited(error) or isinstance(error, CONNECTION_ERRORS):
+        return True
+    status = _status_code(error)
+    return status is not None and status >= 500
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limit for one endpoint.
+
+    Every successful call raises the limit by `increase / limit` (about +1
+    per window of successes); a throttled call halves it, at most once per
+    window so a burst of 429s from the same window counts once."""
+
+    def __init__(self, initial: float = 4, min_limit: float = 1, max_limit: float = 64,
+                 increase: float = 1.0, decrease: float = 0.5):
+        self.min_limit = min_limit
+        self.max_limit = max(max_limit, min_limit)
+        self.limit = min(max(initial, min_limit), self.max_limit)
+        self.increase = increase
+        self.decrease = decrease
+        self.in_flight = 0
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                self._cond.wait()
+            self.in_flight += 1
+
+    def release(self, throttled: bool = False):
+        with self._cond:
+            self.in_flight -= 1
+            if throttled:
+                self.on_throttle()
+            else:
+                self.limit = min(self.max_limit, self.limit + self.increase / self.limit)
+            self._cond.notify_all()
+
+    def on_throttle(self):
+        with self._cond:
+            now = time.monotonic()
+            # Calls already in flight when we backed off don't back off again
+            if now - self._last_decrease > 1.0:
+                self.limit = max(self.min_limit, self.limit * self.decrease)
+                self._last_decrease = now
+
+    @contextmanager
+    def slot(self):
+        """Run one call inside the limit; a rate-limit exception shrinks it"""
+        self.acquire()
+        try:
+            yield
+        except Exception as e:
+            self.release(throttled=is_rate_limited(e))
+            raise
+        self.release()
+
+
+_lock = threading.Lock()
+_limiters: Dict[str, AdaptiveLimiter] = {}
+
+
+def get_limiter(url: str, max_limit: float = 64) -> AdaptiveLimiter:
+    """Process-wide limiter for the host of `url`, shared by every client of that endpoint"""
+    host = urlsplit(url).netloc or url
+    with _lock:
+        limiter = _limiters.get(host)
+        if limiter is None:
+            limiter = _limiters[host] = AdaptiveLimiter(initial=min(4, max_limit), max_limit=max_limit)
+        return limiter
+
+
+def retry_with_backoff(fn: Callable, *args, limiter: Optional[AdaptiveLimiter] = None, max_retries: int = 4,
+                       base_delay: float = 0.5, max_delay: float = 20.0,
+                       retry_if: Callable[[Exception], bool] = is_retryable, **kwargs):
+    """Call fn(*args, **kwargs), retrying retryable errors with full-jitter exponential backoff"""
+    for attempt in range(max_retries):
+        try:
+            if limiter is None:
+                return fn(*args, **kwargs)
+            with limiter.slot():
+                return fn(*args, **kwargs)
+        except Exception as e:
+            if attempt == max_retries - 1 or not retry_if(e):
+                raise
+            time.sleep(random.uniform(0, min(max_delay, base_delay * 2 ** attempt)))
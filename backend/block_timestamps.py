@@ -0,0 +1,260 @@
+# block_timestamps.py - Block <-> Timestamp Oracle and Cached Block Timestamps
+import bisect
+import json
+import math
+import os
+import threading
+from typing import Dict, Optional, Sequence, Tuple
+from rpc_batch import BatchRPCClient
+
+
+class BlockTimeOracle:
+    """block -> timestamp and timestamp -> block for one chain, mostly without RPC.
+
+    Fixed-cadence chains (OP Stack: one block every `block_time` seconds)
+    are linear from one anchor, so both directions are exact arithmetic.
+    The anchor is checked against the head once per process and the chain
+    falls back to anchors if the cadence doesn't hold. Other chains keep a
+    sparse table of (block, timestamp) anchors and interpolate between
+    them, which is an estimate good enough to bracket exact lookups."""
+
+    def __init__(self, rpc: BatchRPCClient, chain_id: int, block_time: float, fixed_cadence: bool = False,
+                 linear_from_block: int = 0, path: Optional[str] = None, min_spacing: int = 1000):
+        self.rpc = rpc
+        self.chain_id = chain_id
+        self.block_time = block_time
+        self.fixed_cadence = fixed_cadence
+        self.linear_from_block = linear_from_block  # First block of the fixed cadence (e.g. Bedrock on Optimism)
+        self.path = path or os.path.join("cache", f"block_anchors_{chain_id}.json")
+        self.min_spacing = min_spacing  # Blocks between anchors kept in the table
+        self.blocks = []  # Sorted anchor block numbers
+        self.times = []  # Timestamps of self.blocks
+        self._verified = False
+        self._lock = threading.Lock()
+        self.load()
+
+    def add_anchors(self, timestamps: Dict[int, int]) -> bool:
+        """Remember known (block, timestamp) pairs, keeping the table sparse"""
+        added = False
+        with self._lock:
+            for number, timestamp in sorted(timestamps.items()):
+                i = bisect.bisect_left(self.blocks, number)
+                near = [self.blocks[j] for j in (i - 1, i) if 0 <= j < len(self.blocks)]
+                if any(abs(number - b) < self.min_spacing for b in near):
+                    continue
+                self.blocks.insert(i, number)
+                self.times.insert(i, timestamp)
+                added = True
+        return added
+
+    def _linear_anchor(self) -> Optional[Tuple[int, int]]:
+        """An anchor on the fixed-cadence segment, checked against the head once"""
+        if not self.fixed_cadence:
+            return None
+        if not self._verified:
+            self._verified = True
+            try:
+                header = self.rpc.call("eth_getBlockByNumber", ["latest", False])
+                head = (int(header["number"], 16), int(header["timestamp"], 16))
+            except Exception as e:
+                print(f"⚠️ Block time anchor error: {e}")
+                head = None
+            if head is not None:
+                anchor = self._anchor_on_segment()
+                if anchor is not None and self._linear_time(anchor, head[0]) != head[1]:
+                    print(f"⚠️ Chain {self.chain_id} no longer has a fixed {self.block_time}s cadence, interpolating")
+                    self.fixed_cadence = False
+                if self.add_anchors({head[0]: head[1]}):
+                    self.save()
+        return self._anchor_on_segment() if self.fixed_cadence else None
+
+    def _anchor_on_segment(self) -> Optional[Tuple[int, int]]:
+        with self._lock:
+            i = bisect.bisect_left(self.blocks, self.linear_from_block)
+            return (self.blocks[i], self.times[i]) if i < len(self.blocks) else None
+
+    def _linear_time(self, anchor: Tuple[int, int], block_number: int) -> int:
+        return anchor[1] + round((block_number - anchor[0]) * self.block_time)
+
+    def is_exact(self, block_number: int) -> bool:
+        """True if timestamp(block_number) is computed, not estimated"""
+        return block_number >= self.linear_from_block and self._linear_anchor() is not None
+
+    def timestamp(self, block_number: int) -> int:
+        """Timestamp of a block (exact on fixed-cadence chains, else interpolated)"""
+        anchor = self._linear_anchor() if block_number >= self.linear_from_block else None
+        if anchor is not None:
+            return self._linear_time(anchor, block_number)
+        with self._lock:
+            blocks, times = self.blocks, self.times
+            if not blocks:
+                raise LookupError(f"no block time anchors for chain {self.chain_id}")
+            i = bisect.bisect_left(blocks, block_number)
+            if i < len(blocks) and blocks[i] == block_number:
+                return times[i]
+            if 0 < i < len(blocks):
+                b0, t0, b1, t1 = blocks[i - 1], times[i - 1], blocks[i], times[i]
+                return t0 + round((block_number - b0) * (t1 - t0) / (b1 - b0))
+            # Outside the table: extrapolate from the nearest anchor at the nominal block time
+            j = 0 if i == 0 else len(blocks) - 1
+            return times[j] + round((block_number - blocks[j]) * self.block_time)
+
+    def block(self, timestamp: int) -> int:
+        """First block with a timestamp >= `timestamp` (exact on fixed-cadence chains, else estimated)"""
+        anchor = self._linear_anchor()
+        if anchor is not None:
+            number = anchor[0] + math.ceil((timestamp - anchor[1]) / self.block_time)
+            if number >= self.linear_from_block:
+                return number
+        with self._lock:
+            blocks, times = self.blocks, self.times
+            if not blocks:
+                raise LookupError(f"no block time anchors for chain {self.chain_id}")
+            i = bisect.bisect_left(times, timestamp)
+            if i < len(times) and times[i] == timestamp:
+                return blocks[i]
+            if 0 < i < len(times):
+                b0, t0, b1, t1 = blocks[i - 1], times[i - 1], blocks[i], times[i]
+                return b0 + math.ceil((timestamp - t0) * (b1 - b0) / (t1 - t0))
+            j = 0 if i == 0 else len(times) - 1
+            return blocks[j] + math.ceil((timestamp - times[j]) / self.block_time)
+
+    def sample(self, from_block: int, to_block: int, count: int = 32):
+        """Add `count` evenly spaced anchors over a range (one batched header request)"""
+        step = max(self.min_spacing, (to_block - from_block) // max(1, count))
+        numbers = list(range(from_block, to_block + 1, step))
+        headers = self.rpc.fetch_blocks(numbers, full_transactions=False)
+        if self.add_anchors({
+            number: header.timestamp
+            for number, header in zip(numbers, headers)
+            if not isinstance(header, Exception)
+        }):
+            self.save()
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with self._lock:
+            data = {"chain_id": self.chain_id, "anchors": list(zip(self.blocks, self.times))}
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
+
+    def load(self) -> bool:
+        """Load saved anchors; returns False if there are none for this chain"""
+        if not os.path.exists(self.path):
+            return False
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Could not load block anchors {self.path}: {e}")
+            return False
+        if data.get("chain_id") != self.chain_id:
+            return False
+        self.add_anchors({int(number): int(timestamp) for number, timestamp in data.get("anchors", [])})
+        return True
+
+
+class BlockTimestampCache:
+    """block number -> timestamp, fetched as batched headers and cached.
+
+    Timestamps never change once a block is final, so every block is asked
+    for at most once per process however many logs point at it. With an
+    oracle, fixed-cadence blocks are computed instead of fetched, and
+    fetched headers feed the oracle's anchor table."""
+
+    def __init__(self, rpc: BatchRPCClient, max_size: int = 500000, oracle: Optional[BlockTimeOracle] = None):
+        self.rpc = rpc
+        self.max_size = max_size
+        self.oracle = oracle
+        self._timestamps: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def _store(self, timestamps: Dict[int, int]):
+        with self._lock:
+            if len(self._timestamps) + len(timestamps) > self.max_size:
+                self._timestamps.clear()  # Rare; cheaper than LRU bookkeeping per lookup
+            self._timestamps.update(timestamps)
+
+    def get_many(self, block_numbers: Sequence[int]) -> Dict[int, int]:
+        """Timestamps of the blocks, fetching only the ones not cached (headers only)"""
+        with self._lock:
+            found = {n: self._timestamps[n] for n in block_numbers if n in self._timestamps}
+        missing = sorted({n for n in block_numbers if n not in found})
+        if missing and self.oracle is not None:
+            computed = {n: self.oracle.timestamp(n) for n in missing if self.oracle.is_exact(n)}
+            found.update(computed)
+            missing = [n for n in missing if n not in computed]
+        if missing:
+            fetched = {
+                number: header.timestamp
+                for number, header in zip(missing, self.rpc.fetch_blocks(missing, full_transactions=False))
+                if not isinstance(header, Exception)
+            }
+            self._store(fetched)
+            found.update(fetched)
+            if self.oracle is not None and self.oracle.add_anchors(fetched):
+                self.oracle.save()
+        return found
+
+    def get(self, block_number: int) -> Optional[int]:
+        return self.get_many([block_number]).get(block_number)
+
+    def latest(self) -> Tuple[int, int]:
+        """(number, timestamp) of the chain head"""
+        header = self.rpc.call("eth_getBlockByNumber", ["latest", False])
+        number, timestamp = int(header["number"], 16), int(header["timestamp"], 16)
+        self._store({number: timestamp})
+        return number, timestamp
+
+    def _estimate(self, timestamp: int) -> Optional[int]:
+        if self.oracle is None:
+            return None
+        try:
+            return self.oracle.block(timestamp)
+        except LookupError:
+            return None  # No anchors yet
+
+    def block_at(self, timestamp: int, low: int = 0, high: Optional[int] = None) -> int:
+        """First block with a timestamp >= `timestamp` in [low, high] (high if none is).
+
+        Interpolation search with one batched header request per step: the
+        interpolated guess, a few blocks around it and the midpoint. Block
+        times are close to regular, so the answer is usually among the probes
+        within a step or two; the midpoint still halves the bracket when not."""
+        if high is None:
+            high, high_time = self.latest()
+        else:
+            high_time = self.get(high)
+        low_time = self.get(low)
+        if low_time is None or high_time is None:
+            raise LookupError(f"no header for block {low if low_time is None else high}")
+        if timestamp <= low_time:
+            return low
+        if timestamp > high_time:
+            return high
+        if self.oracle is not None and self.oracle.is_exact(low):
+            return min(max(self.oracle.block(timestamp), low), high)
+
+        # The oracle's estimate makes a better first guess than the bracket's average block time
+        guess = self._estimate(timestamp)
+        # Invariant: time(low) < timestamp <= time(high)
+        while high - low > 1:
+            if guess is None:
+                guess = low + (timestamp - low_time) * (high - low) // max(1, high_time - low_time)
+            probes = {(low + high) // 2} | {guess + offset for offset in (-128, -32, -8, -2, 0, 2, 8, 32, 128)}
+            guess = None
+            probes = sorted(p for p in probes if low < p < high)
+            times = self.get_many(probes)
+            if not times:
+                raise LookupError(f"no headers between blocks {low} and {high}")
+            for number in probes:
+                if number not in times:
+                    continue
+                if times[number] < timestamp:
+                    low, low_time = number, times[number]
+                else:
+                    high, high_time = number, times[number]
+                    break
+        return high
@@ -0,0 +1,187 @@
+# bytecode_filter.py - Runtime Bytecode Pre-Filter for Token Candidates
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Sequence
+from hexbytes import HexBytes
+from web3 import Web3
+from multicall import function_selector
+from rpc_batch import BatchRPCClient
+from safety_analysis import DELEGATECALL, opcodes_present, strip_metadata
+
+# Selectors looked for in runtime code
+TOKEN_SELECTORS = {
+    "name": function_selector("name()"),
+    "symbol": function_selector("symbol()"),
+    "decimals": function_selector("decimals()"),
+    "totalSupply": function_selector("totalSupply()"),
+    "transfer": function_selector("transfer(address,uint256)"),
+    "balanceOf": function_selector("balanceOf(address)"),
+}
+# Without these a contract can't be an ERC-20, whatever else it has
+CORE_SELECTORS = ("totalSupply", "balanceOf", "transfer")
+
+# EIP-1167 minimal proxy: prefix + 20-byte implementation + suffix
+EIP1167_PREFIX = bytes.fromhex("363d3d373d3d3d363d73")
+EIP1167_SUFFIX = bytes.fromhex("5af43d82803e903d91602b57fd5bf3")
+# EIP-1967 implementation slot: keccak256("eip1967.proxy.implementation") - 1
+EIP1967_IMPLEMENTATION_SLOT = "0x360894a13ba1a3210667c828492db98dca3e2076cc3735a920a3ca505d382bbc"
+# A bare forwarder (fallback only, no dispatcher of its own) fits in this much code
+MAX_FORWARDER_SIZE = 256
+
+
+def eip1167_implementation(code: bytes) -> Optional[str]:
+    """Implementation address if `code` is an EIP-1167 minimal proxy"""
+    if len(code) == 45 and code.startswith(EIP1167_PREFIX) and code.endswith(EIP1167_SUFFIX):
+        return Web3.to_checksum_address(code[10:30])
+    return None
+
+
+def is_proxy_code(code: bytes) -> bool:
+    """True if the code forwards calls: it uses the EIP-1967 slot or is a short
+    DELEGATECALL forwarder. DELEGATECALL is looked up as an opcode, the 0xf4
+    byte alone turns up in PUSH data and metadata of most contracts."""
+    if DELEGATECALL not in opcodes_present(code):
+        return False
+    return bytes.fromhex(EIP1967_IMPLEMENTATION_SLOT[2:]) in code or len(strip_metadata(code)) <= MAX_FORWARDER_SIZE
+
+
+def find_selectors(code: bytes) -> List[str]:
+    """Token selectors present in the code. A plain byte search: dispatchers
+    embed selectors as PUSH4 operands, and bytes.find beats an opcode walk."""
+    return [name for name, selector in TOKEN_SELECTORS.items() if selector in code]
+
+
+class BytecodeClassifier:
+    """Sorts deployed contracts into likely tokens and the rest from their
+    runtime code, before any eth_call is spent on them.
+
+    Classifications are cached by code hash (shared by all chains), so
+    factory clones and redeployed templates are classified once."""
+
+    _cache: "OrderedDict[bytes, Dict]" = OrderedDict()
+    _lock = threading.Lock()
+    cache_size = 50000
+
+    def __init__(self, rpc: BatchRPCClient, on_new_code: Optional[Callable[[str, bytes], object]] = None):
+        self.rpc = rpc
+        self.on_new_code = on_new_code  # Called with (code hash, code) for every code not seen before
+
+    @classmethod
+    def _cached(cls, code_hash: bytes) -> Optional[Dict]:
+        with cls._lock:
+            entry = cls._cache.get(code_hash)
+            if entry is not None:
+                cls._cache.move_to_end(code_hash)
+            return entry
+
+    @classmethod
+    def _store(cls, code_hash: bytes, entry: Dict):
+        with cls._lock:
+            cls._cache[code_hash] = entry
+            while len(cls._cache) > cls.cache_size:
+                cls._cache.popitem(last=False)
+
+    def classify_code(self, code: bytes) -> Dict:
+        """Classification of a non-proxy runtime code"""
+        code_hash = bytes(Web3.keccak(code))
+        entry = self._cached(code_hash)
+        if entry is not None:
+            return entry
+
+        selectors = find_selectors(code)
+        if all(name in selectors for name in CORE_SELECTORS):
+            kind = "erc20"
+        elif is_proxy_code(code):
+            kind = "proxy"  # Upgradeable proxy: classified by its implementation in classify_many
+        else:
+            kind = "other"
+        entry = {
+            "kind": kind,
+            "is_token_candidate": kind != "other",
+            "code_hash": Web3.to_hex(code_hash),
+            "code_size": len(code),
+            "selectors": selectors,
+            "implementation": None
+        }
+        self._store(code_hash, entry)
+        if self.on_new_code:
+            self.on_new_code(entry["code_hash"], code)
+        return entry
+
+    def _fetch_codes(self, addresses: Sequence[str], block: Optional[int] = None) -> List[Optional[bytes]]:
+        """Runtime code per address in one batch, None where the call failed"""
+        if not addresses:
+            return []
+        results = self.rpc.state_batch([("eth_getCode", [address]) for address in addresses], block)
+        return [None if isinstance(code, Exception) else bytes(HexBytes(code or "0x")) for code in results]
+
+    def _implementations(self, addresses: Sequence[str], block: Optional[int] = None) -> List[Optional[str]]:
+        """EIP-1967 implementation per proxy address, None if the slot is empty or unreadable"""
+        if not addresses:
+            return []
+        results = self.rpc.state_batch([
+            ("eth_getStorageAt", [address, EIP1967_IMPLEMENTATION_SLOT]) for address in addresses
+        ], block)
+        implementations = []
+        for value in results:
+            word = b"" if isinstance(value, Exception) else bytes(HexBytes(value or "0x")).rjust(32, b"\x00")
+            implementations.append(Web3.to_checksum_address(word[12:32]) if word and int.from_bytes(word, "big") else None)
+        return implementations
+
+    def classify_many(self, addresses: Sequence[str], block: Optional[int] = None) -> Dict[str, Optional[Dict]]:
+        """Classification per address; None if its code couldn't be fetched.
+        kind is "empty" (no code: failed deployment), "erc20", "eip1167",
+        "proxy" or "other"; only is_token_candidate ones are worth enriching.
+        Clones and EIP-1967 proxies are candidates if their implementation is;
+        a proxy whose implementation can't be read is let through. Pass the
+        block the contracts were found in as `block`: state is read there, so
+        an endpoint behind that block can't report fresh contracts as empty."""
+        classifications: Dict[str, Optional[Dict]] = {}
+        delegates = {}  # address -> (entry without the implementation's verdict, implementation)
+
+        for address, code in zip(addresses, self._fetch_codes(addresses, block)):
+            if code is None:
+                classifications[address] = None
+            elif not code:
+                classifications[address] = {"kind": "empty", "is_token_candidate": False, "code_hash": None,
+                                            "code_size": 0, "selectors": [], "implementation": None}
+            else:
+                implementation = eip1167_implementation(code)
+                if implementation is None:
+                    classifications[address] = self.classify_code(code)
+                    continue
+                code_hash = bytes(Web3.keccak(code))
+                cached = self._cached(code_hash)  # Clones of one implementation share their code
+                if cached is not None:
+                    classifications[address] = cached
+                else:
+                    delegates[address] = ({"kind": "eip1167", "code_hash": Web3.to_hex(code_hash), "code_size": 45},
+                                          implementation)
+
+        # Proxy code is shared by many proxies with different implementations, read per address
+        proxies = [address for address, entry in classifications.items() if entry and entry["kind"] == "proxy"]
+        for address, implementation in zip(proxies, self._implementations(proxies, block)):
+            if implementation is not None:
+                delegates[address] = (classifications[address], implementation)
+
+        # Clones and proxies are classified by their implementation's code
+        implementations = list(dict.fromkeys(implementation for _, implementation in delegates.values()))
+        implementation_codes = dict(zip(implementations, self._fetch_codes(implementations, block)))
+        for address, (base, implementation) in delegates.items():
+            implementation_code = implementation_codes[implementation]
+            if implementation_code is None:
+                # Unknown logic: clones drop out as before, proxies stay candidates
+                classifications[address] = None if base["kind"] == "eip1167" else base
+                continue
+            target = self.classify_code(implementation_code) if implementation_code else None
+            entry = {
+                **base,
+                "is_token_candidate": bool(target and target["is_token_candidate"]),
+                "selectors": target["selectors"] if target else [],
+                "implementation": implementation,
+                "implementation_code_hash": target["code_hash"] if target else None
+            }
+            if base["kind"] == "eip1167":
+                self._store(bytes(HexBytes(base["code_hash"])), entry)
+            classifications[address] = entry
+        return classifications
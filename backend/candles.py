@@ -0,0 +1,203 @@
+# candles.py - Incremental OHLCV Candle Store per Pool
+import json
+import os
+import threading
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+
+INTERVALS = {"1m": 60, "5m": 300, "1h": 3600}
+
+# Columns of a candle row
+START, OPEN, HIGH, LOW, CLOSE, VOLUME = range(6)
+
+
+class CandleSeries:
+    """Fixed-capacity ring buffer of OHLCV candles for one pool and interval.
+
+    Rows are [start, open, high, low, close, volume] in one float64 array;
+    when full, the oldest candle is overwritten. Intervals without trades
+    take no slot."""
+
+    def __init__(self, interval: int, capacity: int = 500):
+        self.interval = interval
+        self.capacity = capacity
+        self.rows = np.zeros((capacity, 6), dtype=np.float64)
+        self.head = -1  # Slot of the newest candle
+        self.count = 0
+
+    def _slot_of(self, start: float) -> Optional[int]:
+        """Slot of the candle starting at `start`, searching back from the newest"""
+        for back in range(self.count):
+            slot = (self.head - back) % self.capacity
+            if self.rows[slot, START] == start:
+                return slot
+            if self.rows[slot, START] < start:
+                return None
+        return None
+
+    def fold(self, start: float, open_: float, high: float, low: float, close: float, volume: float):
+        """Merge one aggregated bucket into the series"""
+        if self.count and start < self.rows[self.head, START]:
+            # Late data for an older candle: widen its range, keep its open/close
+            slot = self._slot_of(start)
+            if slot is not None:
+                row = self.rows[slot]
+                row[HIGH] = max(row[HIGH], high)
+                row[LOW] = min(row[LOW], low)
+                row[VOLUME] += volume
+            return
+
+        if self.count and start == self.rows[self.head, START]:
+            row = self.rows[self.head]
+            row[HIGH] = max(row[HIGH], high)
+            row[LOW] = min(row[LOW], low)
+            row[CLOSE] = close
+            row[VOLUME] += volume
+            return
+
+        self.head = (self.head + 1) % self.capacity
+        self.rows[self.head] = (start, open_, high, low, close, volume)
+        self.count = min(self.count + 1, self.capacity)
+
+    def add_many(self, timestamps: np.ndarray, prices: np.ndarray, volumes: np.ndarray):
+        """Fold many trades at once: buckets are aggregated with NumPy, then merged one per bucket"""
+        if len(timestamps) == 0:
+            return
+        order = np.argsort(timestamps, kind="stable")
+        timestamps, prices, volumes = timestamps[order], prices[order], volumes[order]
+
+        starts = timestamps - timestamps % self.interval
+        bucket_starts, first = np.unique(starts, return_index=True)
+        last = np.append(first[1:], len(starts)) - 1
+        highs = np.maximum.reduceat(prices, first)
+        lows = np.minimum.reduceat(prices, first)
+        bucket_volumes = np.add.reduceat(volumes, first)
+
+        for i in range(len(bucket_starts)):
+            self.fold(bucket_starts[i], prices[first[i]], highs[i], lows[i], prices[last[i]], bucket_volumes[i])
+
+    def to_array(self) -> np.ndarray:
+        """Candles oldest first"""
+        if self.count == 0:
+            return self.rows[:0]
+        slots = (np.arange(self.head - self.count + 1, self.head + 1)) % self.capacity
+        return self.rows[slots]
+
+    def to_list(self) -> List[List[float]]:
+        """[[start, open, high, low, close, volume], ...] oldest first, start in unix seconds"""
+        return [[int(row[START])] + row[OPEN:].tolist() for row in self.to_array()]
+
+    @classmethod
+    def from_list(cls, interval: int, rows: Sequence[Sequence[float]], capacity: int = 500) -> "CandleSeries":
+        series = cls(interval, capacity)
+        for row in rows[-capacity:]:
+            series.fold(*row)
+        return series
+
+
+class CandleStore:
+    """OHLCV candles per pool for every interval in INTERVALS, fed from swap
+    price series or single price samples and published as one JSON file.
+
+    Replaces per-token chart images: the frontend draws from the series."""
+
+    def __init__(self, intervals: Sequence[str] = tuple(INTERVALS), capacity: int = 500,
+                 path: Optional[str] = None):
+        self.intervals = {name: INTERVALS[name] for name in intervals}
+        self.capacity = capacity
+        self.path = path or os.path.join("public", "candles.json")
+        self.pools: Dict[str, Dict[str, CandleSeries]] = {}  # pool key -> interval name -> series
+        self.synced_to: Dict[str, int] = {}  # pool key -> last timestamp whose swaps are all folded
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(pool_address: str, chain: str = "base") -> str:
+        return f"{chain}:{pool_address.lower()}"
+
+    def _series(self, key: str) -> Dict[str, CandleSeries]:
+        if key not in self.pools:
+            self.pools[key] = {
+                name: CandleSeries(seconds, self.capacity) for name, seconds in self.intervals.items()
+            }
+        return self.pools[key]
+
+    def add_trades(self, key: str, timestamps: Sequence, prices: Sequence, volumes: Optional[Sequence] = None):
+        """Fold trades (e.g. decoded swaps) into every interval of a pool"""
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        prices = np.asarray(prices, dtype=np.float64)
+        volumes = np.zeros(len(prices)) if volumes is None else np.abs(np.asarray(volumes, dtype=np.float64))
+        keep = np.isfinite(prices) & (prices > 0)
+        with self._lock:
+            for series in self._series(key).values():
+                series.add_many(timestamps[keep], prices[keep], volumes[keep])
+
+    def add_sample(self, key: str, timestamp: int, price: float, volume: float = 0.0):
+        """Fold one price observation (e.g. a reserves snapshot)"""
+        self.add_trades(key, [timestamp], [price], [volume])
+
+    def add_price_history(self, key: str, engine, pool_address: str, from_timestamp: int, to_timestamp: int,
+                          quote: str = "token1"):
+        """Fold a pool's swaps from a PriceHistoryEngine (price and volume in the `quote` token).
+        Time already folded for the pool is skipped, so repeated windows don't double count;
+        the window ends at the chain head, later swaps are left for the next call."""
+        _, head_timestamp = engine.timestamps.latest()
+        to_timestamp = min(to_timestamp, head_timestamp)
+        from_timestamp = max(from_timestamp, self.synced_to.get(key, from_timestamp - 1) + 1)
+        if from_timestamp > to_timestamp:
+            return
+        series = engine.price_series(pool_address, from_timestamp, to_timestamp, quote=quote)
+        volumes = series["amount0"] if quote == "token0" else series["amount1"]
+        self.add_trades(key, series["timestamp"], series["price"], volumes)
+        with self._lock:
+            self.synced_to[key] = max(self.synced_to.get(key, 0), to_timestamp)
+
+    def series(self, key: str, interval: str = "5m") -> List[List[float]]:
+        with self._lock:
+            pool = self.pools.get(key)
+            return pool[interval].to_list() if pool else []
+
+    def closes(self, key: str, interval: str = "5m", count: int = 12) -> List[float]:
+        """Latest close prices, the `price_chart` shape the token table draws"""
+        with self._lock:
+            pool = self.pools.get(key)
+            if not pool:
+                return []
+            return pool[interval].to_array()[-count:, CLOSE].tolist()
+
+    def to_json(self) -> Dict:
+        with self._lock:
+            return {
+                "intervals": self.intervals,
+                "columns": ["t", "o", "h", "l", "c", "v"],
+                "synced_to": self.synced_to,
+                "pools": {
+                    key: {name: series.to_list() for name, series in pool.items()}
+                    for key, pool in self.pools.items()
+                }
+            }
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.to_json(), f, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
+
+    def load(self) -> bool:
+        """Resume from the saved series; returns False if there are none"""
+        if not os.path.exists(self.path):
+            return False
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Could not load candles {self.path}: {e}")
+            return False
+        with self._lock:
+            self.synced_to.update(data.get("synced_to", {}))
+            for key, pool in data.get("pools", {}).items():
+                self.pools[key] = {
+                    name: CandleSeries.from_list(seconds, pool.get(name, []), self.capacity)
+                    for name, seconds in self.intervals.items()
+                }
+        return True
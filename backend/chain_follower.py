@@ -0,0 +1,253 @@
+# chain_follower.py - Continuous Head Following with Reorg Handling
+import asyncio
+import json
+import queue
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Sequence
+from rpc_batch import BatchRPCClient
+
+try:
+    import websockets  # Optional: only needed for WebSocket head subscriptions
+except ImportError:
+    websockets = None
+
+
+class PollingHeadSource:
+    """New heads by polling eth_blockNumber, paced by the chain's block time.
+
+    Right after a new head the next one isn't expected for about one block
+    time, so polling pauses; then it polls quickly and backs off
+    multiplicatively while the block is late."""
+
+    def __init__(self, rpc: BatchRPCClient, block_time: float):
+        self.rpc = rpc
+        self.block_time = block_time
+        self.min_interval = max(0.05, block_time / 8)
+        self._last_head_at = 0.0
+
+    def latest_block(self) -> int:
+        return int(self.rpc.call("eth_blockNumber"), 16)
+
+    def get_blocks(self, block_numbers: Sequence[int]) -> List:
+        return self.rpc.fetch_blocks(block_numbers, full_transactions=True)
+
+    def wait_for_new_head(self, last_seen: int, timeout: Optional[float] = None) -> int:
+        deadline = time.time() + timeout if timeout else None
+
+        # Don't poll before the next block can exist
+        quiet_until = self._last_head_at + self.block_time * 0.8
+        if time.time() < quiet_until:
+            time.sleep(quiet_until - time.time())
+
+        interval = self.min_interval
+        while True:
+            head = self.latest_block()
+            if head > last_seen:
+                self._last_head_at = time.time()
+                return head
+            if deadline and time.time() + interval > deadline:
+                return head
+            time.sleep(interval)
+            interval = min(interval * 1.5, self.block_time)
+
+
+class WebSocketHeadSource(PollingHeadSource):
+    """New heads pushed through an eth_subscribe("newHeads") WebSocket.
+    Blocks are still fetched over HTTP; polling takes over if the socket drops."""
+
+    def __init__(self, rpc: BatchRPCClient, block_time: float, ws_url: str):
+        if websockets is None:
+            raise ImportError("websockets package is required for WebSocket head subscriptions")
+        super().__init__(rpc, block_time)
+        self.ws_url = ws_url
+        self.heads = queue.Queue()
+        self.connected = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        asyncio.run(self._subscribe())
+
+    async def _subscribe(self):
+        while True:
+            try:
+                async with websockets.connect(self.ws_url) as ws:
+                    await ws.send(json.dumps({"jsonrpc": "2.0", "id": 1, "method": "eth_subscribe", "params": ["newHeads"]}))
+                    self.connected = True
+                    async for message in ws:
+                        data = json.loads(message)
+                        head = data.get("params", {}).get("result", {}).get("number")
+                        if head:
+                            self.heads.put(int(head, 16))
+            except Exception as e:
+                print(f"⚠️ WebSocket head subscription dropped ({self.ws_url}): {e}")
+            self.connected = False
+            await asyncio.sleep(max(1.0, self.block_time))
+
+    def wait_for_new_head(self, last_seen: int, timeout: Optional[float] = None) -> int:
+        if not self.connected:
+            return super().wait_for_new_head(last_seen, timeout)
+        wait = timeout or self.block_time * 5
+        try:
+            while True:
+                head = self.heads.get(timeout=wait)
+                if head > last_seen:
+                    return head
+        except queue.Empty:
+            # Quiet socket: confirm over HTTP instead of trusting it blindly
+            return self.latest_block()
+
+
+class LocalHeadSource:
+    """In-memory stand-in chain for tests: mine blocks and force reorgs
+    without any RPC. Blocks are whatever objects the scanner's extractor
+    accepts (need .number, .hash, .parentHash)."""
+
+    def __init__(self, blocks: Sequence = ()):
+        self.blocks: Dict[int, object] = {}
+        for block in blocks:
+            self.mine(block)
+
+    def mine(self, block):
+        self.blocks[block.number] = block
+
+    def reorg(self, new_blocks: Sequence):
+        """Replace the chain from the first new block onward"""
+        first = new_blocks[0].number
+        for number in [n for n in self.blocks if n >= first]:
+            del self.blocks[number]
+        for block in new_blocks:
+            self.mine(block)
+
+    def latest_block(self) -> int:
+        return max(self.blocks) if self.blocks else -1
+
+    def get_blocks(self, block_numbers: Sequence[int]) -> List:
+        return [self.blocks.get(n, LookupError(f"block {n} not found")) for n in block_numbers]
+
+    def wait_for_new_head(self, last_seen: int, timeout: Optional[float] = None) -> int:
+        return self.latest_block()
+
+
+class ChainFollower:
+    """Tails a chain's heads and runs each new block through the scanner.
+
+    Recent block hashes are tracked; when a new block's parentHash doesn't
+    match, the follower walks back to the fork point, rolls back results
+    from orphaned blocks (reporting them via on_rollback) and rescans the
+    canonical blocks."""
+
+    def __init__(self, scanner, head_source, start_block: Optional[int] = None, reorg_depth: int = 64,
+                 on_result: Optional[Callable[[Dict], None]] = None,
+                 on_rollback: Optional[Callable[[List[Dict]], None]] = None):
+        self.scanner = scanner  # Chain-bound MultiChainTokenScanner
+        self.source = head_source
+        self.reorg_depth = reorg_depth
+        self.on_result = on_result
+        self.on_rollback = on_rollback
+
+        self.last_block: Optional[int] = start_block - 1 if start_block is not None else None
+        self.recent_hashes: "OrderedDict[int, bytes]" = OrderedDict()
+        self.results_by_block: Dict[int, List[Dict]] = {}
+        self.blocks_processed = 0
+
+    @property
+    def results(self) -> List[Dict]:
+        """Results of blocks still inside the reorg window (older ones are final)"""
+        return [r for number in sorted(self.results_by_block) for r in self.results_by_block[number]]
+
+    def _remember(self, block):
+        self.recent_hashes[block.number] = bytes(block.hash)
+        while len(self.recent_hashes) > self.reorg_depth:
+            self.recent_hashes.popitem(last=False)
+        # Blocks older than the window can't be rolled back anymore
+        oldest = next(iter(self.recent_hashes))
+        for number in [n for n in self.results_by_block if n < oldest]:
+            del self.results_by_block[number]
+
+    def _find_fork_point(self) -> int:
+        """Highest tracked block still on the canonical chain"""
+        numbers = list(self.recent_hashes)
+        canonical = self.source.get_blocks(numbers)
+        fork_point = numbers[0] - 1 if numbers else self.last_block
+        for number, block in zip(numbers, canonical):
+            if isinstance(block, Exception) or bytes(block.hash) != self.recent_hashes[number]:
+                break
+            fork_point = number
+        return fork_point
+
+    def _rollback(self, fork_point: int):
+        orphaned = []
+        for number in [n for n in self.results_by_block if n > fork_point]:
+            orphaned.extend(self.results_by_block.pop(number))
+        for number in [n for n in self.recent_hashes if n > fork_point]:
+            del self.recent_hashes[number]
+
+        print(f"🔀 Reorg on {self.scanner.current_chain.name.upper()}: rolled back to block {fork_point}, "
+              f"{len(orphaned)} results removed")
+        self.last_block = fork_point
+        if orphaned and self.on_rollback:
+            self.on_rollback(orphaned)
+
+    def _process(self, block) -> List[Dict]:
+        candidates, failed_blocks = self.scanner.extract_candidates([block.number], [block])
+        if failed_blocks:
+            raise RuntimeError(f"block {block.number} could not be processed")
+        results = self.scanner.enrich_candidates(candidates, block.number) if candidates else []
+        self.results_by_block[block.number] = results
+        self.blocks_processed += 1
+        for result in results:
+            print(f"✅ Contract saved: {result['metadata']['symbol']} - LP={result['lp_info']['status']}")
+            if self.on_result:
+                self.on_result(result)
+        return results
+
+    def step(self, head: Optional[int] = None) -> List[Dict]:
+        """Process every block after last_block up to head; returns new results"""
+        head = self.source.latest_block() if head is None else head
+        if self.last_block is None:
+            self.last_block = head - 1
+        if head <= self.last_block:
+            return []
+
+        new_results = []
+        block_numbers = list(range(self.last_block + 1, head + 1))
+        for block in self.source.get_blocks(block_numbers):
+            if isinstance(block, Exception):
+                print(f"⚠️ {block}, retrying on next head")
+                break
+
+            parent_hash = self.recent_hashes.get(block.number - 1)
+            if parent_hash is not None and bytes(block.parentHash) != parent_hash:
+                self._rollback(self._find_fork_point())
+                return new_results + self.step(head)
+
+            new_results.extend(self._process(block))
+            self._remember(block)
+            self.last_block = block.number
+        return new_results
+
+    def run(self, max_blocks: Optional[int] = None, stop_event: Optional[threading.Event] = None):
+        """Follow the chain until stopped or `max_blocks` blocks were processed.
+        Errors (RPC down, head source failing) back off exponentially, up to a minute."""
+        block_time = self.scanner.current_chain.block_time
+        failures = 0
+        while not (stop_event and stop_event.is_set()):
+            try:
+                head = self.source.wait_for_new_head(self.last_block if self.last_block is not None else -1)
+                self.step(head)
+            except Exception as e:
+                failures += 1
+                delay = min(block_time * 2 ** (failures - 1), 60.0)
+                print(f"⚠️ Follow error on {self.scanner.current_chain.name.upper()}: {e}, retrying in {delay:g}s")
+                if stop_event:
+                    stop_event.wait(delay)
+                else:
+                    time.sleep(delay)
+                continue
+            failures = 0
+
+            if max_blocks is not None and self.blocks_processed >= max_blocks:
+                return
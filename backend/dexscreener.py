@@ -0,0 +1,138 @@
+# dexscreener.py - Bulk DexScreener Client with Shared Rate Limiting
+import threading
+import time
+import requests
+from typing import Dict, List, Optional, Sequence
+from http_pool import HTTP_ERRORS, get_session
+
+DEXSCREENER_TOKENS_URL = "https://api.dexscreener.com/latest/dex/tokens/"
+MAX_ADDRESSES_PER_CALL = 30  # Limit of the multi-token endpoint
+
+# Scanner chain name -> DexScreener chainId
+DEXSCREENER_CHAIN_IDS = {
+    "ethereum": "ethereum",
+    "base": "base",
+    "optimism": "optimism",
+    "mode": "mode",
+    "zora": "zora",
+    "fraxtal": "fraxtal",
+    "world": "worldchain",
+    "lisk": "lisk",
+    "arbitrum": "arbitrum",
+    "polygon": "polygon"
+}
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` requests/sec with bursts up to `capacity`.
+    pause() stops every caller at once, e.g. for a 429 Retry-After."""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if now >= self.paused_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = max(self.paused_until - now, (1 - self.tokens) / self.rate)
+            time.sleep(wait)
+
+    def pause(self, seconds: float):
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.tokens = 0
+
+
+# DexScreener allows ~300 requests/min per IP, so one bucket for the whole process
+SHARED_BUCKET = TokenBucket(rate=5, capacity=5)
+
+
+def summarize_pair(pair: Dict) -> Dict:
+    """DexScreener pair -> the scanner's dex_data fields"""
+    return {
+        "price_usd": pair.get("priceUsd", "0"),
+        "volume_24h": (pair.get("volume") or {}).get("h24", "0"),
+        "liquidity": (pair.get("liquidity") or {}).get("usd", "0"),
+        "pair_address": pair.get("pairAddress", ""),
+        "dex": pair.get("dexId", "unknown"),
+        "chain": pair.get("chainId", "")
+    }
+
+
+class DexScreenerClient:
+    """Looks up up to 30 tokens per request on the multi-token endpoint.
+    All clients share SHARED_BUCKET unless given their own."""
+
+    def __init__(self, bucket: Optional[TokenBucket] = None, session: Optional[requests.Session] = None,
+                 timeout: int = 10, max_retries: int = 3):
+        self.bucket = bucket or SHARED_BUCKET
+        self.session = session or get_session()
+        self.timeout = timeout
+        self.max_retries = max_retries
+
+    def _get(self, url: str) -> Optional[Dict]:
+        for attempt in range(self.max_retries):
+            self.bucket.acquire()
+            response = self.session.get(url, timeout=self.timeout)
+            if response.status_code == 429:
+                retry_after = response.headers.get("Retry-After")
+                delay = float(retry_after) if retry_after and retry_after.isdigit() else 2 ** (attempt + 1)
+                print(f"⏳ DexScreener rate limited, pausing {delay:.0f}s")
+                self.bucket.pause(delay)
+                continue
+            response.raise_for_status()
+            return response.json()
+        return None
+
+    def fetch_pairs(self, token_addresses: Sequence[str]) -> Dict[str, List[Dict]]:
+        """All pairs of each token across every chain, keyed by lower-case address"""
+        addresses = list(dict.fromkeys(a.lower() for a in token_addresses))
+        pairs: Dict[str, List[Dict]] = {address: [] for address in addresses}
+
+        for start in range(0, len(addresses), MAX_ADDRESSES_PER_CALL):
+            chunk = addresses[start:start + MAX_ADDRESSES_PER_CALL]
+            try:
+                data = self._get(DEXSCREENER_TOKENS_URL + ",".join(chunk))
+            except (*HTTP_ERRORS, ValueError) as e:
+                print(f"⚠️ DexScreener API error: {e}")
+                continue
+
+            for pair in (data or {}).get("pairs") or []:
+                for side in ("baseToken", "quoteToken"):
+                    address = ((pair.get(side) or {}).get("address") or "").lower()
+                    if address in pairs:
+                        pairs[address].append(pair)
+        return pairs
+
+    def fetch_many(self, token_addresses: Sequence[str], chain_name: Optional[str] = None) -> Dict[str, Dict]:
+        """dex_data per token (as passed in): the most liquid pair on `chain_name`
+        (any chain if None) plus the token's pairs on every chain under "pairs".
+        Tokens with pairs only on other chains get "pairs" alone, no "price_usd"."""
+        chain_id = DEXSCREENER_CHAIN_IDS.get(chain_name, chain_name)
+        pairs = self.fetch_pairs(token_addresses)
+
+        dex_data = {}
+        for token_address in token_addresses:
+            token_pairs = pairs.get(token_address.lower(), [])
+            if not token_pairs:
+                dex_data[token_address] = {}
+                continue
+
+            # Top-level fields describe the most liquid pair on the scanned chain
+            chain_pairs = [p for p in token_pairs if chain_id is None or p.get("chainId") == chain_id]
+            entry = {}
+            if chain_pairs:
+                entry = summarize_pair(max(chain_pairs, key=lambda p: float((p.get("liquidity") or {}).get("usd") or 0)))
+            entry["pairs"] = [summarize_pair(p) for p in token_pairs]
+            dex_data[token_address] = entry
+        return dex_data
@@ -2,14 +2,22 @@ from datetime import datetime
 from web3 import Web3
 import os
 import json
-import random
+import time
+from http_pool import get_web3
+from scan_cursor import ScanCursorStore
+from candles import CandleStore
+from get_price_history import price_history_engine
+from rpc_batch import BatchRPCClient
+from receipts import ReceiptsProvider
 
 # Connect to Base chain RPC
-w3 = Web3(Web3.HTTPProvider("https://mainnet.base.org"))
+RPC_URL = "https://mainnet.base.org"
+w3 = get_web3(RPC_URL)
+receipts = ReceiptsProvider(BatchRPCClient(RPC_URL, batch_size=10), chain_id=8453)
 
 # Factory and WETH addresses
-UNISWAP_FACTORY = w3.toChecksumAddress("0x327Df1E6de05895d2ab08513aaDD9313Fe505d86")
-WETH_ADDRESS = w3.toChecksumAddress("0x4200000000000000000000000000000000000006")
+UNISWAP_FACTORY = Web3.to_checksum_address("0x327Df1E6de05895d2ab08513aaDD9313Fe505d86")
+WETH_ADDRESS = Web3.to_checksum_address("0x4200000000000000000000000000000000000006")
 
 # Minimal ABI
 FACTORY_ABI = [
@@ -26,53 +34,112 @@ FACTORY_ABI = [
     }
 ]
 
-# LP check function
-def check_lp_exists(token_address: str) -> str:
+# LP check function, returns (status, pair address)
+def check_lp_exists(token_address: str):
     try:
-        token_address = w3.toChecksumAddress(token_address)
+        token_address = Web3.to_checksum_address(token_address)
         factory = w3.eth.contract(address=UNISWAP_FACTORY, abi=FACTORY_ABI)
         pair = factory.functions.getPair(token_address, WETH_ADDRESS).call()
-        return "YES" if int(pair, 16) != 0 else "NO"
+        return ("YES", pair) if int(pair, 16) != 0 else ("NO", None)
     except Exception:
-        return "ERROR"
+        return "ERROR", None
 
-# Fake price chart generator
-def generate_fake_price_chart():
-    return [round(1 + random.uniform(-0.05, 0.05), 4) for _ in range(12)]
+# Price chart from the pair's on-chain swaps (last hour, 5m closes, in WETH)
+def price_chart_for(candles: CandleStore, price_engine, pair: str):
+    key = CandleStore.key(pair)
+    now = int(time.time())
+    try:
+        quote = price_engine.quote_side(pair, WETH_ADDRESS)
+        candles.add_price_history(key, price_engine, pair, now - 3600, now, quote=quote)
+    except Exception as e:
+        print(f"⚠️ Price history error for {pair}: {e}")
+    closes = candles.closes(key, "5m")
+    return closes if closes else "none"
 
-# Scan blocks
-latest_block = w3.eth.block_number
-start_block = latest_block - 50
-results = []
+CHAIN_ID = 8453
 
-print(f"🔍 Scanning blocks {start_block} to {latest_block}...")
+def main():
+    candles = CandleStore()
+    candles.load()
+    price_engine = price_history_engine(w3)
 
-for block_num in range(start_block, latest_block + 1):
-    try:
-        block = w3.eth.get_block(block_num, full_transactions=True)
-        for tx in block.transactions:
-            if tx.to is None:
+    # Scan blocks (resume from the last checkpoint; first run takes the last 50)
+    cursor_store = ScanCursorStore(os.path.join("cache", "fetch_tokens_cursors.json"))
+    latest_block = w3.eth.block_number
+    block_range = cursor_store.next_range(CHAIN_ID, latest_block, 50)
+    start_block = block_range[0] if block_range else latest_block + 1
+    results = []
+    charted = []  # (entry, pair) to chart once the scan is done
+    checkpoint_held = False
+
+    print(f"🔍 Scanning blocks {start_block} to {latest_block}...")
+
+    for block_num in range(start_block, latest_block + 1):
+        block_results = []
+        try:
+            block = w3.eth.get_block(block_num, full_transactions=True)
+            deploy_txs = [tx for tx in block.transactions if tx.to is None]
+            # The created contract's address comes from the deployment receipt
+            block_receipts = receipts.get_receipts(block_num, [tx.hash for tx in deploy_txs])
+            for tx in deploy_txs:
+                receipt = block_receipts.get(tx.hash)
+                if receipt is None:
+                    raise LookupError(f"no receipt for {tx.hash.hex()}")
+                if not receipt.contractAddress or receipt.get("status") == 0:
+                    continue  # Reverted deployment
                 deployer = tx["from"]
-                lp_status = check_lp_exists(deployer)
-                price_chart = generate_fake_price_chart() if lp_status == "YES" else "none"
+                contract = Web3.to_checksum_address(receipt.contractAddress)
+                lp_status, pair = check_lp_exists(contract)
 
-                results.append({
+                block_results.append({
                     "chain": "base",
                     "block": block_num,
                     "hash": tx.hash.hex(),
                     "from": deployer,
+                    "contract_address": contract,
                     "timestamp": datetime.utcfromtimestamp(block.timestamp).isoformat(),
                     "lp_status": lp_status,
-                    "price_chart": price_chart
+                    "price_chart": "none"
                 })
-    except Exception as e:
-        print(f"⚠️ Block {block_num} failed: {e}")
-        continue
+                if pair:
+                    charted.append((block_results[-1], pair))
+        except Exception as e:
+            print(f"⚠️ Block {block_num} failed: {e}")
+            checkpoint_held = True  # Don't move the checkpoint past a failed block
+            continue
+
+        results.extend(block_results)
+        if not checkpoint_held:
+            cursor_store.commit(CHAIN_ID, block_num, block_results)
+
+    # Charts after the scan, off the block loop
+    for entry, pair in charted:
+        entry["price_chart"] = price_chart_for(candles, price_engine, pair)
+
+    # Save to public/ (appending to the previous runs' entries)
+    output_path = os.path.join("public", "base_tokenlar_lp.json")
+    os.makedirs("public", exist_ok=True)
+    previous = []
+    if os.path.exists(output_path):
+        try:
+            with open(output_path) as f:
+                previous = json.load(f)
+        except ValueError:
+            previous = []
+    # Blocks after a failed one are rescanned next run, skip entries already saved.
+    # The journal also holds results of a run that crashed before getting here.
+    seen_hashes = {entry.get("hash") for entry in previous}
+    # This run's entries first: they carry the charts, their journaled copies don't
+    for entry in results + cursor_store.pending():
+        if entry["hash"] not in seen_hashes:
+            previous.append(entry)
+            seen_hashes.add(entry["hash"])
+    with open(output_path, "w") as f:
+        json.dump(previous, f, indent=2)
+    cursor_store.clear_journal()
 
-# Save to public/
-output_path = os.path.join("public", "base_tokenlar_lp.json")
-os.makedirs("public", exist_ok=True)
-with open(output_path, "w") as f:
-    json.dump(results, f, indent=2)
+    candles.save()
+    print(f"✅ Saved: {output_path}")
 
-print(f"✅ Saved: {output_path}")
+if __name__ == "__main__":
+    main()
@@ -2,15 +2,20 @@
 from datetime import datetime
 import os
 import json
-import requests
-import pandas as pd
-import matplotlib.pyplot as plt
+import time
 from web3 import Web3
+from http_pool import get_web3
+from rpc_batch import BatchRPCClient
+from receipts import ReceiptsProvider
+from candles import CandleStore
+from get_price_history import price_history_engine
 
 # RPC & DEX Info
-w3 = Web3(Web3.HTTPProvider("https://mainnet.base.org"))
-UNISWAP_FACTORY = Web3.toChecksumAddress("0x327Df1E6de05895d2ab08513aaDD9313Fe505d86")
-WETH_ADDRESS = Web3.toChecksumAddress("0x4200000000000000000000000000000000000006")
+RPC_URL = "https://mainnet.base.org"
+w3 = get_web3(RPC_URL)
+receipts = ReceiptsProvider(BatchRPCClient(RPC_URL, batch_size=10), chain_id=8453)
+UNISWAP_FACTORY = Web3.to_checksum_address("0x327Df1E6de05895d2ab08513aaDD9313Fe505d86")
+WETH_ADDRESS = Web3.to_checksum_address("0x4200000000000000000000000000000000000006")
 
 FACTORY_ABI = [{
     "constant": True,
@@ -24,72 +29,84 @@ FACTORY_ABI = [{
     "type": "function"
 }]
 
+def get_pair(token_address: str):
+    """WETH pair of the token, None if there is none"""
+    token_address = Web3.to_checksum_address(token_address)
+    factory = w3.eth.contract(address=UNISWAP_FACTORY, abi=FACTORY_ABI)
+    pair = factory.functions.getPair(token_address, WETH_ADDRESS).call()
+    return pair if int(pair, 16) != 0 else None
+
 def check_lp_exists(token_address: str) -> str:
     try:
-        token_address = Web3.toChecksumAddress(token_address)
-        factory = w3.eth.contract(address=UNISWAP_FACTORY, abi=FACTORY_ABI)
-        pair = factory.functions.getPair(token_address, WETH_ADDRESS).call()
-        return "YES" if int(pair, 16) != 0 else "NO"
+        return "YES" if get_pair(token_address) else "NO"
     except:
         return "ERROR"
 
-def fetch_price_data(token_address: str) -> list:
-    try:
-        url = f"https://api.dexscreener.com/latest/dex/pairs/base/{token_address}"
-        response = requests.get(url)
-        data = response.json()
-        if "pairs" not in data or not data["pairs"]:
-            return []
-        history = data["pairs"][0].get("priceUsdHistory", [])
-        return history[-12:] if len(history) > 0 else []
-    except:
-        return []
-
-def draw_price_chart(prices: list, token_address: str):
-    if not prices:
-        return
-    times = [i for i in range(len(prices))]
-    plt.figure()
-    plt.plot(times, prices, marker='o')
-    plt.title(f"Price chart: {token_address[:6]}...")
-    plt.xlabel("Interval")
-    plt.ylabel("Price (USD)")
-    plt.tight_layout()
-    chart_path = f"../public/charts/{token_address}.png"
-    os.makedirs(os.path.dirname(chart_path), exist_ok=True)
-    plt.savefig(chart_path)
-    plt.close()
+def main():
+    # Candles are built from on-chain swaps after the scan, not per deployment
+    candles = CandleStore()
+    candles.load()
+    price_engine = price_history_engine(w3)
 
-latest_block = w3.eth.block_number
-start_block = latest_block - 50
-results = []
+    latest_block = w3.eth.block_number
+    start_block = latest_block - 50
+    results = []
+    pairs = {}  # result index -> pair address
 
-print(f"🔍 Scanning blocks {start_block} to {latest_block}...")
+    print(f"🔍 Scanning blocks {start_block} to {latest_block}...")
 
-for block_num in range(start_block, latest_block + 1):
-    try:
-        block = w3.eth.get_block(block_num, full_transactions=True)
-        for tx in block.transactions:
-            if tx.to is None:
+    for block_num in range(start_block, latest_block + 1):
+        try:
+            block = w3.eth.get_block(block_num, full_transactions=True)
+            deploy_txs = [tx for tx in block.transactions if tx.to is None]
+            # The created address is only in the receipt (web3 v6 dropped tx["creates"])
+            block_receipts = receipts.get_receipts(block_num, [tx.hash for tx in deploy_txs])
+            for tx in deploy_txs:
+                receipt = block_receipts.get(tx.hash)
+                if receipt is None or not receipt.contractAddress or receipt.get("status") == 0:
+                    continue
                 deployer = tx["from"]
-                contract = tx["creates"] if "creates" in tx and tx["creates"] else deployer
-                lp_status = check_lp_exists(contract)
-                prices = fetch_price_data(contract)
-                draw_price_chart(prices, contract)
+                contract = Web3.to_checksum_address(receipt.contractAddress)
+                try:
+                    pair = get_pair(contract)
+                    lp_status = "YES" if pair else "NO"
+                except:
+                    pair, lp_status = None, "ERROR"
+                if pair:
+                    pairs[len(results)] = pair
 
                 results.append({
                     "chain": "base",
                     "block": block_num,
                     "hash": tx.hash.hex(),
                     "from": deployer,
+                    "contract_address": contract,
                     "timestamp": datetime.utcfromtimestamp(block.timestamp).isoformat(),
                     "lp_status": lp_status,
-                    "price_chart": f"charts/{contract}.png" if prices else "none"
+                    "price_chart": "none"
                 })
-    except Exception as e:
-        print(f"Error on block {block_num}: {e}")
+        except Exception as e:
+            print(f"Error on block {block_num}: {e}")
+
+    # Fold the last hour of each pair's swaps into its candles, priced in WETH
+    window_start = int(time.time()) - 3600
+    for index, pair in pairs.items():
+        key = CandleStore.key(pair)
+        try:
+            quote = price_engine.quote_side(pair, WETH_ADDRESS)
+            candles.add_price_history(key, price_engine, pair, window_start, int(time.time()), quote=quote)
+        except Exception as e:
+            print(f"Price history error for {pair}: {e}")
+        closes = candles.closes(key, "1m")
+        results[index]["price_chart"] = closes if closes else "none"
+        results[index]["candles"] = key
+    candles.save()
+
+    import pandas as pd  # Only the export needs it
+    df = pd.DataFrame(results)
+    os.makedirs("public", exist_ok=True)
+    df.to_json(os.path.join("public", "base_tokenlar_lp.json"), orient="records", indent=2)
+    print("✅ Saved with candles.")
 
-df = pd.DataFrame(results)
-os.makedirs("../public", exist_ok=True)
-df.to_json("../public/base_tokenlar_lp.json", orient="records", indent=2)
-print("✅ Saved with charts.")
+if __name__ == "__main__":
+    main()
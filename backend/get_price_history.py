@@ -1,49 +1,194 @@
 from web3 import Web3
 from datetime import datetime
-from eth_abi import decode_abi
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+from hexbytes import HexBytes
+from rpc_batch import BatchRPCClient
+from log_fetcher import LogRangeFetcher
+from block_timestamps import BlockTimestampCache
+from multicall import Multicall3, TokenMetadataReader, function_selector
+from lp_probe import decode_address
 
 # UniswapV2 Pair Swap Event Signature
-SWAP_TOPIC = Web3.keccak(text="Swap(address,uint256,uint256,uint256,uint256,address)").hex()
+SWAP_TOPIC = Web3.to_hex(Web3.keccak(text="Swap(address,uint256,uint256,uint256,uint256,address)"))
+# UniswapV3 Pool Swap Event Signature
+SWAP_V3_TOPIC = Web3.to_hex(Web3.keccak(text="Swap(address,address,int256,int256,uint160,uint128,int24)"))
 
 # WETH address on Base
 WETH_ADDRESS = Web3.to_checksum_address("0x4200000000000000000000000000000000000006")
 
-def get_price_history(w3: Web3, pair_address: str, from_timestamp: int, to_timestamp: int, max_events=100):
-    try:
+TOKEN0_SELECTOR = function_selector("token0()")
+TOKEN1_SELECTOR = function_selector("token1()")
+
+_WORD_SCALE = np.array([2.0 ** 192, 2.0 ** 128, 2.0 ** 64, 1.0])
+
+
+def words_to_float(data: np.ndarray, signed: bool = False) -> np.ndarray:
+    """(n, 32) big-endian uint256/int256 words -> float64, all rows at once"""
+    negative = data[:, 0] >= 0x80 if signed else np.zeros(len(data), dtype=bool)
+    # Two's complement on the bytes: |x| = ~x + 1 (x - 2**256 in floats would lose it all)
+    magnitude = np.where(negative[:, None], 0xFF - data, data).astype(np.uint8)
+    limbs = np.ascontiguousarray(magnitude).view(">u8").reshape(len(data), 4).astype(np.float64)
+    values = limbs @ _WORD_SCALE
+    return np.where(negative, -(values + 1.0), values)
+
+
+def _data_matrix(logs: Sequence, words: int) -> np.ndarray:
+    """Log data of every log as one (n, words, 32) byte array"""
+    size = words * 32
+    buffer = b"".join(bytes(HexBytes(log["data"]))[:size].ljust(size, b"\x00") for log in logs)
+    return np.frombuffer(buffer, dtype=np.uint8).reshape(len(logs), words, 32)
+
+
+def decode_v2_swaps(logs: Sequence) -> Dict[str, np.ndarray]:
+    """Swap(amount0In, amount1In, amount0Out, amount1Out) -> net raw amounts into the pair"""
+    data = _data_matrix(logs, 4)
+    amount0_in, amount1_in, amount0_out, amount1_out = (words_to_float(data[:, i]) for i in range(4))
+    amount0 = amount0_in - amount0_out
+    amount1 = amount1_in - amount1_out
+    # A swap moves the two tokens in opposite directions; anything else has no price
+    valid = (amount0 * amount1 < 0)
+    price = np.divide(np.abs(amount1), np.abs(amount0), out=np.full(len(logs), np.nan), where=valid)
+    return {"amount0": amount0, "amount1": amount1, "raw_price": price}
+
+
+def decode_v3_swaps(logs: Sequence) -> Dict[str, np.ndarray]:
+    """Swap(amount0, amount1, sqrtPriceX96, liquidity, tick) -> amounts and post-swap pool price"""
+    data = _data_matrix(logs, 5)
+    amount0 = words_to_float(data[:, 0], signed=True)
+    amount1 = words_to_float(data[:, 1], signed=True)
+    sqrt_price = words_to_float(data[:, 2]) / 2.0 ** 96
+    return {"amount0": amount0, "amount1": amount1, "raw_price": sqrt_price * sqrt_price}
+
+
+class PriceHistoryEngine:
+    """Price series of a Uniswap V2 pair or V3 pool from its Swap logs.
+
+    Logs come from the adaptive range fetcher over the block range matching
+    the timestamp window; block timestamps are cached and fetched as
+    batched headers, one per distinct block. Amounts are decoded for all
+    logs at once into NumPy arrays and adjusted for both tokens' decimals.
+    Prices are token1 per token0 unless `quote` says otherwise."""
+
+    def __init__(self, rpc: BatchRPCClient, multicall: Multicall3, log_fetcher: Optional[LogRangeFetcher] = None,
+                 timestamps: Optional[BlockTimestampCache] = None):
+        self.rpc = rpc
+        self.multicall = multicall
+        self.log_fetcher = log_fetcher or LogRangeFetcher(rpc)
+        self.timestamps = timestamps or BlockTimestampCache(rpc)
+        self._pairs: Dict[str, Dict] = {}
+
+    def pair_info(self, pair_address: str) -> Dict:
+        """token0/token1 and their decimals (read once per pair, in two Multicall3 calls)"""
         pair_address = Web3.to_checksum_address(pair_address)
+        if pair_address not in self._pairs:
+            (ok0, data0), (ok1, data1) = self.multicall.try_aggregate(
+                [(pair_address, TOKEN0_SELECTOR), (pair_address, TOKEN1_SELECTOR)]
+            )
+            token0 = decode_address(data0) if ok0 else None
+            token1 = decode_address(data1) if ok1 else None
+            if token0 is None or token1 is None:
+                raise ValueError(f"{pair_address} is not a Uniswap pair/pool")
+            decimals = TokenMetadataReader(self.multicall).read_many([token0, token1], fields=["decimals"])
+            decimals0 = decimals[token0]["decimals"]
+            decimals1 = decimals[token1]["decimals"]
+            # 0 is valid; a guessed 18 would scale prices by orders of magnitude
+            if decimals0 is None or decimals1 is None:
+                raise ValueError(f"Could not read token decimals of {pair_address}")
+            self._pairs[pair_address] = {
+                "token0": token0,
+                "token1": token1,
+                "decimals0": decimals0,
+                "decimals1": decimals1
+            }
+        return self._pairs[pair_address]
+
+    def quote_side(self, pair_address: str, quote_token: str) -> str:
+        """`quote` value that prices the pair in `quote_token` (e.g. WETH)"""
+        info = self.pair_info(pair_address)
+        if info["token0"].lower() == quote_token.lower():
+            return "token0"
+        if info["token1"].lower() == quote_token.lower():
+            return "token1"
+        raise ValueError(f"{quote_token} is not a token of {pair_address}")
+
+    def block_range(self, from_timestamp: int, to_timestamp: int):
+        """Blocks whose timestamps fall in [from_timestamp, to_timestamp]"""
+        latest, _ = self.timestamps.latest()
+        from_block = self.timestamps.block_at(from_timestamp, 0, latest)
+        to_block = self.timestamps.block_at(to_timestamp + 1, from_block, latest)
+        if self.timestamps.get(to_block) > to_timestamp:
+            to_block -= 1
+        return from_block, to_block
+
+    def fetch_swaps(self, pair_address: str, from_block: int, to_block: int) -> List:
+        return self.log_fetcher.get_logs({
+            "address": Web3.to_checksum_address(pair_address),
+            "topics": [[SWAP_TOPIC, SWAP_V3_TOPIC]]
+        }, from_block, to_block)
+
+    def price_series(self, pair_address: str, from_timestamp: int, to_timestamp: int,
+                     quote: str = "token1") -> Dict[str, np.ndarray]:
+        """Arrays "timestamp", "block", "price", "amount0", "amount1" (decimals-adjusted),
+        one entry per priced swap in block order. quote="token0" inverts the price."""
+        info = self.pair_info(pair_address)
+        from_block, to_block = self.block_range(from_timestamp, to_timestamp)
+        logs = self.fetch_swaps(pair_address, from_block, to_block) if from_block <= to_block else []
+        if not logs:
+            empty = np.array([], dtype=np.float64)
+            return {"timestamp": empty.astype(np.int64), "block": empty.astype(np.int64),
+                    "price": empty, "amount0": empty, "amount1": empty}
+
+        # A pool emits one of the two Swap shapes
+        is_v3 = Web3.to_hex(logs[0].topics[0]) == SWAP_V3_TOPIC
+        logs = [log for log in logs if Web3.to_hex(log.topics[0]) == (SWAP_V3_TOPIC if is_v3 else SWAP_TOPIC)]
+        decoded = decode_v3_swaps(logs) if is_v3 else decode_v2_swaps(logs)
+
+        scale0 = 10.0 ** info["decimals0"]
+        scale1 = 10.0 ** info["decimals1"]
+        price = decoded["raw_price"] * (scale0 / scale1)
+        if quote == "token0":
+            price = np.divide(1.0, price, out=np.full(len(price), np.nan), where=price > 0)
+
+        # One header per distinct block, broadcast back to the logs
+        blocks = np.fromiter((log.blockNumber for log in logs), dtype=np.int64, count=len(logs))
+        unique_blocks, inverse = np.unique(blocks, return_inverse=True)
+        block_times = self.timestamps.get_many(unique_blocks.tolist())
+        timestamps = np.array([block_times.get(n, 0) for n in unique_blocks.tolist()], dtype=np.int64)[inverse]
+
+        keep = np.isfinite(price) & (price > 0)
+        return {
+            "timestamp": timestamps[keep],
+            "block": blocks[keep],
+            "price": price[keep],
+            "amount0": decoded["amount0"][keep] / scale0,
+            "amount1": decoded["amount1"][keep] / scale1
+        }
+
+
+def price_history_engine(w3: Web3) -> PriceHistoryEngine:
+    """Engine on a web3 instance's endpoint"""
+    # PooledProvider carries its own client; plain HTTP providers get one on their URL
+    rpc = getattr(w3.provider, "rpc", None) or BatchRPCClient(w3.provider.endpoint_uri)
+    return PriceHistoryEngine(rpc, Multicall3(w3))
+
+
+def get_price_history(w3: Web3, pair_address: str, from_timestamp: int, to_timestamp: int, max_events=None,
+                      engine: Optional[PriceHistoryEngine] = None):
+    """[{"timestamp", "price"}] for the pair's swaps in the window (latest `max_events` if set)"""
+    try:
+        if engine is None:
+            engine = price_history_engine(w3)
+
+        series = engine.price_series(pair_address, from_timestamp, to_timestamp)
+        timestamps, prices = series["timestamp"], series["price"]
+        if max_events:
+            timestamps, prices = timestamps[-max_events:], prices[-max_events:]
 
-        logs = w3.eth.get_logs({
-            "address": pair_address,
-            "topics": [SWAP_TOPIC],
-            "fromBlock": "latest",
-            "toBlock": "latest"
-        })
-
-        prices = []
-        for log in logs[:max_events]:
-            block = w3.eth.get_block(log.blockNumber)
-            timestamp = block.timestamp
-
-            if timestamp < from_timestamp or timestamp > to_timestamp:
-                continue
-
-            data = log["data"]
-            decoded = decode_abi(["uint256", "uint256", "uint256", "uint256"], bytes.fromhex(data[2:]))
-
-            amount0_in, amount1_in, amount0_out, amount1_out = decoded
-            if amount0_in > 0 and amount1_out > 0:
-                price = amount1_out / amount0_in
-            elif amount1_in > 0 and amount0_out > 0:
-                price = amount0_out / amount1_in
-            else:
-                continue
-
-            prices.append({
-                "timestamp": datetime.utcfromtimestamp(timestamp).isoformat(),
-                "price": float(price)
-            })
-
-        return prices
+        return [{
+            "timestamp": datetime.utcfromtimestamp(timestamp).isoformat(),
+            "price": price
+        } for timestamp, price in zip(timestamps.tolist(), prices.tolist())]
 
     except Exception as e:
         print(f"Error fetching price history: {e}")
@@ -0,0 +1,109 @@
+# http_pool.py - Shared HTTP Connection Pools for RPC and REST Calls
+import gzip
+import threading
+from typing import Dict, Tuple
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from web3 import Web3
+
+try:
+    import httpx  # Optional: HTTP/2 via httpx[http2]
+    import h2  # noqa: F401
+except ImportError:
+    httpx = None
+
+DEFAULT_POOL_SIZE = 10  # Keep-alive connections per host
+GZIP_MIN_BYTES = 1024  # Smaller request bodies aren't worth compressing
+
+# Transport errors of either HTTP stack
+HTTP_ERRORS: Tuple = (requests.RequestException,) + ((httpx.HTTPError,) if httpx else ())
+
+_lock = threading.Lock()
+_session = None
+_http2_client = None
+_host_settings: Dict[str, Tuple[int, bool]] = {}  # host prefix -> (pool size, gzip requests)
+_web3_instances: Dict[str, Web3] = {}
+
+
+class PooledAdapter(HTTPAdapter):
+    """HTTPAdapter that can gzip large request bodies (for hosts known to accept it)"""
+
+    def __init__(self, gzip_requests: bool = False, **kwargs):
+        self.gzip_requests = gzip_requests
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        body = request.body
+        if self.gzip_requests and body and len(body) >= GZIP_MIN_BYTES and "Content-Encoding" not in request.headers:
+            request.body = gzip.compress(body if isinstance(body, bytes) else body.encode())
+            request.headers["Content-Encoding"] = "gzip"
+            request.headers["Content-Length"] = str(len(request.body))
+        return super().send(request, **kwargs)
+
+
+def _host_prefix(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}/"
+
+
+def get_session() -> requests.Session:
+    """Process-wide requests Session; connections are kept alive and reused across threads"""
+    global _session
+    with _lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = PooledAdapter(pool_connections=32, pool_maxsize=DEFAULT_POOL_SIZE)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers["Accept-Encoding"] = "gzip, deflate"
+            _session = session
+        return _session
+
+
+def configure_host(url: str, pool_size: int = DEFAULT_POOL_SIZE, gzip_requests: bool = False) -> requests.Session:
+    """Give the host of `url` its own keep-alive pool of `pool_size` connections"""
+    session = get_session()
+    prefix = _host_prefix(url)
+    with _lock:
+        current = _host_settings.get(prefix)
+        if current is not None and current[0] >= pool_size and current[1] == gzip_requests:
+            return session
+        pool_size = max(pool_size, current[0] if current else 0)
+        session.mount(prefix, PooledAdapter(gzip_requests=gzip_requests, pool_connections=1, pool_maxsize=pool_size))
+        _host_settings[prefix] = (pool_size, gzip_requests)
+    return session
+
+
+def get_http2_client():
+    """Shared httpx HTTP/2 client, None if httpx[http2] isn't installed"""
+    global _http2_client
+    if httpx is None:
+        return None
+    with _lock:
+        if _http2_client is None:
+            _http2_client = httpx.Client(http2=True, limits=httpx.Limits(max_keepalive_connections=32))
+        return _http2_client
+
+
+def rpc_session(url: str, pool_size: int = DEFAULT_POOL_SIZE, prefer_http2: bool = True):
+    """Client for JSON-RPC POSTs: HTTP/2 (one multiplexed connection per host) when
+    available, else the pooled requests Session. Both expose .post(url, json=, timeout=)."""
+    if prefer_http2:
+        client = get_http2_client()
+        if client is not None:
+            return client
+    return configure_host(url, pool_size)
+
+
+def get_web3(url: str, pool_size: int = DEFAULT_POOL_SIZE) -> Web3:
+    """Web3 over the shared Session, one instance per URL"""
+    with _lock:
+        w3 = _web3_instances.get(url)
+    if w3 is not None:
+        return w3
+
+    session = configure_host(url, pool_size)
+    w3 = Web3(Web3.HTTPProvider(url, session=session))
+    with _lock:
+        return _web3_instances.setdefault(url, w3)
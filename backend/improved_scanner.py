@@ -2,12 +2,24 @@
 from web3 import Web3
 from datetime import datetime
 import json
-import time
+from http_pool import get_web3
+from adaptive_limiter import get_limiter, retry_with_backoff
+from rpc_batch import BatchRPCClient
+from receipts import ReceiptsProvider
+from multicall import Multicall3, TokenMetadataReader
+from metadata_cache import CachedMetadataReader, MetadataCache
+from bytecode_filter import BytecodeClassifier
 
 class ImprovedScanner:
     def __init__(self):
-        self.w3 = Web3(Web3.HTTPProvider("https://mainnet.base.org"))
+        self.w3 = get_web3("https://mainnet.base.org")
         self.chain_name = "base"
+        self.rpc = BatchRPCClient("https://mainnet.base.org", batch_size=10)
+        # Sabit sleep yerine endpoint'in izin verdiği hıza uyan AIMD limiter
+        self.limiter = get_limiter("https://mainnet.base.org")
+        # Bytecode'u ERC-20 olamayacak contract'lar için eth_call harcama
+        self.bytecode_filter = BytecodeClassifier(self.rpc)
+        self.receipts = ReceiptsProvider(self.rpc, chain_id=8453)
         
         # ERC-20 ABI
         self.erc20_abi = [
@@ -16,92 +28,89 @@ class ImprovedScanner:
             {"constant": True, "inputs": [], "name": "decimals", "outputs": [{"name": "", "type": "uint8"}], "type": "function"},
             {"constant": True, "inputs": [], "name": "totalSupply", "outputs": [{"name": "", "type": "uint256"}], "type": "function"}
         ]
+        
+        # 4 metadata call'u token başına ayrı ayrı değil, Multicall3 ile toplu;
+        # daha önce görülen token'lar cache'ten gelir
+        self.metadata_reader = CachedMetadataReader(
+            TokenMetadataReader(Multicall3(self.w3)), MetadataCache(), chain_id=8453
+        )
     
-    def safe_contract_call(self, contract, function_name, delay=1):
-        """Rate limiting ile güvenli contract call"""
+    def safe_contract_call(self, contract, function_name):
+        """Adaptive limiter ve retry ile güvenli contract call"""
         try:
-            time.sleep(delay)  # Rate limiting
-            result = getattr(contract.functions, function_name)().call()
+            result = retry_with_backoff(getattr(contract.functions, function_name)().call, limiter=self.limiter)
             return result, None
         except Exception as e:
             return None, str(e)
     
-    def check_token_with_retry(self, contract_address, max_retries=3):
-        """Retry logic ile token kontrolü"""
-        print(f"\n🔍 Checking {contract_address} (with retry logic)...")
+    def check_tokens_with_retry(self, contract_addresses, max_retries=3):
+        """Retry logic ile toplu token kontrolü (tek Multicall3 çağrısı)"""
+        try:
+            # Rate limit / geçici hatalarda jitter'lı exponential backoff
+            raw_metadata = retry_with_backoff(
+                self.metadata_reader.read_many, contract_addresses,
+                limiter=self.limiter, max_retries=max_retries
+            )
+        except Exception as e:
+            print(f"   ❌ All attempts failed: {e}")
+            return {
+                address: {"is_token": False, "error": str(e), "attempts": max_retries}
+                for address in contract_addresses
+            }
         
-        for attempt in range(max_retries):
-            try:
-                contract = self.w3.eth.contract(
-                    address=Web3.to_checksum_address(contract_address), 
-                    abi=self.erc20_abi
-                )
-                
-                metadata = {}
-                token_functions_working = 0
-                
-                # Name check
-                name, error = self.safe_contract_call(contract, "name", delay=2)
-                if name:
-                    metadata["name"] = name
-                    token_functions_working += 1
-                    print(f"   ✅ Name: {name}")
-                else:
-                    print(f"   ❌ Name failed: {error}")
-                
-                # Symbol check
-                symbol, error = self.safe_contract_call(contract, "symbol", delay=2)
-                if symbol:
-                    metadata["symbol"] = symbol
-                    token_functions_working += 1
-                    print(f"   ✅ Symbol: {symbol}")
-                else:
-                    print(f"   ❌ Symbol failed: {error}")
-                
-                # Decimals check
-                decimals, error = self.safe_contract_call(contract, "decimals", delay=2)
-                if decimals is not None:
-                    metadata["decimals"] = decimals
-                    token_functions_working += 1
-                    print(f"   ✅ Decimals: {decimals}")
-                else:
-                    print(f"   ❌ Decimals failed: {error}")
-                
-                # Total Supply check
-                total_supply, error = self.safe_contract_call(contract, "totalSupply", delay=2)
-                if total_supply is not None:
-                    metadata["totalSupply"] = total_supply
-                    token_functions_working += 1
-                    
-                    if decimals:
-                        readable = total_supply / (10 ** decimals)
-                        metadata["readableSupply"] = readable
-                        print(f"   ✅ Supply: {readable:,.2f} {symbol or 'tokens'}")
-                    else:
-                        print(f"   ✅ Supply: {total_supply}")
-                else:
-                    print(f"   ❌ Total Supply failed: {error}")
-                
-                # Token olup olmadığını belirle
-                is_token = token_functions_working >= 2  # En az 2 function çalışmalı
-                metadata["is_token"] = is_token
-                metadata["functions_working"] = token_functions_working
-                
-                if is_token:
-                    print(f"   🎯 TOKEN FOUND! {metadata.get('symbol', 'UNKNOWN')}")
-                else:
-                    print(f"   ℹ️ Not a standard ERC-20 token ({token_functions_working}/4 functions work)")
-                
-                return metadata
-                
-            except Exception as e:
-                print(f"   ⚠️ Attempt {attempt + 1} failed: {e}")
-                if attempt < max_retries - 1:
-                    print(f"   🔄 Retrying in 5 seconds...")
-                    time.sleep(5)
+        results = {}
+        for contract_address in contract_addresses:
+            print(f"\n🔍 Checking {contract_address} (with retry logic)...")
+            raw = raw_metadata[Web3.to_checksum_address(contract_address)]
+            metadata = {}
+            
+            name, symbol, decimals, total_supply = raw["name"], raw["symbol"], raw["decimals"], raw["totalSupply"]
+            if name:
+                metadata["name"] = name
+                print(f"   ✅ Name: {name}")
+            else:
+                print(f"   ❌ Name failed")
+            
+            if symbol:
+                metadata["symbol"] = symbol
+                print(f"   ✅ Symbol: {symbol}")
+            else:
+                print(f"   ❌ Symbol failed")
+            
+            if decimals is not None:
+                metadata["decimals"] = decimals
+                print(f"   ✅ Decimals: {decimals}")
+            else:
+                print(f"   ❌ Decimals failed")
+            
+            if total_supply is not None:
+                metadata["totalSupply"] = total_supply
+                if decimals:
+                    readable = total_supply / (10 ** decimals)
+                    metadata["readableSupply"] = readable
+                    print(f"   ✅ Supply: {readable:,.2f} {symbol or 'tokens'}")
                 else:
-                    print(f"   ❌ All attempts failed")
-                    return {"is_token": False, "error": str(e), "attempts": max_retries}
+                    print(f"   ✅ Supply: {total_supply}")
+            else:
+                print(f"   ❌ Total Supply failed")
+            
+            # Token olup olmadığını belirle
+            token_functions_working = raw["functions_working"]
+            is_token = token_functions_working >= 2  # En az 2 function çalışmalı
+            metadata["is_token"] = is_token
+            metadata["functions_working"] = token_functions_working
+            
+            if is_token:
+                print(f"   🎯 TOKEN FOUND! {metadata.get('symbol', 'UNKNOWN')}")
+            else:
+                print(f"   ℹ️ Not a standard ERC-20 token ({token_functions_working}/4 functions work)")
+            
+            results[contract_address] = metadata
+        return results
+    
+    def check_token_with_retry(self, contract_address, max_retries=3):
+        """Retry logic ile token kontrolü"""
+        return self.check_tokens_with_retry([contract_address], max_retries)[contract_address]
 
 def main():
     print("🚀 Improved Scanner with Rate Limiting...")
@@ -123,12 +132,20 @@ def main():
             print(f"📦 Block {block_num}...", end="")
             
             try:
-                block = scanner.w3.eth.get_block(block_num, full_transactions=True)
+                block = retry_with_backoff(scanner.w3.eth.get_block, block_num, full_transactions=True,
+                                           limiter=scanner.limiter)
                 contract_count = 0
                 
+                # Contract deployment'ların receipt'lerini tek seferde al
+                deploy_hashes = [tx.hash for tx in block.transactions if tx.to is None]
+                receipts = scanner.receipts.get_receipts(block_num, deploy_hashes)
+                
                 for tx in block.transactions:
                     if tx.to is None:  # Contract deployment
-                        receipt = scanner.w3.eth.get_transaction_receipt(tx.hash)
+                        receipt = receipts.get(tx.hash)
+                        if receipt is None:
+                            receipt = retry_with_backoff(scanner.w3.eth.get_transaction_receipt, tx.hash,
+                                                         limiter=scanner.limiter)
                         if receipt.contractAddress:
                             found_contracts.append({
                                 "address": receipt.contractAddress,
@@ -138,23 +155,27 @@ def main():
                             contract_count += 1
                 
                 print(f" {contract_count} contracts")
-                time.sleep(0.5)  # Rate limiting
                 
             except Exception as e:
                 print(f" Error: {e}")
         
         print(f"\n📋 Found {len(found_contracts)} total contracts")
         
-        # İlk 3 contract'ı kontrol et (rate limiting için)
-        contracts_to_check = found_contracts[:3]
+        # Önce bytecode'dan token olabilecekleri ayır, sonra Multicall3 ile hepsini tek seferde kontrol et
+        classifications = scanner.bytecode_filter.classify_many([c["address"] for c in found_contracts])
+        contracts_to_check = [
+            c for c in found_contracts
+            if classifications[c["address"]] is None or classifications[c["address"]]["is_token_candidate"]
+        ]
+        print(f"🧬 {len(contracts_to_check)}/{len(found_contracts)} contracts look like tokens by bytecode")
         
         if contracts_to_check:
-            print(f"\n🔍 Checking first {len(contracts_to_check)} contracts for tokens...")
+            print(f"\n🔍 Checking {len(contracts_to_check)} contracts for tokens...")
             
+            checked = scanner.check_tokens_with_retry([c["address"] for c in contracts_to_check])
             results = []
-            for i, contract_info in enumerate(contracts_to_check, 1):
-                print(f"\n--- Contract {i}/{len(contracts_to_check)} ---")
-                metadata = scanner.check_token_with_retry(contract_info["address"])
+            for contract_info in contracts_to_check:
+                metadata = checked[contract_info["address"]]
                 
                 result = {
                     "contract_address": contract_info["address"],
@@ -0,0 +1,138 @@
+# log_fetcher.py - Adaptive eth_getLogs Range Fetcher
+import re
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, Iterator, List, Optional, Tuple
+from adaptive_limiter import is_rate_limited
+from rpc_batch import BatchRPCClient, format_log
+
+# How providers say a log query was too big (result count, block span or response size).
+# Specific phrases only: generic "limit"/"exceeded" also match plan quota errors,
+# and splitting the range doesn't help against those.
+RANGE_LIMIT_HINTS = (
+    "query returned more than",       # Infura, Alchemy, geth-style nodes
+    "logs matched by query exceeds",  # geth/op-geth result cap
+    "response size exceeded",         # Alchemy
+    "response size should not",       # Ankr
+    "block range",                    # "exceed maximum block range", "block range limit exceeded", ...
+    "range too large", "range is too large", "range too wide", "range is too wide",
+    "too many blocks",
+    "is limited to a",                # QuickNode: "eth_getLogs is limited to a 10,000 range"
+    "query timeout exceeded",
+    "returned too much"
+)
+# Alchemy/Infura-style hint: "... this block range should work: [0x1, 0x2]"
+SUGGESTED_RANGE = re.compile(r"\[\s*(0x[0-9a-fA-F]+)\s*,\s*(0x[0-9a-fA-F]+)\s*\]")
+
+
+def is_range_error(error: Exception) -> bool:
+    """True if the provider refused the query because of its size, not because it's down"""
+    if is_rate_limited(error):
+        return False  # "rate limit exceeded" is about us, not the range
+    message = str(getattr(error, "message", None) or error).lower()
+    return any(hint in message for hint in RANGE_LIMIT_HINTS)
+
+
+def suggested_span(error: Exception) -> Optional[int]:
+    """Block span the provider says would work, if the error names one"""
+    match = SUGGESTED_RANGE.search(str(getattr(error, "message", None) or error))
+    if not match:
+        return None
+    return int(match.group(2), 16) - int(match.group(1), 16) + 1
+
+
+class LogRangeFetcher:
+    """eth_getLogs over any block range, within the provider's limits.
+
+    Windows start at `initial_range` blocks. A window the provider refuses
+    is bisected (or cut to the span the error suggests) and the window size
+    shrinks for the rest of the scan; windows that come back sparse grow it
+    again. Windows run concurrently and logs come out in block order.
+    The learned size is kept, so share one fetcher per chain."""
+
+    def __init__(self, rpc: BatchRPCClient, initial_range: int = 2000, min_range: int = 1,
+                 max_range: int = 100000, target_results: int = 2000, max_workers: int = 4):
+        self.rpc = rpc
+        self.min_range = max(1, min_range)
+        self.max_range = max(max_range, self.min_range)
+        self.range_size = min(max(initial_range, self.min_range), self.max_range)
+        self.target_results = target_results  # Log count per window we aim for
+        self.max_workers = max(1, max_workers)
+        self.splits = 0
+        self._lock = threading.Lock()
+
+    def _shrink(self, span: int, error: Exception):
+        with self._lock:
+            self.splits += 1
+            suggested = suggested_span(error)
+            limit = suggested if suggested else span // 2
+            self.range_size = max(self.min_range, min(self.range_size, limit))
+
+    def _adapt(self, span: int, count: int):
+        """Grow after sparse windows, shrink toward the target after dense ones"""
+        with self._lock:
+            # Relative to the window's own span, so concurrent windows don't compound
+            if count > self.target_results:
+                self.range_size = max(self.min_range, min(self.range_size, span // 2))
+            elif count < self.target_results // 4 and span >= self.range_size:
+                self.range_size = min(self.max_range, span * 2)
+
+    def _get_window(self, log_filter: Dict, from_block: int, to_block: int) -> List:
+        try:
+            raw_logs = self.rpc.call("eth_getLogs", [{
+                **log_filter,
+                "fromBlock": hex(from_block),
+                "toBlock": hex(to_block)
+            }])
+        except Exception as e:
+            if from_block == to_block or not is_range_error(e):
+                raise
+            self._shrink(to_block - from_block + 1, e)
+            suggested = suggested_span(e)
+            if suggested and suggested < to_block - from_block + 1:
+                middle = from_block + suggested - 1
+            else:
+                middle = (from_block + to_block) // 2
+            return self._get_window(log_filter, from_block, middle) + self._get_window(log_filter, middle + 1, to_block)
+
+        logs = [format_log(raw) for raw in raw_logs or []]
+        self._adapt(to_block - from_block + 1, len(logs))
+        return logs
+
+    def iter_windows(self, log_filter: Dict, from_block: int, to_block: int) -> Iterator[Tuple[int, int, List]]:
+        """(window start, window end, logs) over [from_block, to_block], in block order.
+        `log_filter` holds address/topics; the block bounds are set per window."""
+        if from_block > to_block:
+            return
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="get-logs") as executor:
+            pending = {}  # future -> (window start, window end)
+            done: Dict[int, Tuple[int, List]] = {}  # window start -> (end, logs), finished out of order
+            next_start = from_block  # First block not submitted yet
+            next_yield = from_block  # First block not yielded yet
+            try:
+                while next_yield <= to_block:
+                    while next_start <= to_block and len(pending) < self.max_workers:
+                        end = min(next_start + self.range_size - 1, to_block)
+                        pending[executor.submit(self._get_window, log_filter, next_start, end)] = (next_start, end)
+                        next_start = end + 1
+
+                    finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        start, end = pending.pop(future)
+                        done[start] = (end, future.result())
+
+                    # Hand out finished windows up to the first one still running
+                    while next_yield in done:
+                        end, logs = done.pop(next_yield)
+                        yield next_yield, end, logs
+                        next_yield = end + 1
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    def get_logs(self, log_filter: Dict, from_block: int, to_block: int) -> List:
+        """All logs matching `log_filter` in [from_block, to_block], in block order"""
+        logs = []
+        for _, _, window_logs in self.iter_windows(log_filter, from_block, to_block):
+            logs.extend(window_logs)
+        return logs
@@ -1,10 +1,15 @@
 # lp_checker.py - Liquidity Pool Detection
 from web3 import Web3
-import time
+from http_pool import get_web3
+from multicall import Multicall3
+from lp_probe import LPProbe
+from lp_resolver import LPResolver, UNISWAP_V2_INIT_CODE_HASH, UNISWAP_V3_INIT_CODE_HASH
+from rpc_batch import BatchRPCClient
+from pool_index import PoolIndex
 
 class LPChecker:
     def __init__(self):
-        self.w3 = Web3(Web3.HTTPProvider("https://mainnet.base.org"))
+        self.w3 = get_web3("https://mainnet.base.org")
         
         # Base network addresses
         self.WETH_ADDRESS = "0x4200000000000000000000000000000000000006"  # Base WETH
@@ -15,54 +20,48 @@ class LPChecker:
         # Uniswap V3 Factory on Base  
         self.UNISWAP_V3_FACTORY = "0x33128a8fC17869897dcE68Ed026d694621f6FDfD"
         
-        # Factory ABI'ları
-        self.v2_factory_abi = [{
-            "constant": True,
-            "inputs": [
-                {"internalType": "address", "name": "tokenA", "type": "address"},
-                {"internalType": "address", "name": "tokenB", "type": "address"}
-            ],
-            "name": "getPair",
-            "outputs": [{"internalType": "address", "name": "pair", "type": "address"}],
-            "stateMutability": "view",
-            "type": "function"
-        }]
-        
-        self.v3_factory_abi = [{
-            "constant": True,
-            "inputs": [
-                {"internalType": "address", "name": "tokenA", "type": "address"},
-                {"internalType": "address", "name": "tokenB", "type": "address"},
-                {"internalType": "uint24", "name": "fee", "type": "uint24"}
-            ],
-            "name": "getPool",
-            "outputs": [{"internalType": "address", "name": "pool", "type": "address"}],
-            "stateMutability": "view",
-            "type": "function"
-        }]
-        
         # V3 fee tiers
         self.v3_fees = [500, 3000, 10000]  # 0.05%, 0.3%, 1%
+        
+        # V2 getPair + tüm V3 fee tier'ları tek Multicall3 çağrısında
+        self.lp_probe = LPProbe(
+            Multicall3(self.w3),
+            self.WETH_ADDRESS,
+            self.UNISWAP_V2_FACTORY,
+            self.UNISWAP_V3_FACTORY,
+            self.v3_fees
+        )
+        
+        # Pool adreslerini CREATE2 ile lokal hesapla, tek eth_getCode batch'i ile doğrula
+        self.rpc = BatchRPCClient("https://mainnet.base.org", batch_size=50)
+        self.lp_resolver = LPResolver(
+            self.rpc,
+            self.WETH_ADDRESS,
+            self.UNISWAP_V2_FACTORY,
+            self.UNISWAP_V3_FACTORY,
+            UNISWAP_V2_INIT_CODE_HASH,
+            UNISWAP_V3_INIT_CODE_HASH,
+            self.v3_fees,
+            fallback_probe=self.lp_probe
+        )
+        
+        # PairCreated/PoolCreated log index: bilinen token'lar için RPC yok
+        self.pool_index = PoolIndex(self.rpc, 8453, self.UNISWAP_V2_FACTORY, self.UNISWAP_V3_FACTORY)
+        self.pool_index.load()
+        self.lp_resolver.add_known_pools(self.pool_index.pool_addresses)
+    
+    @staticmethod
+    def _v3_pool_list(v3_pools):
+        return [
+            {"pool_address": pool, "fee_tier": fee, "fee_percent": fee / 10000}
+            for fee, pool in v3_pools.items()
+        ]
     
     def check_v2_lp(self, token_address):
         """Uniswap V2 LP kontrolü"""
         try:
-            factory = self.w3.eth.contract(
-                address=Web3.to_checksum_address(self.UNISWAP_V2_FACTORY),
-                abi=self.v2_factory_abi
-            )
-            
-            pair_address = factory.functions.getPair(
-                Web3.to_checksum_address(token_address),
-                Web3.to_checksum_address(self.WETH_ADDRESS)
-            ).call()
-            
-            # Zero address check
-            if int(pair_address, 16) == 0:
-                return False, None
-            else:
-                return True, pair_address
-                
+            pair_address = self.lp_resolver.resolve(token_address)["v2_pair"]
+            return pair_address is not None, pair_address
         except Exception as e:
             print(f"   ⚠️ V2 LP check error: {e}")
             return False, None
@@ -70,82 +69,91 @@ class LPChecker:
     def check_v3_lp(self, token_address):
         """Uniswap V3 LP kontrolü (tüm fee tier'lar)"""
         try:
-            factory = self.w3.eth.contract(
-                address=Web3.to_checksum_address(self.UNISWAP_V3_FACTORY),
-                abi=self.v3_factory_abi
-            )
-            
-            pools_found = []
-            
-            for fee in self.v3_fees:
-                try:
-                    pool_address = factory.functions.getPool(
-                        Web3.to_checksum_address(token_address),
-                        Web3.to_checksum_address(self.WETH_ADDRESS),
-                        fee
-                    ).call()
-                    
-                    if int(pool_address, 16) != 0:
-                        pools_found.append({
-                            "pool_address": pool_address,
-                            "fee_tier": fee,
-                            "fee_percent": fee / 10000
-                        })
-                        
-                except Exception as e:
-                    print(f"   ⚠️ V3 fee {fee} error: {e}")
-            
+            pools_found = self._v3_pool_list(self.lp_resolver.resolve(token_address)["v3_pools"])
             return len(pools_found) > 0, pools_found
-            
         except Exception as e:
             print(f"   ⚠️ V3 LP check error: {e}")
             return False, []
     
+    def _sync_pool_index(self):
+        """Index'i head'e kadar güncelle; head'i kapsıyorsa True"""
+        try:
+            head = int(self.rpc.call("eth_blockNumber"), 16)
+            self.pool_index.sync(head)
+            self.lp_resolver.add_known_pools(self.pool_index.pool_addresses)
+        except Exception as e:
+            print(f"   ⚠️ Pool index sync error: {e}")
+            return False
+        return self.pool_index.from_block is not None and self.pool_index.covers(self.pool_index.from_block, head)
+    
+    def check_many_liquidity(self, tokens):
+        """Birden fazla token için tüm LP'leri tek seferde kontrol et.
+        tokens: [{"address": ..., "symbol": ...}]"""
+        # Index'te olan token'lar O(1), kalanlar tek batch ile. Index yalnızca head'e kadar
+        # sync olduysa kullanılır; geride kalmış index sonradan açılan pool'ları bilmez.
+        indexed = set()
+        if self._sync_pool_index():
+            indexed = {token["address"] for token in tokens if self.pool_index.pools_for(token["address"])}
+        try:
+            pools = self.lp_resolver.resolve_many([t["address"] for t in tokens if t["address"] not in indexed])
+        except Exception as e:
+            print(f"   ⚠️ LP check error: {e}")
+            pools = {}
+        
+        results = []
+        for token in tokens:
+            token_address = token["address"]
+            token_symbol = token.get("symbol", "TOKEN")
+            print(f"\n💧 Checking liquidity for {token_symbol} ({token_address})...")
+            
+            if token_address in indexed:
+                summary = self.pool_index.lp_summary(token_address, self.WETH_ADDRESS)
+                entry = {
+                    "v2_pair": summary["v2_pair"],
+                    "v3_pools": {p["fee_tier"]: p["pool_address"] for p in summary["v3_pools"]}
+                }
+            else:
+                entry = pools.get(Web3.to_checksum_address(token_address), {"v2_pair": None, "v3_pools": {}})
+            result = {
+                "token_address": token_address,
+                "token_symbol": token_symbol,
+                "v2_lp": {"exists": False, "pair_address": None},
+                "v3_lp": {"exists": False, "pools": []},
+                "has_liquidity": False
+            }
+            
+            # V2 sonucu
+            v2_pair = entry["v2_pair"]
+            if v2_pair:
+                print(f"   ✅ V2 LP found: {v2_pair}")
+                result["v2_lp"] = {"exists": True, "pair_address": v2_pair}
+            else:
+                print("   ❌ No V2 LP")
+            
+            # V3 sonucu
+            v3_pools = self._v3_pool_list(entry["v3_pools"])
+            if v3_pools:
+                print(f"   ✅ V3 LP found: {len(v3_pools)} pools")
+                for pool in v3_pools:
+                    print(f"      Pool: {pool['pool_address']} (Fee: {pool['fee_percent']}%)")
+                result["v3_lp"] = {"exists": True, "pools": v3_pools}
+            else:
+                print("   ❌ No V3 LP")
+            
+            # Genel sonuç
+            result["has_liquidity"] = bool(v2_pair or v3_pools)
+            
+            if result["has_liquidity"]:
+                print(f"   🎯 {token_symbol} HAS LIQUIDITY!")
+            else:
+                print(f"   📝 {token_symbol} has no liquidity yet")
+            
+            results.append(result)
+        return results
+    
     def check_token_liquidity(self, token_address, token_symbol="TOKEN"):
         """Token için tüm LP'leri kontrol et"""
-        print(f"\n💧 Checking liquidity for {token_symbol} ({token_address})...")
-        
-        result = {
-            "token_address": token_address,
-            "token_symbol": token_symbol,
-            "v2_lp": {"exists": False, "pair_address": None},
-            "v3_lp": {"exists": False, "pools": []},
-            "has_liquidity": False
-        }
-        
-        # V2 kontrolü
-        print("   🔍 Checking Uniswap V2...")
-        time.sleep(1)
-        v2_exists, v2_pair = self.check_v2_lp(token_address)
-        
-        if v2_exists:
-            print(f"   ✅ V2 LP found: {v2_pair}")
-            result["v2_lp"] = {"exists": True, "pair_address": v2_pair}
-        else:
-            print("   ❌ No V2 LP")
-        
-        # V3 kontrolü
-        print("   🔍 Checking Uniswap V3...")
-        time.sleep(1)
-        v3_exists, v3_pools = self.check_v3_lp(token_address)
-        
-        if v3_exists:
-            print(f"   ✅ V3 LP found: {len(v3_pools)} pools")
-            for pool in v3_pools:
-                print(f"      Pool: {pool['pool_address']} (Fee: {pool['fee_percent']}%)")
-            result["v3_lp"] = {"exists": True, "pools": v3_pools}
-        else:
-            print("   ❌ No V3 LP")
-        
-        # Genel sonuç
-        result["has_liquidity"] = v2_exists or v3_exists
-        
-        if result["has_liquidity"]:
-            print(f"   🎯 {token_symbol} HAS LIQUIDITY!")
-        else:
-            print(f"   📝 {token_symbol} has no liquidity yet")
-        
-        return result
+        return self.check_many_liquidity([{"address": token_address, "symbol": token_symbol}])[0]
 
 def main():
     print("🚀 LP Checker - Finding Liquidity Pools...")
@@ -157,11 +165,7 @@ def main():
     ]
     
     checker = LPChecker()
-    results = []
-    
-    for token in tokens_to_check:
-        lp_result = checker.check_token_liquidity(token["address"], token["symbol"])
-        results.append(lp_result)
+    results = checker.check_many_liquidity(tokens_to_check)
     
     # Sonuçları kaydet
     import json
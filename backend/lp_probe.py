@@ -0,0 +1,75 @@
+# lp_probe.py - Batched Uniswap V2/V3 LP Discovery
+from typing import Dict, List, Optional, Sequence
+from eth_abi import decode, encode
+from web3 import Web3
+from multicall import Multicall3, function_selector
+
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+V3_FEE_TIERS = [500, 3000, 10000]  # 0.05%, 0.3%, 1%
+
+GET_PAIR_SELECTOR = function_selector("getPair(address,address)")
+GET_POOL_SELECTOR = function_selector("getPool(address,address,uint24)")
+
+
+def decode_address(data: bytes) -> Optional[str]:
+    """Decode an address return value, None for zero/garbage"""
+    if len(data) < 32:
+        return None
+    address = decode(["address"], data[:32])[0]
+    if int(address, 16) == 0:
+        return None
+    return Web3.to_checksum_address(address)
+
+
+class LPProbe:
+    """Evaluates getPair and every getPool fee tier for many tokens in one
+    aggregated Multicall3 call"""
+
+    def __init__(self, multicall: Multicall3, weth_address: str, v2_factory: str, v3_factory: str,
+                 v3_fees: Sequence[int] = V3_FEE_TIERS):
+        self.multicall = multicall
+        # Checksum once here instead of per token
+        self.weth_address = Web3.to_checksum_address(weth_address)
+        self.v2_factory = None if int(v2_factory, 16) == 0 else Web3.to_checksum_address(v2_factory)
+        self.v3_factory = None if int(v3_factory, 16) == 0 else Web3.to_checksum_address(v3_factory)
+        self.v3_fees = list(v3_fees)
+
+    def _calls_for(self, token: str) -> List:
+        calls = []
+        if self.v2_factory:
+            calls.append((self.v2_factory, GET_PAIR_SELECTOR + encode(["address", "address"], [token, self.weth_address])))
+        if self.v3_factory:
+            for fee in self.v3_fees:
+                calls.append((self.v3_factory, GET_POOL_SELECTOR + encode(
+                    ["address", "address", "uint24"], [token, self.weth_address, fee]
+                )))
+        return calls
+
+    def probe_many(self, token_addresses: Sequence[str]) -> Dict[str, Dict]:
+        """Pool addresses per token: {"v2_pair": address|None, "v3_pools": {fee: address}}"""
+        tokens = [Web3.to_checksum_address(t) for t in token_addresses]
+        calls = []
+        for token in tokens:
+            calls.extend(self._calls_for(token))
+        results = self.multicall.try_aggregate(calls) if calls else []
+
+        pools = {}
+        index = 0
+        for token in tokens:
+            entry = {"v2_pair": None, "v3_pools": {}}
+            if self.v2_factory:
+                ok, data = results[index]
+                index += 1
+                entry["v2_pair"] = decode_address(data) if ok else None
+            if self.v3_factory:
+                for fee in self.v3_fees:
+                    ok, data = results[index]
+                    index += 1
+                    pool = decode_address(data) if ok else None
+                    if pool:
+                        entry["v3_pools"][fee] = pool
+            pools[token] = entry
+        return pools
+
+    def probe(self, token_address: str) -> Dict:
+        return self.probe_many([token_address])[Web3.to_checksum_address(token_address)]
@@ -0,0 +1,124 @@
+# lp_resolver.py - Offline Uniswap V2/V3 Pool Address Computation
+from typing import Dict, Iterable, List, Optional, Sequence
+from eth_abi import encode
+from hexbytes import HexBytes
+from web3 import Web3
+from lp_probe import LPProbe, V3_FEE_TIERS
+from rpc_batch import BatchRPCClient
+
+# Canonical init code hashes (forks that reuse the Uniswap bytecode share them)
+UNISWAP_V2_INIT_CODE_HASH = "0x96e8ac4277198ff8b6f785478aa9a39f403cb768dd02cbee326c3e7da348845f"
+UNISWAP_V3_INIT_CODE_HASH = "0xe34f199b19b2b4f47f68442619d555527d244f78a3297ea89325f843f87b8b54"
+# QuickSwap (Polygon) deploys unmodified Uniswap V2 pairs, checked against its
+# WMATIC/USDC.e pair 0x6e7a5FAFcec6BB1e78bAE2A1F0B612012BF14827 in test_lp_resolver.py
+QUICKSWAP_V2_INIT_CODE_HASH = UNISWAP_V2_INIT_CODE_HASH
+
+
+def sort_tokens(token_a: str, token_b: str):
+    """Uniswap orders pair tokens by address value"""
+    a, b = Web3.to_checksum_address(token_a), Web3.to_checksum_address(token_b)
+    return (a, b) if int(a, 16) < int(b, 16) else (b, a)
+
+
+def compute_create2_address(deployer: str, salt: bytes, init_code_hash: str) -> str:
+    """keccak(0xff ++ deployer ++ salt ++ init_code_hash)[12:]"""
+    digest = Web3.keccak(b"\xff" + HexBytes(deployer) + salt + HexBytes(init_code_hash))
+    return Web3.to_checksum_address(digest[12:])
+
+
+def compute_v2_pair_address(factory: str, token_a: str, token_b: str, init_code_hash: str) -> str:
+    token0, token1 = sort_tokens(token_a, token_b)
+    salt = Web3.keccak(HexBytes(token0) + HexBytes(token1))  # abi.encodePacked
+    return compute_create2_address(factory, salt, init_code_hash)
+
+
+def compute_v3_pool_address(factory: str, token_a: str, token_b: str, fee: int, init_code_hash: str) -> str:
+    token0, token1 = sort_tokens(token_a, token_b)
+    salt = Web3.keccak(encode(["address", "address", "uint24"], [token0, token1, fee]))  # abi.encode
+    return compute_create2_address(factory, salt, init_code_hash)
+
+
+class LPResolver:
+    """Computes candidate V2 pair / V3 pool addresses locally and confirms
+    them against a known-pools index or one batched eth_getCode.
+
+    Chains whose DEX init code hash isn't configured fall back to the
+    on-chain factory probe."""
+
+    def __init__(self, rpc: BatchRPCClient, weth_address: str, v2_factory: str, v3_factory: str,
+                 v2_init_code_hash: str = "", v3_init_code_hash: str = "",
+                 v3_fees: Sequence[int] = V3_FEE_TIERS, fallback_probe: Optional[LPProbe] = None):
+        self.rpc = rpc
+        self.weth_address = Web3.to_checksum_address(weth_address)
+        self.v2_factory = None if int(v2_factory, 16) == 0 else Web3.to_checksum_address(v2_factory)
+        self.v3_factory = None if int(v3_factory, 16) == 0 else Web3.to_checksum_address(v3_factory)
+        self.v2_init_code_hash = v2_init_code_hash
+        self.v3_init_code_hash = v3_init_code_hash
+        self.v3_fees = list(v3_fees)
+        self.fallback_probe = fallback_probe
+        self.known_pools = set()  # Lower-case pool addresses known to exist
+
+    @property
+    def can_compute(self) -> bool:
+        """True if every configured factory has an init code hash"""
+        return (not self.v2_factory or bool(self.v2_init_code_hash)) and \
+               (not self.v3_factory or bool(self.v3_init_code_hash))
+
+    def add_known_pools(self, pool_addresses: Iterable[str]):
+        self.known_pools.update(address.lower() for address in pool_addresses)
+
+    def candidate_pools(self, token_address: str) -> Dict:
+        """Deterministic pool addresses for a token/WETH pair, no RPC"""
+        candidates = {"v2_pair": None, "v3_pools": {}}
+        if self.v2_factory:
+            candidates["v2_pair"] = compute_v2_pair_address(
+                self.v2_factory, token_address, self.weth_address, self.v2_init_code_hash
+            )
+        if self.v3_factory:
+            for fee in self.v3_fees:
+                candidates["v3_pools"][fee] = compute_v3_pool_address(
+                    self.v3_factory, token_address, self.weth_address, fee, self.v3_init_code_hash
+                )
+        return candidates
+
+    def _existing(self, addresses: List[str]) -> set:
+        """Subset of addresses that have code, known pools answered without RPC"""
+        existing = {a for a in addresses if a.lower() in self.known_pools}
+        unknown = [a for a in addresses if a not in existing]
+        if unknown:
+            codes = self.rpc.batch([("eth_getCode", [address, "latest"]) for address in unknown])
+            for address, code in zip(unknown, codes):
+                if isinstance(code, Exception):
+                    raise code
+                if code not in (None, "0x", "0x0", ""):
+                    existing.add(address)
+                    self.known_pools.add(address.lower())
+        return existing
+
+    def resolve_many(self, token_addresses: Sequence[str]) -> Dict[str, Dict]:
+        """Pool addresses per token, same shape as LPProbe.probe_many"""
+        if not self.can_compute:
+            if self.fallback_probe is None:
+                raise ValueError("No init code hash configured and no fallback probe")
+            return self.fallback_probe.probe_many(token_addresses)
+
+        tokens = [Web3.to_checksum_address(t) for t in token_addresses]
+        candidates = {token: self.candidate_pools(token) for token in tokens}
+
+        addresses = []
+        for entry in candidates.values():
+            if entry["v2_pair"]:
+                addresses.append(entry["v2_pair"])
+            addresses.extend(entry["v3_pools"].values())
+        existing = self._existing(addresses)
+
+        pools = {}
+        for token, entry in candidates.items():
+            pools[token] = {
+                "v2_pair": entry["v2_pair"] if entry["v2_pair"] in existing else None,
+                "v3_pools": {fee: pool for fee, pool in entry["v3_pools"].items() if pool in existing}
+            }
+        return pools
+
+    def resolve(self, token_address: str) -> Dict:
+        return self.resolve_many([token_address])[Web3.to_checksum_address(token_address)]
@@ -0,0 +1,194 @@
+# metadata_cache.py - Persistent Token Metadata Cache
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Sequence, Tuple
+from web3 import Web3
+from multicall import TokenMetadataReader
+
+# Fixed at deployment, fetched once per token
+IMMUTABLE_FIELDS = ("name", "symbol", "decimals")
+
+
+class MetadataCache:
+    """Token metadata per (chain_id, address) in SQLite, with an in-process LRU in front.
+
+    name/symbol/decimals are stored for good once read. Failed reads are
+    kept as None so non-tokens aren't re-probed on every scan, but only for
+    `negative_ttl` seconds: a failure can also be a node that hasn't seen
+    the deployment yet. totalSupply carries its fetch time and goes stale
+    after `supply_ttl` seconds."""
+
+    def __init__(self, path: str = os.path.join("cache", "token_metadata.sqlite"),
+                 lru_size: int = 10000, supply_ttl: float = 3600, negative_ttl: float = 600):
+        self.path = path
+        self.lru_size = lru_size
+        self.supply_ttl = supply_ttl
+        self.negative_ttl = negative_ttl
+        self._lru: "OrderedDict[Tuple[int, str], Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        # One connection shared by the scanner threads, serialized by _lock
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS token_metadata (
+                chain_id INTEGER NOT NULL,
+                address TEXT NOT NULL,
+                name TEXT,
+                symbol TEXT,
+                decimals INTEGER,
+                total_supply TEXT,
+                supply_updated_at REAL,
+                checked_at REAL,
+                PRIMARY KEY (chain_id, address)
+            )
+        """)
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(token_metadata)")}
+        if "checked_at" not in columns:  # Cache written before failed reads expired
+            self._db.execute("ALTER TABLE token_metadata ADD COLUMN checked_at REAL")
+        self._db.commit()
+
+    @staticmethod
+    def _key(chain_id: int, address: str) -> Tuple[int, str]:
+        return chain_id, address.lower()
+
+    def _remember(self, key: Tuple[int, str], entry: Dict):
+        self._lru[key] = entry
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.lru_size:
+            self._lru.popitem(last=False)
+
+    def get_many(self, chain_id: int, token_addresses: Sequence[str]) -> Dict[str, Dict]:
+        """Cached entries by lower-case address; tokens never seen are left out"""
+        found = {}
+        missing = []
+        with self._lock:
+            for address in token_addresses:
+                key = self._key(chain_id, address)
+                if key in self._lru:
+                    self._lru.move_to_end(key)
+                    found[key[1]] = self._lru[key]
+                else:
+                    missing.append(key[1])
+
+            # SQLite caps bound parameters per statement
+            for start in range(0, len(missing), 500):
+                chunk = missing[start:start + 500]
+                rows = self._db.execute(
+                    "SELECT address, name, symbol, decimals, total_supply, supply_updated_at, checked_at "
+                    f"FROM token_metadata WHERE chain_id = ? AND address IN ({','.join('?' * len(chunk))})",
+                    [chain_id, *chunk]
+                ).fetchall()
+                for address, name, symbol, decimals, total_supply, supply_updated_at, checked_at in rows:
+                    entry = {
+                        "name": name,
+                        "symbol": symbol,
+                        "decimals": decimals,
+                        # uint256 doesn't fit an SQLite INTEGER
+                        "totalSupply": int(total_supply) if total_supply is not None else None,
+                        "supply_updated_at": supply_updated_at,
+                        "checked_at": checked_at
+                    }
+                    self._remember((chain_id, address), entry)
+                    found[address] = entry
+        return found
+
+    def put_many(self, chain_id: int, metadata: Dict[str, Dict]):
+        """Store reader output ({address: {name, symbol, decimals, totalSupply}})"""
+        now = time.time()
+        rows = []
+        with self._lock:
+            for address, raw in metadata.items():
+                entry = {field: raw.get(field) for field in IMMUTABLE_FIELDS}
+                entry["totalSupply"] = raw.get("totalSupply")
+                # A missing supply isn't fresh: leave it unstamped so the next read retries it
+                entry["supply_updated_at"] = raw.get(
+                    "supply_updated_at", now if entry["totalSupply"] is not None else None
+                )
+                entry["checked_at"] = raw.get("checked_at", now)
+                key = self._key(chain_id, address)
+                self._remember(key, entry)
+                rows.append((
+                    chain_id, key[1], entry["name"], entry["symbol"], entry["decimals"],
+                    str(entry["totalSupply"]) if entry["totalSupply"] is not None else None,
+                    entry["supply_updated_at"], entry["checked_at"]
+                ))
+            self._db.executemany(
+                "INSERT OR REPLACE INTO token_metadata (chain_id, address, name, symbol, decimals, "
+                "total_supply, supply_updated_at, checked_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows
+            )
+            self._db.commit()
+
+    def supply_is_fresh(self, entry: Dict) -> bool:
+        updated_at = entry.get("supply_updated_at")
+        return updated_at is not None and time.time() - updated_at < self.supply_ttl
+
+    def needs_recheck(self, entry: Dict) -> bool:
+        """True if a failed name/symbol/decimals read has expired"""
+        if all(entry.get(field) is not None for field in IMMUTABLE_FIELDS):
+            return False
+        checked_at = entry.get("checked_at")
+        return checked_at is None or time.time() - checked_at >= self.negative_ttl
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class CachedMetadataReader:
+    """TokenMetadataReader with a MetadataCache in front (same read_many interface).
+
+    Unseen tokens and expired failed reads get the full 4-call read, tokens
+    whose totalSupply went stale only a totalSupply call, fresh tokens no
+    call at all. A failed call never overwrites a value read before."""
+
+    def __init__(self, reader: TokenMetadataReader, cache: MetadataCache, chain_id: int):
+        self.reader = reader
+        self.cache = cache
+        self.chain_id = chain_id
+
+    def read_many(self, token_addresses: Sequence[str], block: Optional[int] = None) -> Dict[str, Dict]:
+        """`block` pins the first read of unseen tokens (supply refreshes read latest)"""
+        addresses = [Web3.to_checksum_address(a) for a in token_addresses]
+        cached = self.cache.get_many(self.chain_id, addresses)
+
+        unseen = [a for a in addresses if a.lower() not in cached or self.cache.needs_recheck(cached[a.lower()])]
+        stale = [a for a in addresses if a.lower() in cached and a not in unseen
+                 and not self.cache.supply_is_fresh(cached[a.lower()])]
+
+        fetched = {}
+        if unseen:
+            for address, raw in self.reader.read_many(unseen, block=block).items():
+                previous = cached.get(address.lower(), {})
+                entry = {field: raw[field] if raw[field] is not None else previous.get(field)
+                         for field in (*IMMUTABLE_FIELDS, "totalSupply")}
+                if raw["totalSupply"] is None and previous.get("supply_updated_at") is not None:
+                    entry["supply_updated_at"] = previous["supply_updated_at"]
+                fetched[address] = entry
+        if stale:
+            supplies = self.reader.read_many(stale, fields=("totalSupply",))
+            for address in stale:
+                if supplies[address]["totalSupply"] is None:
+                    continue  # Refresh failed: keep the old value, retry next time
+                entry = dict(cached[address.lower()])
+                entry["totalSupply"] = supplies[address]["totalSupply"]
+                entry.pop("supply_updated_at", None)
+                fetched[address] = entry
+        if fetched:
+            self.cache.put_many(self.chain_id, fetched)
+            cached = self.cache.get_many(self.chain_id, addresses)
+
+        metadata = {}
+        for address in addresses:
+            entry = cached[address.lower()]
+            token = {field: entry[field] for field in (*IMMUTABLE_FIELDS, "totalSupply")}
+            token["functions_working"] = sum(1 for value in token.values() if value is not None)
+            metadata[address] = token
+        return metadata
+
+    def read(self, token_address: str) -> Dict:
+        return self.read_many([token_address])[Web3.to_checksum_address(token_address)]
@@ -0,0 +1,176 @@
+# multicall.py - Multicall3 Aggregated Contract Reads
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from eth_abi import decode, encode
+from web3 import Web3
+from web3.exceptions import ContractLogicError
+from http_pool import HTTP_ERRORS
+from rpc_batch import is_pruned_state_error
+
+# Same address on every chain Multicall3 is deployed to (incl. OP Stack preinstalls)
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+
+
+def function_selector(signature: str) -> bytes:
+    """4-byte selector of a function signature, e.g. 'name()'"""
+    return bytes(Web3.keccak(text=signature)[:4])
+
+
+TRY_AGGREGATE_SELECTOR = function_selector("tryAggregate(bool,(address,bytes)[])")
+
+# How nodes report a call that ran and failed, as opposed to one that never ran
+EXECUTION_ERROR_HINTS = ("revert", "out of gas", "gas required exceeds", "invalid opcode", "invalid jump")
+
+
+def is_execution_error(error: Exception) -> bool:
+    """True if the call executed and failed (revert, out of gas). Transport and
+    node errors (timeouts, HTTP errors, rate limits) are not: the call never ran."""
+    if isinstance(error, ContractLogicError):
+        return True
+    if isinstance(error, (*HTTP_ERRORS, TimeoutError, ConnectionError)):
+        return False
+    message = str(getattr(error, "message", None) or error).lower()
+    return any(hint in message for hint in EXECUTION_ERROR_HINTS)
+
+# (result key, signature) for the ERC-20 metadata fields
+ERC20_METADATA_CALLS = [
+    ("name", "name()"),
+    ("symbol", "symbol()"),
+    ("decimals", "decimals()"),
+    ("totalSupply", "totalSupply()"),
+]
+ERC20_SELECTORS = {key: function_selector(sig) for key, sig in ERC20_METADATA_CALLS}
+
+
+class Multicall3:
+    """Batches many eth_calls into Multicall3.tryAggregate calls"""
+
+    def __init__(self, w3: Web3, address: str = MULTICALL3_ADDRESS, max_calls: int = 200):
+        self.w3 = w3
+        self.address = Web3.to_checksum_address(address)
+        self.max_calls = max_calls  # Sub-calls per aggregate call
+        self.available: Optional[bool] = None  # None = not detected yet
+
+    def _direct_call(self, target: str, data: bytes, block: Any = "latest") -> Tuple[bool, bytes]:
+        try:
+            return True, bytes(self.w3.eth.call({"to": target, "data": data}, block))
+        except Exception as e:
+            if not is_execution_error(e):
+                raise  # The node failed, not the call: don't report it as "no such function"
+            return False, b""
+
+    def _aggregate(self, calls: Sequence[Tuple[str, bytes]], block: Any = "latest") -> List[Tuple[bool, bytes]]:
+        calldata = TRY_AGGREGATE_SELECTOR + encode(
+            ["bool", "(address,bytes)[]"],
+            [False, [(Web3.to_checksum_address(target), data) for target, data in calls]]
+        )
+        raw = self.w3.eth.call({"to": self.address, "data": calldata}, block)
+        if not raw:
+            # No code at the Multicall3 address on this chain
+            raise LookupError(f"Multicall3 not deployed at {self.address}")
+        return [(bool(ok), bytes(data)) for ok, data in decode(["(bool,bytes)[]"], raw)[0]]
+
+    def _try_aggregate_chunk(self, calls: Sequence[Tuple[str, bytes]], block: Any = "latest") -> List[Tuple[bool, bytes]]:
+        try:
+            results = self._aggregate(calls, block)
+            self.available = True
+            return results
+        except LookupError:
+            print(f"⚠️ Multicall3 unavailable, falling back to single eth_calls")
+            self.available = False
+            return [self._direct_call(target, data, block) for target, data in calls]
+        except Exception as e:
+            if not is_execution_error(e):
+                raise  # Endpoint down or throttled: splitting would only multiply the calls
+            # The whole batch ran out of gas (or reverted): split and retry
+            if len(calls) == 1:
+                return [self._direct_call(*calls[0], block)]
+            middle = len(calls) // 2
+            return self._try_aggregate_chunk(calls[:middle], block) + self._try_aggregate_chunk(calls[middle:], block)
+
+    def _try_aggregate_at(self, calls: Sequence[Tuple[str, bytes]], block: Any) -> List[Tuple[bool, bytes]]:
+        if self.available is False:
+            return [self._direct_call(target, data, block) for target, data in calls]
+
+        results = []
+        for start in range(0, len(calls), self.max_calls):
+            results.extend(self._try_aggregate_chunk(calls[start:start + self.max_calls], block))
+        return results
+
+    def try_aggregate(self, calls: Sequence[Tuple[str, bytes]], block: Optional[int] = None) -> List[Tuple[bool, bytes]]:
+        """Run (target, calldata) calls; each slot is (success, return data).
+        A failing sub-call never fails the others; transport errors raise.
+        With `block`, calls read state at that block (e.g. the one a token was
+        found in, so a lagging endpoint can't answer from before it existed),
+        or at latest if the node has pruned that block's state."""
+        if block is None:
+            return self._try_aggregate_at(calls, "latest")
+        try:
+            return self._try_aggregate_at(calls, block)
+        except Exception as e:
+            if not is_pruned_state_error(e):
+                raise
+            return self._try_aggregate_at(calls, "latest")
+
+
+def decode_string(data: bytes) -> Optional[str]:
+    """Decode a string return value, also accepting the old bytes32 style (e.g. MKR)"""
+    if not data:
+        return None
+    try:
+        return decode(["string"], data)[0]
+    except Exception:
+        if len(data) == 32:
+            text = data.rstrip(b"\x00").decode("utf-8", errors="ignore")
+            return text or None
+        return None
+
+
+def decode_uint(data: bytes) -> Optional[int]:
+    if len(data) < 32:
+        return None
+    try:
+        return decode(["uint256"], data[:32])[0]
+    except Exception:
+        return None
+
+
+class TokenMetadataReader:
+    """Reads name/symbol/decimals/totalSupply for many tokens with Multicall3"""
+
+    def __init__(self, multicall: Multicall3):
+        self.multicall = multicall
+
+    def read_many(self, token_addresses: Sequence[str], fields: Optional[Sequence[str]] = None,
+                  block: Optional[int] = None) -> Dict[str, Dict]:
+        """Raw metadata per token. Failed fields are None, `functions_working` counts the rest.
+        `fields` limits the read to a subset of name/symbol/decimals/totalSupply;
+        `block` pins the read (see Multicall3.try_aggregate)."""
+        addresses = [Web3.to_checksum_address(a) for a in token_addresses]
+        keys = [key for key, _ in ERC20_METADATA_CALLS if fields is None or key in fields]
+        calls = [
+            (address, ERC20_SELECTORS[key])
+            for address in addresses
+            for key in keys
+        ]
+        results = self.multicall.try_aggregate(calls, block)
+
+        metadata = {}
+        field_count = len(keys)
+        for i, address in enumerate(addresses):
+            token = {}
+            for key, (ok, data) in zip(keys, results[i * field_count:(i + 1) * field_count]):
+                if not ok:
+                    token[key] = None
+                elif key in ("name", "symbol"):
+                    token[key] = decode_string(data)
+                else:
+                    token[key] = decode_uint(data)
+
+            if token.get("decimals") is not None and token["decimals"] > 255:
+                token["decimals"] = None  # uint8 in the standard, anything else is garbage
+            token["functions_working"] = sum(1 for value in token.values() if value is not None)
+            metadata[address] = token
+        return metadata
+
+    def read(self, token_address: str) -> Dict:
+        return self.read_many([token_address])[Web3.to_checksum_address(token_address)]
@@ -0,0 +1,180 @@
+# pool_index.py - Event-Sourced Token -> Pool Index
+import json
+import os
+from typing import Dict, List, Optional
+from web3 import Web3
+from rpc_batch import BatchRPCClient
+from log_fetcher import LogRangeFetcher
+
+PAIR_CREATED_TOPIC = Web3.to_hex(Web3.keccak(text="PairCreated(address,address,address,uint256)"))
+POOL_CREATED_TOPIC = Web3.to_hex(Web3.keccak(text="PoolCreated(address,address,uint24,int24,address)"))
+
+
+def _topic_address(topic) -> str:
+    return Web3.to_checksum_address(bytes(topic)[-20:])
+
+
+def decode_pool_log(log) -> Optional[Dict]:
+    """PairCreated / PoolCreated log -> pool entry"""
+    topic0 = Web3.to_hex(log.topics[0])
+    data = bytes(log.data)
+    if topic0 == PAIR_CREATED_TOPIC and len(log.topics) >= 3 and len(data) >= 32:
+        return {
+            "dex": "v2",
+            "pool_address": Web3.to_checksum_address(data[12:32]),
+            "token0": _topic_address(log.topics[1]),
+            "token1": _topic_address(log.topics[2]),
+            "fee": None,
+            "factory": log.address,
+            "block": log.blockNumber
+        }
+    if topic0 == POOL_CREATED_TOPIC and len(log.topics) >= 4 and len(data) >= 64:
+        return {
+            "dex": "v3",
+            "pool_address": Web3.to_checksum_address(data[44:64]),
+            "token0": _topic_address(log.topics[1]),
+            "token1": _topic_address(log.topics[2]),
+            "fee": int.from_bytes(bytes(log.topics[3]), "big"),
+            "factory": log.address,
+            "block": log.blockNumber
+        }
+    return None
+
+
+class PoolIndex:
+    """token -> pools map built from the factories' PairCreated/PoolCreated logs.
+
+    Covers every quote token, not just WETH. Kept in memory and persisted as
+    JSON so later runs only ingest new blocks."""
+
+    def __init__(self, rpc: BatchRPCClient, chain_id: int, v2_factory: str, v3_factory: str,
+                 path: Optional[str] = None, log_fetcher: Optional[LogRangeFetcher] = None):
+        self.rpc = rpc
+        self.log_fetcher = log_fetcher or LogRangeFetcher(rpc)
+        self.chain_id = chain_id
+        self.factories = [
+            Web3.to_checksum_address(factory)
+            for factory in (v2_factory, v3_factory)
+            if int(factory, 16) != 0
+        ]
+        self.path = path or os.path.join("cache", f"pool_index_{chain_id}.json")
+
+        self.pools: Dict[str, List[Dict]] = {}  # lower-case token -> pool entries
+        self.pool_addresses = set()
+        self.from_block: Optional[int] = None  # First block indexed
+        self.last_block: Optional[int] = None  # Last block fully indexed
+
+    def covers(self, from_block: int, to_block: int) -> bool:
+        """True if every pool created in [from_block, to_block] is indexed. A failed
+        or missing sync leaves last_block behind and the caller must not trust it."""
+        return (self.from_block is not None and self.last_block is not None
+                and self.from_block <= from_block and to_block <= self.last_block)
+
+    def add_pool(self, pool: Dict):
+        if pool["pool_address"] in self.pool_addresses:
+            return
+        self.pool_addresses.add(pool["pool_address"])
+        for token in (pool["token0"], pool["token1"]):
+            self.pools.setdefault(token.lower(), []).append(pool)
+
+    def pools_for(self, token_address: str) -> List[Dict]:
+        """All known pools containing the token (O(1))"""
+        return self.pools.get(token_address.lower(), [])
+
+    def lp_summary(self, token_address: str, weth_address: str) -> Dict:
+        """Pools of a token in the scanner's lp_info shape, WETH pair preferred for v2_pair"""
+        token = token_address.lower()
+        weth = weth_address.lower()
+        pools = self.pools_for(token_address)
+        v2_pools = [p for p in pools if p["dex"] == "v2"]
+        v3_pools = [p for p in pools if p["dex"] == "v3"]
+        v2_pair = next((p for p in v2_pools if weth in (p["token0"].lower(), p["token1"].lower())),
+                       v2_pools[0] if v2_pools else None)
+
+        def paired_with(pool):
+            return pool["token1"] if pool["token0"].lower() == token else pool["token0"]
+
+        return {
+            "v2": bool(v2_pools),
+            "v3": bool(v3_pools),
+            "status": "YES" if pools else "NO",
+            "v2_pair": v2_pair["pool_address"] if v2_pair else None,
+            "v3_pools": [
+                {"pool_address": p["pool_address"], "fee_tier": p["fee"], "paired_with": paired_with(p)}
+                for p in v3_pools
+            ],
+            "pools": [
+                {"pool_address": p["pool_address"], "dex": p["dex"], "fee_tier": p["fee"], "paired_with": paired_with(p)}
+                for p in pools
+            ]
+        }
+
+    def ingest(self, from_block: int, to_block: int) -> int:
+        """Index pool creations in [from_block, to_block]; returns pools added"""
+        if not self.factories:
+            return 0
+
+        added = 0
+        log_filter = {"address": self.factories, "topics": [[PAIR_CREATED_TOPIC, POOL_CREATED_TOPIC]]}
+        for start, end, logs in self.log_fetcher.iter_windows(log_filter, from_block, to_block):
+            for log in logs:
+                pool = decode_pool_log(log)
+                if pool and pool["pool_address"] not in self.pool_addresses:
+                    self.add_pool(pool)
+                    added += 1
+
+            # Only extend coverage over contiguous ranges
+            if self.from_block is None:
+                self.from_block, self.last_block = start, end
+            elif start <= self.last_block + 1:
+                self.last_block = max(self.last_block, end)
+                self.from_block = min(self.from_block, start)
+        return added
+
+    def sync(self, to_block: int, from_block: Optional[int] = None) -> int:
+        """Ingest everything after the last indexed block up to `to_block`"""
+        start = self.last_block + 1 if self.last_block is not None else from_block
+        if start is None or start > to_block:
+            return 0
+        added = self.ingest(start, to_block)
+        self.save()
+        return added
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({
+                "chain_id": self.chain_id,
+                "from_block": self.from_block,
+                "last_block": self.last_block,
+                "pools": list(self._unique_pools())
+            }, f)
+        os.replace(tmp_path, self.path)
+
+    def _unique_pools(self):
+        seen = set()
+        for pools in self.pools.values():
+            for pool in pools:
+                if pool["pool_address"] not in seen:
+                    seen.add(pool["pool_address"])
+                    yield pool
+
+    def load(self) -> bool:
+        """Load a saved index; returns False if there is none for this chain"""
+        if not os.path.exists(self.path):
+            return False
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Could not load pool index {self.path}: {e}")
+            return False
+        if data.get("chain_id") != self.chain_id:
+            return False
+
+        self.from_block = data.get("from_block")
+        self.last_block = data.get("last_block")
+        for pool in data.get("pools", []):
+            self.add_pool(pool)
+        return True
@@ -0,0 +1,204 @@
+# pool_pricing.py - On-Chain Token Prices from Pool Reserves and slot0
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+from web3 import Web3
+from multicall import Multicall3, TokenMetadataReader, function_selector
+from lp_probe import decode_address
+from get_price_history import TOKEN0_SELECTOR, TOKEN1_SELECTOR, words_to_float
+
+GET_RESERVES_SELECTOR = function_selector("getReserves()")
+SLOT0_SELECTOR = function_selector("slot0()")
+BALANCE_OF_SELECTOR = function_selector("balanceOf(address)")
+
+
+def sort_tokens(token_a: str, token_b: str):
+    """(token0, token1) the way Uniswap orders a pair"""
+    return (token_a, token_b) if int(token_a, 16) < int(token_b, 16) else (token_b, token_a)
+
+
+def pools_from_lp_info(token_address: str, lp_info: Dict, weth_address: str) -> List[Dict]:
+    """Pools of a token from either lp_info shape (pool index or CREATE2 resolver)"""
+    if "pools" in lp_info:
+        return [
+            {"pool_address": p["pool_address"], "dex": p["dex"], "token": token_address, "quote": p["paired_with"]}
+            for p in lp_info["pools"]
+        ]
+    # Resolver/probe results only cover WETH pairs
+    pools = []
+    if lp_info.get("v2_pair"):
+        pools.append({"pool_address": lp_info["v2_pair"], "dex": "v2", "token": token_address, "quote": weth_address})
+    for pool in lp_info.get("v3_pools", []):
+        pools.append({"pool_address": pool["pool_address"], "dex": "v3", "token": token_address, "quote": weth_address})
+    return pools
+
+
+def _word(data: bytes, index: int = 0) -> bytes:
+    word = data[index * 32:(index + 1) * 32]
+    return word if len(word) == 32 else b"\x00" * 32
+
+
+class PoolPricer:
+    """Token prices and pool liquidity from on-chain pool state, no price API.
+
+    V2 pairs are priced from getReserves, V3 pools from slot0's sqrtPriceX96
+    (their liquidity from the pool's token balances). All pool state is read
+    in one Multicall3 round and priced with NumPy over every pool at once.
+    WETH is priced in USD through the chain's reference WETH/stablecoin pool."""
+
+    def __init__(self, multicall: Multicall3, weth_address: str, usd_pool: str = ""):
+        self.multicall = multicall
+        self.weth = Web3.to_checksum_address(weth_address)
+        self.usd_pool = Web3.to_checksum_address(usd_pool) if usd_pool else None
+        self.stable: Optional[str] = None  # Non-WETH side of the reference pool
+        self.decimals: Dict[str, int] = {}  # Read once per token (quote tokens repeat a lot)
+
+    def _read_decimals(self, tokens: Sequence[str]):
+        missing = list(dict.fromkeys(t for t in tokens if t not in self.decimals))
+        if missing:
+            metadata = TokenMetadataReader(self.multicall).read_many(missing, fields=["decimals"])
+            for token in missing:
+                self.decimals[token] = metadata[token]["decimals"]
+
+    def _reference_pool(self) -> Optional[Dict]:
+        """The WETH/stablecoin pool pricing WETH in USD, checked on-chain once"""
+        if self.usd_pool is None:
+            return None
+        if self.stable is None:
+            (ok0, data0), (ok1, data1) = self.multicall.try_aggregate(
+                [(self.usd_pool, TOKEN0_SELECTOR), (self.usd_pool, TOKEN1_SELECTOR)]
+            )
+            tokens = {decode_address(data0) if ok0 else None, decode_address(data1) if ok1 else None}
+            if self.weth not in tokens or None in tokens:
+                print(f"⚠️ {self.usd_pool} is not a WETH pool, USD prices disabled")
+                self.usd_pool = None
+                return None
+            self.stable = (tokens - {self.weth}).pop()
+        return {"pool_address": self.usd_pool, "dex": "v3", "token": self.weth, "quote": self.stable}
+
+    def _calls_for(self, pool: Dict, token0: str, token1: str) -> List:
+        address = pool["pool_address"]
+        if pool["dex"] == "v2":
+            return [(address, GET_RESERVES_SELECTOR)]
+        holder = bytes(12) + bytes.fromhex(address[2:])
+        return [
+            (address, SLOT0_SELECTOR),
+            (token0, BALANCE_OF_SELECTOR + holder),
+            (token1, BALANCE_OF_SELECTOR + holder)
+        ]
+
+    def price_pools(self, pools: Sequence[Dict]) -> List[Dict]:
+        """Price of `token` per pool. Pools are {"pool_address", "dex", "token", "quote"};
+        each result adds price_quote, price_weth, price_usd and liquidity_usd (None if unknown)."""
+        reference = self._reference_pool()
+        pools = [
+            {**p, "token": Web3.to_checksum_address(p["token"]), "quote": Web3.to_checksum_address(p["quote"])}
+            for p in pools
+        ] + ([reference] if reference else [])
+        if not pools:
+            return []
+        self._read_decimals([p["token"] for p in pools] + [p["quote"] for p in pools])
+
+        # One aggregated read for every pool's state
+        ordered = [sort_tokens(p["token"], p["quote"]) for p in pools]
+        calls, spans = [], []
+        for pool, (token0, token1) in zip(pools, ordered):
+            pool_calls = self._calls_for(pool, token0, token1)
+            spans.append((len(calls), len(pool_calls)))
+            calls.extend(pool_calls)
+        results = self.multicall.try_aggregate(calls)
+
+        count = len(pools)
+        is_v3 = np.array([p["dex"] == "v3" for p in pools])
+        valid = np.ones(count, dtype=bool)
+        words = np.zeros((count, 3, 32), dtype=np.uint8)  # v2: reserve0, reserve1; v3: sqrtPriceX96, balance0, balance1
+        for i, (pool, (start, size)) in enumerate(zip(pools, spans)):
+            pool_results = results[start:start + size]
+            if not all(ok for ok, _ in pool_results):
+                valid[i] = False
+                continue
+            if pool["dex"] == "v2":
+                data = pool_results[0][1]
+                raw = [_word(data, 0), _word(data, 1), bytes(32)]
+            else:
+                raw = [_word(pool_results[0][1]), _word(pool_results[1][1]), _word(pool_results[2][1])]
+            words[i] = np.frombuffer(b"".join(raw), dtype=np.uint8).reshape(3, 32)
+
+        # Tokens without readable decimals can't be priced
+        valid &= np.array([self.decimals.get(p["token"]) is not None and self.decimals.get(p["quote"]) is not None
+                           for p in pools])
+        decimals0 = np.array([self.decimals.get(t0) or 0 for t0, _ in ordered], dtype=np.float64)
+        decimals1 = np.array([self.decimals.get(t1) or 0 for _, t1 in ordered], dtype=np.float64)
+        first = words_to_float(words[:, 0])
+        second = words_to_float(words[:, 1])
+        third = words_to_float(words[:, 2])
+
+        # Human amounts held by the pool and price of token0 in token1
+        amount0 = np.where(is_v3, second, first) / 10.0 ** decimals0
+        amount1 = np.where(is_v3, third, second) / 10.0 ** decimals1
+        sqrt_price = first / 2.0 ** 96
+        with np.errstate(divide="ignore", invalid="ignore"):
+            price01 = np.where(is_v3, sqrt_price * sqrt_price * 10.0 ** (decimals0 - decimals1), amount1 / amount0)
+            token_is_0 = np.array([p["token"] == t0 for p, (t0, _) in zip(pools, ordered)])
+            price_quote = np.where(token_is_0, price01, 1.0 / price01)
+            token_amount = np.where(token_is_0, amount0, amount1)
+            quote_amount = np.where(token_is_0, amount1, amount0)
+        valid &= np.isfinite(price_quote) & (price_quote > 0)
+
+        weth_usd = np.nan
+        if reference:
+            weth_usd = price_quote[-1] if valid[-1] else np.nan
+            pools, price_quote, token_amount, quote_amount, valid = (
+                pools[:-1], price_quote[:-1], token_amount[:-1], quote_amount[:-1], valid[:-1]
+            )
+
+        # Value of one quote token in WETH and USD
+        quotes = [p["quote"] for p in pools]
+        quote_weth = np.array([1.0 if q == self.weth else (1.0 / weth_usd if q == self.stable else np.nan) for q in quotes])
+        quote_usd = np.array([weth_usd if q == self.weth else (1.0 if q == self.stable else np.nan) for q in quotes])
+        price_weth = price_quote * quote_weth
+        price_usd = price_quote * quote_usd
+        liquidity_usd = token_amount * price_usd + quote_amount * quote_usd
+
+        def value(array, i):
+            return float(array[i]) if valid[i] and np.isfinite(array[i]) else None
+
+        return [{
+            **pool,
+            "price_quote": value(price_quote, i),
+            "price_weth": value(price_weth, i),
+            "price_usd": value(price_usd, i),
+            "liquidity_usd": value(liquidity_usd, i),
+            "quote_reserve": value(quote_amount, i)
+        } for i, pool in enumerate(pools)]
+
+    def price_tokens(self, lp_infos: Dict[str, Dict]) -> Dict[str, Optional[Dict]]:
+        """Price of each token from its deepest priced pool (None if no pool could be priced)"""
+        pools = []
+        for token, lp_info in lp_infos.items():
+            if lp_info.get("status") == "YES":
+                pools.extend(pools_from_lp_info(token, lp_info, self.weth))
+        priced = self.price_pools(pools) if pools else []
+
+        best: Dict[str, Dict] = {}
+        for pool in priced:
+            if pool["price_quote"] is None:
+                continue
+            # Deepest pool wins: USD liquidity if known, else the quote side's reserve
+            depth = (pool["liquidity_usd"] is not None, pool["liquidity_usd"] or pool["quote_reserve"] or 0)
+            current = best.get(pool["token"])
+            if current is None or depth > current["_depth"]:
+                best[pool["token"]] = {**pool, "_depth": depth}
+
+        prices = {}
+        for token in lp_infos:
+            pool = best.get(Web3.to_checksum_address(token)) if token else None
+            prices[token] = None if pool is None else {
+                "price_usd": pool["price_usd"],
+                "price_weth": pool["price_weth"],
+                "liquidity_usd": pool["liquidity_usd"],
+                "pool_address": pool["pool_address"],
+                "dex": pool["dex"],
+                "paired_with": pool["quote"],
+                "source": "onchain"
+            }
+        return prices
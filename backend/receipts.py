@@ -0,0 +1,84 @@
+# receipts.py - Block-Level Receipt Fetching
+from typing import Dict, List, Sequence
+from hexbytes import HexBytes
+from web3 import Web3
+from rpc_batch import BatchRPCClient, RPCError, format_receipt
+
+# JSON-RPC codes/messages meaning "this method does not exist here"
+METHOD_NOT_FOUND_CODES = {-32601, -32604}
+METHOD_NOT_FOUND_HINTS = ("not found", "not supported", "does not exist", "not available", "unsupported")
+
+
+def is_method_unsupported(error: Exception) -> bool:
+    """True if the RPC error means the endpoint lacks the method (vs. a transient failure)"""
+    if not isinstance(error, RPCError):
+        return False
+    if error.code in METHOD_NOT_FOUND_CODES:
+        return True
+    message = (error.message or "").lower()
+    return "method" in message and any(hint in message for hint in METHOD_NOT_FOUND_HINTS)
+
+
+class ReceiptsProvider:
+    """Fetches receipts for a block in one eth_getBlockReceipts call when the
+    endpoint supports it, otherwise batches eth_getTransactionReceipt calls"""
+
+    # chain_id -> eth_getBlockReceipts supported; shared so each chain is probed once per process
+    block_receipts_support: Dict[int, bool] = {}
+
+    def __init__(self, rpc: BatchRPCClient, chain_id: int, min_block_call_txs: int = 2):
+        self.rpc = rpc
+        self.chain_id = chain_id
+        # A lone deployment is cheaper as one per-tx receipt than a whole block of receipts
+        self.min_block_call_txs = min_block_call_txs
+
+    @property
+    def supports_block_receipts(self):
+        return self.block_receipts_support.get(self.chain_id)
+
+    def _fetch_block_receipts(self, block_number: int):
+        """Returns formatted receipts, or None if the method is unavailable"""
+        if self.supports_block_receipts is False:
+            return None
+        try:
+            raw_receipts = self.rpc.call("eth_getBlockReceipts", [hex(block_number)])
+        except RPCError as e:
+            if is_method_unsupported(e):
+                print(f"ℹ️ eth_getBlockReceipts not supported on chain {self.chain_id}, batching per-tx receipts")
+                self.block_receipts_support[self.chain_id] = False
+            return None
+        except Exception:
+            # Transient transport error: don't record a capability, just fall back this time
+            return None
+
+        if raw_receipts is None:
+            return None
+        self.block_receipts_support[self.chain_id] = True
+        return [format_receipt(raw) for raw in raw_receipts]
+
+    def _fetch_tx_receipts(self, tx_hashes: Sequence) -> List:
+        calls = [("eth_getTransactionReceipt", [Web3.to_hex(HexBytes(tx_hash))]) for tx_hash in tx_hashes]
+        receipts = []
+        for raw in self.rpc.batch(calls):
+            if raw is None or isinstance(raw, Exception):
+                continue
+            receipts.append(format_receipt(raw))
+        return receipts
+
+    def get_receipts(self, block_number: int, tx_hashes: Sequence) -> Dict[HexBytes, dict]:
+        """Receipts for the given transactions of a block, keyed by tx hash"""
+        if not tx_hashes:
+            return {}
+
+        wanted = {HexBytes(tx_hash) for tx_hash in tx_hashes}
+        receipts = None
+        if len(wanted) >= self.min_block_call_txs:
+            receipts = self._fetch_block_receipts(block_number)
+        if receipts is None:
+            receipts = self._fetch_tx_receipts(tx_hashes)
+
+        return {
+            receipt.transactionHash: receipt
+            for receipt in receipts
+            if receipt.transactionHash in wanted
+        }
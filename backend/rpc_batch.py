@@ -0,0 +1,264 @@
+# rpc_batch.py - Batched JSON-RPC Client
+import itertools
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from hexbytes import HexBytes
+from web3 import Web3
+from web3.datastructures import AttributeDict
+from http_pool import DEFAULT_POOL_SIZE, HTTP_ERRORS, rpc_session
+from adaptive_limiter import get_limiter, is_rate_limited, retry_with_backoff
+
+# Hex quantity fields converted to int (same shape web3.py returns)
+BLOCK_INT_FIELDS = {
+    "number", "timestamp", "gasLimit", "gasUsed", "baseFeePerGas", "size",
+    "difficulty", "totalDifficulty", "blobGasUsed", "excessBlobGas"
+}
+TX_INT_FIELDS = {
+    "blockNumber", "transactionIndex", "nonce", "gas", "gasPrice", "value",
+    "maxFeePerGas", "maxPriorityFeePerGas", "maxFeePerBlobGas", "chainId",
+    "type", "v", "yParity", "mint"
+}
+RECEIPT_INT_FIELDS = {
+    "blockNumber", "transactionIndex", "gasUsed", "cumulativeGasUsed",
+    "effectiveGasPrice", "status", "type", "blobGasUsed", "blobGasPrice"
+}
+LOG_INT_FIELDS = {"blockNumber", "transactionIndex", "logIndex"}
+
+BYTES_FIELDS = {
+    "hash", "parentHash", "blockHash", "transactionHash", "input", "data",
+    "r", "s", "sha3Uncles", "stateRoot", "transactionsRoot", "receiptsRoot",
+    "mixHash", "logsBloom", "extraData", "sourceHash"
+}
+ADDRESS_FIELDS = {"from", "to", "miner", "contractAddress", "address"}
+
+# How nodes say they no longer keep state for an old block (pruned, non-archive)
+PRUNED_STATE_HINTS = ("missing trie node", "state is not available", "state not available",
+                      "historical state", "pruned")
+
+
+class RPCError(Exception):
+    """Error object returned by the node for a single JSON-RPC call"""
+
+    def __init__(self, error: Dict):
+        self.code = error.get("code")
+        self.message = error.get("message", "")
+        super().__init__(f"RPC error {self.code}: {self.message}")
+
+
+class BatchNotSupported(Exception):
+    """The endpoint answered a batch array with something other than a batch"""
+
+
+def is_pruned_state_error(error: Exception) -> bool:
+    """True if the node can't read state at the requested block because it's too old"""
+    message = str(getattr(error, "message", None) or error).lower()
+    return any(hint in message for hint in PRUNED_STATE_HINTS)
+
+
+def _format(raw: Dict, int_fields: set) -> AttributeDict:
+    """Convert a raw JSON-RPC object into the AttributeDict shape web3.py returns"""
+    formatted = {}
+    for key, value in raw.items():
+        if value is None:
+            formatted[key] = None
+        elif key in int_fields and isinstance(value, str):
+            formatted[key] = int(value, 16)
+        elif key in ADDRESS_FIELDS and isinstance(value, str):
+            formatted[key] = Web3.to_checksum_address(value)
+        elif key in BYTES_FIELDS and isinstance(value, str):
+            formatted[key] = HexBytes(value)
+        elif key == "topics":
+            formatted[key] = [HexBytes(topic) for topic in value]
+        else:
+            formatted[key] = value
+    return AttributeDict(formatted)
+
+
+def format_block(raw: Dict) -> AttributeDict:
+    """Format a raw eth_getBlockByNumber result"""
+    block = dict(raw)
+    block["transactions"] = [
+        format_transaction(tx) if isinstance(tx, dict) else HexBytes(tx)
+        for tx in raw.get("transactions", [])
+    ]
+    return _format(block, BLOCK_INT_FIELDS)
+
+
+def format_transaction(raw: Dict) -> AttributeDict:
+    """Format a raw transaction object"""
+    return _format(raw, TX_INT_FIELDS)
+
+
+def format_receipt(raw: Dict) -> AttributeDict:
+    """Format a raw transaction receipt"""
+    receipt = dict(raw)
+    receipt["logs"] = [format_log(log) for log in raw.get("logs", [])]
+    return _format(receipt, RECEIPT_INT_FIELDS)
+
+
+def format_log(raw: Dict) -> AttributeDict:
+    """Format a raw log entry"""
+    return _format(raw, LOG_INT_FIELDS)
+
+
+class BatchRPCClient:
+    """Sends JSON-RPC calls as batch arrays, falling back to single calls
+    for providers that reject batches"""
+
+    def __init__(self, rpc_url: str, batch_size: int = 50, timeout: int = 30,
+                 session=None, max_concurrency: Optional[int] = None, endpoints=None):
+        self.rpc_url = rpc_url
+        self.batch_size = max(1, batch_size)
+        self.timeout = timeout
+        # Optional EndpointPool: requests are routed, failed over and hedged across its URLs
+        self.endpoints = endpoints
+        urls = endpoints.urls if endpoints is not None else [rpc_url]
+        pool_size = max_concurrency or DEFAULT_POOL_SIZE
+        if session is None:
+            # Shared keep-alive pool (HTTP/2 if available), sized for each endpoint host
+            for url in urls:
+                session = rpc_session(url, pool_size=pool_size)
+        self.session = session
+        self.supports_batch: Optional[bool] = None  # None = not detected yet
+        self._ids = itertools.count(1)
+        # AIMD limit on in-flight requests per endpoint, shared by every client of that endpoint
+        self.limiters = {url: get_limiter(url, max_limit=max_concurrency or 64) for url in urls}
+        self.limiter = self.limiters[urls[0]]
+
+        if endpoints is not None:
+            endpoints.start_probes(self.probe_head)
+
+    def _post_once(self, payload: Any, url: Optional[str] = None) -> Any:
+        url = url or self.rpc_url
+        with self.limiters.get(url, self.limiter).slot():
+            response = self.session.post(url, json=payload, timeout=self.timeout)
+            response.raise_for_status()
+            data = response.json()
+            # Throttling reported inside a 200 response
+            if isinstance(data, dict) and "error" in data and is_rate_limited(RPCError(data["error"])):
+                raise RPCError(data["error"])
+            if isinstance(data, list) and any(
+                isinstance(item, dict) and "error" in item and is_rate_limited(RPCError(item["error"]))
+                for item in data
+            ):
+                self.limiters.get(url, self.limiter).on_throttle()
+        if isinstance(payload, list) and not isinstance(data, list) and self.endpoints is not None:
+            # Lets the pool try an endpoint that accepts batches
+            raise BatchNotSupported(str(data.get("error", data)) if isinstance(data, dict) else str(data))
+        return data
+
+    def _post(self, payload: Any) -> Any:
+        """POST with failover across endpoints (if pooled) and jittered exponential retry"""
+        if self.endpoints is None:
+            return retry_with_backoff(self._post_once, payload)
+        return retry_with_backoff(self.endpoints.send, lambda url: self._post_once(payload, url))
+
+    def probe_head(self, url: str) -> int:
+        data = self._post_once({"jsonrpc": "2.0", "id": next(self._ids), "method": "eth_blockNumber", "params": []}, url)
+        if "error" in data:
+            raise RPCError(data["error"])
+        return int(data["result"], 16)
+
+    def request(self, method: str, params: Sequence = ()) -> Dict:
+        """Raw JSON-RPC response object (used by PooledProvider)"""
+        return self._post({"jsonrpc": "2.0", "id": next(self._ids), "method": method, "params": list(params)})
+
+    def call(self, method: str, params: Sequence = ()) -> Any:
+        """Single JSON-RPC call, raises RPCError on node errors"""
+        data = self._post({"jsonrpc": "2.0", "id": next(self._ids), "method": method, "params": list(params)})
+        if "error" in data:
+            raise RPCError(data["error"])
+        return data.get("result")
+
+    def _send_batch(self, calls: Sequence[Tuple[str, Sequence]]) -> List[Any]:
+        ids = [next(self._ids) for _ in calls]
+        payload = [
+            {"jsonrpc": "2.0", "id": call_id, "method": method, "params": list(params)}
+            for call_id, (method, params) in zip(ids, calls)
+        ]
+        data = self._post(payload)
+        if not isinstance(data, list):
+            # e.g. {"error": {"message": "batch requests not supported"}}
+            raise BatchNotSupported(str(data.get("error", data)) if isinstance(data, dict) else str(data))
+
+        # Responses may come back in any order
+        by_id = {item.get("id"): item for item in data if isinstance(item, dict)}
+        results = []
+        for call_id in ids:
+            item = by_id.get(call_id)
+            if item is None:
+                results.append(RPCError({"code": None, "message": "missing response in batch"}))
+            elif "error" in item:
+                results.append(RPCError(item["error"]))
+            else:
+                results.append(item.get("result"))
+        return results
+
+    def _send_single(self, calls: Sequence[Tuple[str, Sequence]]) -> List[Any]:
+        results = []
+        for method, params in calls:
+            try:
+                results.append(self.call(method, params))
+            except (RPCError, *HTTP_ERRORS, ValueError) as e:
+                results.append(e)
+        return results
+
+    def batch(self, calls: Sequence[Tuple[str, Sequence]]) -> List[Any]:
+        """Run many calls; each slot holds the result or the exception for that call"""
+        results = []
+        for start in range(0, len(calls), self.batch_size):
+            chunk = calls[start:start + self.batch_size]
+
+            if self.supports_batch is False or len(chunk) == 1:
+                results.extend(self._send_single(chunk))
+                continue
+
+            try:
+                results.extend(self._send_batch(chunk))
+                self.supports_batch = True
+            except BatchNotSupported as e:
+                print(f"⚠️ Batch requests rejected by {self.rpc_url}, using single calls: {e}")
+                self.supports_batch = False
+                results.extend(self._send_single(chunk))
+            except (*HTTP_ERRORS, ValueError) as e:
+                # Transient (timeout, 5xx, bad body): single calls for this chunk only
+                print(f"⚠️ Batch request to {self.rpc_url} failed, retrying chunk as single calls: {e}")
+                results.extend(self._send_single(chunk))
+        return results
+
+    def state_batch(self, calls: Sequence[Tuple[str, Sequence]], block: Optional[int] = None) -> List[Any]:
+        """State reads (eth_getCode, eth_getStorageAt; params without the block tag) at `block`.
+        Pinned to the block a contract was found in, an endpoint that hasn't seen
+        that block yet errors instead of answering "no code". Calls the node has
+        no state for anymore (pruned) are retried at latest."""
+        tag = hex(block) if block is not None else "latest"
+        results = self.batch([(method, [*params, tag]) for method, params in calls])
+        if block is not None:
+            retry = [i for i, result in enumerate(results) if isinstance(result, Exception) and is_pruned_state_error(result)]
+            if retry:
+                latest = self.batch([(calls[i][0], [*calls[i][1], "latest"]) for i in retry])
+                for i, result in zip(retry, latest):
+                    results[i] = result
+        return results
+
+    def fetch_blocks(self, block_numbers: Sequence[int], full_transactions: bool = True) -> List[Any]:
+        """Fetch blocks via batched eth_getBlockByNumber.
+        Each slot is an AttributeDict block or the exception for that block."""
+        calls = [("eth_getBlockByNumber", [hex(n), full_transactions]) for n in block_numbers]
+        raw_blocks = self.batch(calls)
+
+        blocks = []
+        for block_num, raw in zip(block_numbers, raw_blocks):
+            if isinstance(raw, RPCError):
+                # Some providers cap batch size or rate limit individual entries
+                try:
+                    raw = self.call("eth_getBlockByNumber", [hex(block_num), full_transactions])
+                except (RPCError, *HTTP_ERRORS, ValueError) as e:
+                    raw = e
+
+            if isinstance(raw, Exception):
+                blocks.append(raw)
+            elif raw is None:
+                blocks.append(RPCError({"code": None, "message": f"block {block_num} not found"}))
+            else:
+                blocks.append(format_block(raw))
+        return blocks
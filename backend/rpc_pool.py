@@ -0,0 +1,209 @@
+# rpc_pool.py - Health-Scored RPC Endpoint Pool with Failover and Hedging
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout, as_completed
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from web3.providers.base import JSONBaseProvider
+
+
+class EndpointHealth:
+    """Rolling latency, error rate and head lag of one RPC endpoint"""
+
+    def __init__(self, url: str, window: int = 100):
+        self.url = url
+        self.latencies = deque(maxlen=window)
+        self.latency_ewma: Optional[float] = None
+        self.error_rate = 0.0  # EWMA of failures
+        self.head: Optional[int] = None
+        self.head_lag = 0  # Blocks behind the best endpoint
+        self._lock = threading.Lock()
+
+    def record(self, latency: float, ok: bool):
+        with self._lock:
+            self.error_rate = self.error_rate * 0.9 + (0.0 if ok else 0.1)
+            if ok:
+                self.latencies.append(latency)
+                self.latency_ewma = latency if self.latency_ewma is None else self.latency_ewma * 0.8 + latency * 0.2
+
+    def p95(self, min_samples: int = 20) -> Optional[float]:
+        """95th percentile latency, None until there are enough samples"""
+        with self._lock:
+            if len(self.latencies) < min_samples:
+                return None
+            ordered = sorted(self.latencies)
+        return ordered[int(len(ordered) * 0.95) - 1]
+
+    def score(self) -> float:
+        """Routing weight: fast, error-free, up-to-date endpoints score highest"""
+        latency = self.latency_ewma if self.latency_ewma is not None else 0.5  # Unknown: assume average
+        return 1.0 / (latency * (1 + 10 * self.error_rate) * (1 + self.head_lag))
+
+
+class EndpointPool:
+    """Routes requests over several RPC endpoints of one chain.
+
+    Endpoints are picked at random weighted by health score. A failed
+    request fails over to the next endpoint, and a request that outlives
+    its endpoint's p95 latency gets a hedged duplicate on another endpoint
+    (first answer wins). Background probes keep latency and head lag fresh
+    even for endpoints that currently get little traffic."""
+
+    def __init__(self, urls: Sequence[str], hedge: bool = True, max_head_lag: int = 5,
+                 max_error_rate: float = 0.5, max_workers: int = 32):
+        self.endpoints = [EndpointHealth(url) for url in dict.fromkeys(urls)]
+        self.hedge = hedge
+        self.max_head_lag = max_head_lag
+        self.max_error_rate = max_error_rate
+        self.hedges_sent = 0
+        self.failovers = 0
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="rpc-pool")
+        self._probe_thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @property
+    def urls(self) -> List[str]:
+        return [endpoint.url for endpoint in self.endpoints]
+
+    def is_healthy(self, endpoint: EndpointHealth) -> bool:
+        return endpoint.error_rate <= self.max_error_rate and endpoint.head_lag <= self.max_head_lag
+
+    def ranked(self) -> List[EndpointHealth]:
+        """Endpoints best first"""
+        return sorted(self.endpoints, key=lambda e: (self.is_healthy(e), e.score()), reverse=True)
+
+    def pick(self, exclude: Sequence[str] = ()) -> Optional[EndpointHealth]:
+        """Weighted-random healthy endpoint; the best remaining one if none is healthy"""
+        candidates = [e for e in self.endpoints if e.url not in exclude]
+        if not candidates:
+            return None
+        healthy = [e for e in candidates if self.is_healthy(e)]
+        if not healthy:
+            return max(candidates, key=lambda e: e.score())
+        return random.choices(healthy, weights=[e.score() for e in healthy])[0]
+
+    def _timed(self, request_fn: Callable[[str], object], endpoint: EndpointHealth):
+        started = time.monotonic()
+        try:
+            result = request_fn(endpoint.url)
+        except Exception:
+            endpoint.record(time.monotonic() - started, ok=False)
+            raise
+        endpoint.record(time.monotonic() - started, ok=True)
+        return result
+
+    def _send_hedged(self, request_fn: Callable[[str], object], primary: EndpointHealth, tried: List[str]):
+        budget = primary.p95() if self.hedge and len(self.endpoints) > 1 else None
+        if budget is None:
+            return self._timed(request_fn, primary)
+
+        first = self._executor.submit(self._timed, request_fn, primary)
+        try:
+            return first.result(timeout=budget)
+        except FuturesTimeout:
+            pass
+
+        backup = self.pick(exclude=tried)
+        if backup is None:
+            return first.result()
+        tried.append(backup.url)
+        self.hedges_sent += 1
+        second = self._executor.submit(self._timed, request_fn, backup)
+
+        error = None
+        for future in as_completed([first, second]):
+            try:
+                return future.result()
+            except Exception as e:
+                error = e
+        raise error
+
+    def send(self, request_fn: Callable[[str], object]):
+        """Run request_fn(url) on the best endpoint, failing over through the others"""
+        if not self.endpoints:
+            raise ConnectionError("no RPC endpoints configured")
+        tried: List[str] = []
+        error = None
+        while True:
+            endpoint = self.pick(exclude=tried)
+            if endpoint is None:
+                raise error
+            tried.append(endpoint.url)
+            try:
+                return self._send_hedged(request_fn, endpoint, tried)
+            except Exception as e:
+                error = e
+                if len(tried) < len(self.endpoints):
+                    self.failovers += 1
+                    print(f"⚠️ RPC {endpoint.url} failed ({e}), failing over")
+
+    def probe_all(self, head_fn: Callable[[str], int]) -> Dict[str, Optional[int]]:
+        """Time head_fn (e.g. eth_blockNumber) on every endpoint and update head lag"""
+        futures = {self._executor.submit(self._timed, head_fn, endpoint): endpoint for endpoint in self.endpoints}
+        heads = {}
+        for future, endpoint in futures.items():
+            try:
+                endpoint.head = future.result()
+            except Exception:
+                pass
+            heads[endpoint.url] = endpoint.head
+
+        best_head = max((e.head for e in self.endpoints if e.head is not None), default=None)
+        for endpoint in self.endpoints:
+            if best_head is not None and endpoint.head is not None:
+                endpoint.head_lag = best_head - endpoint.head
+        return heads
+
+    def start_probes(self, head_fn: Callable[[str], int], interval: float = 15.0):
+        """Probe every endpoint in a background thread (once per pool)"""
+        if self._probe_thread is not None or len(self.endpoints) < 2:
+            return
+
+        def loop():
+            while not self._stop.is_set():
+                self.probe_all(head_fn)
+                self._stop.wait(interval)
+
+        self._probe_thread = threading.Thread(target=loop, daemon=True, name="rpc-pool-probe")
+        self._probe_thread.start()
+
+    def stop_probes(self):
+        self._stop.set()
+
+    def report(self) -> List[Dict]:
+        """Per-endpoint health, best first"""
+        return [{
+            "url": e.url,
+            "healthy": self.is_healthy(e),
+            "latency_ms": round(e.latency_ewma * 1000) if e.latency_ewma is not None else None,
+            "p95_ms": round(e.p95() * 1000) if e.p95() is not None else None,
+            "error_rate": round(e.error_rate, 3),
+            "head": e.head,
+            "head_lag": e.head_lag
+        } for e in self.ranked()]
+
+
+_lock = threading.Lock()
+_pools: Dict[Tuple[str, ...], EndpointPool] = {}
+
+
+def get_endpoint_pool(urls: Sequence[str]) -> EndpointPool:
+    """Process-wide pool per endpoint list, so health history survives chain switches"""
+    key = tuple(dict.fromkeys(urls))
+    with _lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = EndpointPool(key)
+        return pool
+
+
+class PooledProvider(JSONBaseProvider):
+    """web3 provider sending every request through a BatchRPCClient (and so its endpoint pool)"""
+
+    def __init__(self, rpc):
+        super().__init__()
+        self.rpc = rpc
+
+    def make_request(self, method, params):
+        return self.rpc.request(method, params)
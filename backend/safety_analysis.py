@@ -0,0 +1,266 @@
+# safety_analysis.py - Bytecode-Based Token Safety Verdicts
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Set
+from hexbytes import HexBytes
+from web3 import Web3
+from multicall import Multicall3, function_selector
+from rpc_batch import BatchRPCClient
+
+# Same function families app/api/analyze-token/route.ts probes with eth_calls
+SAFETY_SELECTORS = {
+    "ownership": ["owner()", "renounceOwnership()", "transferOwnership(address)"],
+    "blacklist": ["isBlacklisted(address)", "blacklist(address)", "addToBlacklist(address)",
+                  "setBlacklist(address,bool)", "isBot(address)", "setBots(address[])"],
+    "tax_getters": ["_taxFee()", "_liquidityFee()", "_buyTax()", "_sellTax()", "buyTax()", "sellTax()"],
+    "tax_setters": ["setTaxFeePercent(uint256)", "setBuyTax(uint256)", "setSellTax(uint256)",
+                    "setFees(uint256,uint256)", "updateFees(uint256,uint256)"],
+    "max_tx": ["_maxTxAmount()", "maxTransactionAmount()", "setMaxTxAmount(uint256)", "setMaxTxPercent(uint256)"],
+    "mint": ["mint(address,uint256)", "mint(uint256)"],
+    "trading_toggle": ["enableTrading()", "openTrading()", "setTradingEnabled(bool)", "pause()"],
+}
+SELECTOR_BYTES = {
+    family: {signature: function_selector(signature) for signature in signatures}
+    for family, signatures in SAFETY_SELECTORS.items()
+}
+OWNER_SELECTOR = SELECTOR_BYTES["ownership"]["owner()"]
+# Checks that depend on the token's functions, unknown while its logic is
+UNKNOWN_LOGIC_CHECKS = [
+    ("Ownership Status", "Contract ownership renounced or safe", "high"),
+    ("Honeypot Detection", "Can sell tokens after buying", "high"),
+    ("Tax Analysis", "Buy/sell tax within reasonable limits", "medium"),
+    ("Supply Control", "Supply can't be inflated after launch", "medium"),
+]
+
+SELFDESTRUCT = 0xFF
+DELEGATECALL = 0xF4
+
+
+def strip_metadata(code: bytes) -> bytes:
+    """Drop the Solidity CBOR metadata trailer so it isn't read as opcodes"""
+    if len(code) < 2:
+        return code
+    length = int.from_bytes(code[-2:], "big")
+    start = len(code) - 2 - length
+    if 0 < length < len(code) - 2 and code[start] in (0xA1, 0xA2, 0xA3):
+        return code[:start]
+    return code
+
+
+def opcodes_present(code: bytes) -> Set[int]:
+    """Opcodes used by the code, skipping PUSH operands"""
+    code = strip_metadata(code)
+    opcodes = set()
+    i = 0
+    while i < len(code):
+        opcode = code[i]
+        opcodes.add(opcode)
+        i += 1 + (opcode - 0x5F if 0x60 <= opcode <= 0x7F else 0)
+    return opcodes
+
+
+def _check(name: str, description: str, status: str, severity: str, details: str) -> Dict:
+    """Same shape as SafetyCheck in the analyze-token route"""
+    return {"name": name, "description": description, "status": status, "severity": severity, "details": details}
+
+
+def overall_score(checks: Sequence[Dict]) -> Dict:
+    """calculateOverallScore from the analyze-token route"""
+    total = maximum = 0.0
+    for check in checks:
+        weight = 3 if check["severity"] == "high" else 2 if check["severity"] == "medium" else 1
+        maximum += weight
+        if check["status"] == "pass":
+            total += weight
+        elif check["status"] == "warning":
+            total += weight * 0.5
+
+    score = round(total / maximum * 100) if maximum else 0
+    if score >= 80:
+        risk_level = "low"
+    elif score >= 60:
+        risk_level = "moderate"
+    elif score >= 40:
+        risk_level = "high"
+    else:
+        risk_level = "very-high"
+    return {"overallScore": score, "riskLevel": risk_level}
+
+
+class SafetyAnalyzer:
+    """Safety signals (ownership, blacklist/honeypot, taxes, mint, self-destruct)
+    read from runtime bytecode.
+
+    Code-level findings are memoized by code hash, so cloned tokens are
+    analyzed once; only the owner() value is read per address (in one
+    Multicall3 call for the whole batch)."""
+
+    _memo: "OrderedDict[str, Dict]" = OrderedDict()
+    _lock = threading.Lock()
+    memo_size = 50000
+
+    def __init__(self, rpc: BatchRPCClient, multicall: Multicall3):
+        self.rpc = rpc
+        self.multicall = multicall
+
+    @classmethod
+    def _memoized(cls, code_hash: str) -> Optional[Dict]:
+        with cls._lock:
+            findings = cls._memo.get(code_hash)
+            if findings is not None:
+                cls._memo.move_to_end(code_hash)
+            return findings
+
+    @classmethod
+    def analyze_code(cls, code_hash: str, code: bytes) -> Dict:
+        """Code-level findings for one runtime code (memoized)"""
+        findings = cls._memoized(code_hash)
+        if findings is not None:
+            return findings
+
+        families = {
+            family: [signature for signature, selector in selectors.items() if selector in code]
+            for family, selectors in SELECTOR_BYTES.items()
+        }
+        opcodes = opcodes_present(code)
+        findings = {
+            "functions": {family: found for family, found in families.items() if found},
+            "selfdestruct": SELFDESTRUCT in opcodes,
+            "delegatecall": DELEGATECALL in opcodes
+        }
+        with cls._lock:
+            cls._memo[code_hash] = findings
+            while len(cls._memo) > cls.memo_size:
+                cls._memo.popitem(last=False)
+        return findings
+
+    def _findings_for(self, addresses: Sequence[str], classifications: Dict[str, Optional[Dict]],
+                      block: Optional[int] = None) -> Dict[str, Dict]:
+        """Findings per address, fetching code only for code hashes never analyzed"""
+        findings = {}
+        missing = {}  # address whose code to fetch -> (code hash, addresses using it)
+        for address in addresses:
+            classification = classifications.get(address) or {}
+            code_hash = classification.get("implementation_code_hash") or classification.get("code_hash")
+            if code_hash is None:
+                continue
+            memoized = self._memoized(code_hash)
+            if memoized is not None:
+                findings[address] = memoized
+                continue
+            source = classification.get("implementation") or address
+            missing.setdefault(source, (code_hash, []))[1].append(address)
+
+        sources = list(missing)
+        codes = self.rpc.state_batch([("eth_getCode", [source]) for source in sources], block) if sources else []
+        for source, code in zip(sources, codes):
+            if isinstance(code, Exception) or not code:
+                continue
+            code_hash, users = missing[source]
+            result = self.analyze_code(code_hash, bytes(HexBytes(code)))
+            for address in users:
+                findings[address] = result
+        return findings
+
+    def _owners(self, addresses: Sequence[str], block: Optional[int] = None) -> Dict[str, Optional[str]]:
+        results = self.multicall.try_aggregate([(address, OWNER_SELECTOR) for address in addresses], block)
+        # Zero owner is kept (renounced), unlike lp_probe.decode_address
+        return {
+            address: Web3.to_checksum_address(data[12:32]) if ok and len(data) >= 32 else None
+            for address, (ok, data) in zip(addresses, results)
+        }
+
+    def _checks(self, findings: Dict, owner: Optional[str], classification: Dict) -> List[Dict]:
+        functions = findings["functions"]
+        checks = []
+
+        # A proxy's own code has none of the token's functions; without its implementation they're unknown
+        if classification.get("kind") == "proxy" and not classification.get("implementation_code_hash"):
+            for name, description, severity in UNKNOWN_LOGIC_CHECKS:
+                checks.append(_check(name, description, "warning", severity,
+                                     "Proxy implementation unknown - not analyzed"))
+            return checks + self._code_checks(findings, classification)
+
+        if "ownership" not in functions:
+            checks.append(_check("Ownership Status", "Contract ownership renounced or safe", "pass", "high",
+                                 "No owner function found (likely safe)"))
+        elif owner is not None and int(owner, 16) == 0:
+            checks.append(_check("Ownership Status", "Contract ownership renounced or safe", "pass", "high",
+                                 "Ownership has been renounced"))
+        else:
+            details = f"Owner can modify contract: {owner[:6]}...{owner[-4:]}" if owner else "Owner can modify contract"
+            checks.append(_check("Ownership Status", "Contract ownership renounced or safe", "warning", "high", details))
+
+        if "blacklist" in functions:
+            checks.append(_check("Honeypot Detection", "Can sell tokens after buying", "fail", "high",
+                                 "Blacklist function detected - potential honeypot"))
+        elif "trading_toggle" in functions or "max_tx" in functions:
+            found = functions.get("trading_toggle", []) + functions.get("max_tx", [])
+            checks.append(_check("Honeypot Detection", "Can sell tokens after buying", "warning", "high",
+                                 f"Trading controls detected: {', '.join(found)}"))
+        else:
+            checks.append(_check("Honeypot Detection", "Can sell tokens after buying", "pass", "high",
+                                 "No obvious honeypot indicators found"))
+
+        if "tax_setters" in functions:
+            checks.append(_check("Tax Analysis", "Buy/sell tax within reasonable limits", "warning", "medium",
+                                 f"Adjustable taxes: {', '.join(functions['tax_setters'])}"))
+        elif "tax_getters" in functions:
+            checks.append(_check("Tax Analysis", "Buy/sell tax within reasonable limits", "warning", "medium",
+                                 f"Tax functions present: {', '.join(functions['tax_getters'])}"))
+        else:
+            checks.append(_check("Tax Analysis", "Buy/sell tax within reasonable limits", "pass", "medium",
+                                 "No tax functions found"))
+
+        if "mint" in functions:
+            checks.append(_check("Supply Control", "Supply can't be inflated after launch", "warning", "medium",
+                                 "Mint function detected"))
+        else:
+            checks.append(_check("Supply Control", "Supply can't be inflated after launch", "pass", "medium",
+                                 "No mint function found"))
+
+        return checks + self._code_checks(findings, classification)
+
+    @staticmethod
+    def _code_checks(findings: Dict, classification: Dict) -> List[Dict]:
+        checks = []
+        if findings["selfdestruct"]:
+            checks.append(_check("Self-Destruct", "Contract can't be destroyed", "fail", "high",
+                                 "SELFDESTRUCT opcode present"))
+        else:
+            checks.append(_check("Self-Destruct", "Contract can't be destroyed", "pass", "high",
+                                 "No SELFDESTRUCT opcode"))
+
+        if classification.get("kind") == "proxy":
+            details = (f"Upgradeable proxy of {classification['implementation']} - current logic analyzed"
+                       if classification.get("implementation_code_hash") else "Upgradeable proxy - logic not analyzed")
+            checks.append(_check("Upgradeability", "Token logic can't be replaced", "warning", "medium", details))
+        else:
+            checks.append(_check("Upgradeability", "Token logic can't be replaced", "pass", "medium",
+                                 "Logic is fixed" if classification.get("kind") != "eip1167"
+                                 else f"Minimal proxy of {classification['implementation']}"))
+        return checks
+
+    def analyze_many(self, addresses: Sequence[str], classifications: Dict[str, Optional[Dict]],
+                     block: Optional[int] = None) -> Dict[str, Optional[Dict]]:
+        """Safety verdict per address (None if its code is unknown). `classifications`
+        come from BytecodeClassifier.classify_many for the same addresses (and `block`)."""
+        findings = self._findings_for(addresses, classifications, block)
+        ownable = [address for address, found in findings.items() if "ownership" in found["functions"]]
+        owners = self._owners(ownable, block) if ownable else {}
+
+        verdicts = {}
+        for address in addresses:
+            if address not in findings:
+                verdicts[address] = None
+                continue
+            classification = classifications.get(address) or {}
+            checks = self._checks(findings[address], owners.get(address), classification)
+            verdicts[address] = {
+                "checks": checks,
+                **overall_score(checks),
+                "owner": owners.get(address),
+                "code_hash": classification.get("implementation_code_hash") or classification.get("code_hash"),
+                "source": "bytecode"
+            }
+        return verdicts
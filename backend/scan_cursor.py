@@ -0,0 +1,120 @@
+# scan_cursor.py - Persistent Per-Chain Scan Checkpoints
+import json
+import os
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+class ScanCursorStore:
+    """Last fully processed block per chain_id, so scans resume exactly where
+    the previous run stopped (no rescans, no gaps).
+
+    Each commit first appends the batch's results to a JSONL journal and
+    then atomically replaces the cursor file, so a crash loses at most the
+    batch that was in flight. Callers fold `pending()` into their output on
+    save and then `clear_journal()`, so results committed by a run that
+    crashed before saving are recovered by the next one."""
+
+    def __init__(self, path: str = os.path.join("cache", "scan_cursors.json")):
+        self.path = path
+        self.journal_path = os.path.splitext(path)[0] + "_journal.jsonl"
+        self._lock = threading.Lock()
+        self._cursors: Dict[str, int] = self._load()
+
+    def _load(self) -> Dict[str, int]:
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path) as f:
+                return {str(k): int(v) for k, v in json.load(f).items()}
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Could not read scan cursors {self.path}: {e}")
+            return {}
+
+    def get(self, chain_id: int) -> Optional[int]:
+        """Last fully processed block, None if the chain was never scanned"""
+        with self._lock:
+            return self._cursors.get(str(chain_id))
+
+    def next_range(self, chain_id: int, latest_block: int, default_block_count: int,
+                   max_blocks: Optional[int] = None) -> Optional[Tuple[int, int]]:
+        """(start, end) of the blocks still to scan, None if up to date.
+        First run falls back to the last `default_block_count` blocks."""
+        cursor = self.get(chain_id)
+        start_block = cursor + 1 if cursor is not None else latest_block - default_block_count
+        if start_block > latest_block:
+            return None
+        end_block = latest_block
+        if max_blocks is not None:
+            end_block = min(end_block, start_block + max_blocks - 1)
+        return start_block, end_block
+
+    def pending(self) -> List[Dict]:
+        """Results committed since the journal was last cleared (possibly never saved)"""
+        with self._lock:
+            if not os.path.exists(self.journal_path):
+                return []
+            results = []
+            with open(self.journal_path) as f:
+                for line in f:
+                    try:
+                        results.append(json.loads(line))
+                    except ValueError:
+                        continue  # Torn last line from a crash mid-append
+            return results
+
+    def clear_journal(self):
+        """Drop the journal once its results are in the saved output"""
+        with self._lock:
+            if os.path.exists(self.journal_path):
+                os.remove(self.journal_path)
+
+    def commit(self, chain_id: int, block_number: int, results: Sequence[Dict] = ()):
+        """Record `block_number` as fully processed, journaling its results first"""
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+
+            if results:
+                with open(self.journal_path, "a") as f:
+                    for result in results:
+                        f.write(json.dumps(result) + "\n")
+                    f.flush()
+                    os.fsync(f.fileno())
+
+            current = self._cursors.get(str(chain_id))
+            if current is not None and block_number <= current:
+                return
+            self._cursors[str(chain_id)] = block_number
+
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(self._cursors, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+
+
+class BlockWatermark:
+    """Turns out-of-order batch completions into a contiguous "processed up to" block.
+    Results of batches finishing ahead of the watermark are held back until
+    the gap before them is filled."""
+
+    def __init__(self, start_block: int):
+        self.next_block = start_block
+        self._done: Dict[int, Tuple[int, List[Dict]]] = {}  # batch start -> (batch end, results)
+
+    def mark_done(self, block_numbers: Sequence[int], results: Sequence[Dict]) -> Optional[Tuple[int, List[Dict]]]:
+        """Returns (new watermark, results now safe to commit) if it advanced"""
+        self._done[block_numbers[0]] = (block_numbers[-1], list(results))
+
+        released = []
+        advanced = False
+        while self.next_block in self._done:
+            end_block, batch_results = self._done.pop(self.next_block)
+            released.extend(batch_results)
+            self.next_block = end_block + 1
+            advanced = True
+
+        if not advanced:
+            return None
+        return self.next_block - 1, released
@@ -0,0 +1,146 @@
+# scan_pipeline.py - Staged Async Block Scanning Pipeline
+import asyncio
+from typing import Callable, Dict, List, Optional
+
+_DONE = object()  # End-of-stream marker passed between stages
+
+
+class ScanPipeline:
+    """block prefetch -> deployment extraction -> enrichment -> result sink
+
+    With the scanner's discovery_mode set to "logs", the first two stages
+    fetch zero-address Transfer logs per range and pick out newly born tokens
+    instead of downloading full blocks.
+
+    Stages are connected by bounded queues, so a slow enrichment stage
+    applies backpressure to block fetching instead of letting fetched
+    blocks pile up in memory, while block ingestion keeps running ahead as
+    long as there is queue room. Blocking RPC work (batched JSON-RPC,
+    Multicall3) runs in worker threads via asyncio.to_thread.
+
+    `scanner` is a chain-bound MultiChainTokenScanner."""
+
+    def __init__(self, scanner, block_fetchers: int = 2, enrich_workers: int = 2, queue_size: int = 4,
+                 on_batch: Optional[Callable[[List[Dict], List[int], List[int]], None]] = None):
+        self.scanner = scanner
+        self.block_fetchers = max(1, block_fetchers)
+        self.enrich_workers = max(1, enrich_workers)
+        self.queue_size = max(1, queue_size)  # Batches buffered between two stages
+        self.on_batch = on_batch  # Called by the sink with (results, block_numbers, failed_blocks) per batch
+        self.end_block: Optional[int] = None  # Last block of the running scan
+
+    async def latest_block(self) -> int:
+        """Chain head, asked through the scanner's RPC client (and its endpoint pool)"""
+        return int(await asyncio.to_thread(self.scanner.rpc.call, "eth_blockNumber"), 16)
+
+    async def scan_recent(self, block_count: int) -> List[Dict]:
+        """Scan the last N blocks up to the current head"""
+        latest_block = await self.latest_block()
+        start_block = latest_block - block_count
+
+        chain = self.scanner.current_chain
+        chain_icon = "🟢" if chain.is_op_stack else "🔵"
+        print(f"🔍 Scanning {chain.name.upper()} blocks {start_block} to {latest_block}... {chain_icon}")
+
+        await asyncio.to_thread(self.scanner.sync_pool_index, start_block, latest_block)
+        return await self.run(start_block, latest_block)
+
+    @property
+    def discover_by_logs(self) -> bool:
+        return self.scanner.discovery_mode == "logs"
+
+    def _batches(self, start_block: int, end_block: int) -> List[List[int]]:
+        # Log discovery needs one eth_getLogs per range, not one request per block
+        if self.discover_by_logs:
+            batch_size = self.scanner.token_births.max_block_range
+        else:
+            batch_size = self.scanner.current_chain.rpc_batch_size
+        return [
+            list(range(batch_start, min(batch_start + batch_size, end_block + 1)))
+            for batch_start in range(start_block, end_block + 1, batch_size)
+        ]
+
+    async def _prefetch(self, batches: asyncio.Queue, blocks_out: asyncio.Queue):
+        while True:
+            block_numbers = await batches.get()
+            if block_numbers is _DONE:
+                return
+            if self.discover_by_logs:
+                print(f"📜 Fetching mint logs {block_numbers[0]}-{block_numbers[-1]}...")
+                blocks = await asyncio.to_thread(self.scanner.fetch_mint_logs, block_numbers)
+            else:
+                print(f"📦 Fetching blocks {block_numbers[0]}-{block_numbers[-1]}...")
+                blocks = await asyncio.to_thread(self.scanner.rpc.fetch_blocks, block_numbers, True)
+            await blocks_out.put((block_numbers, blocks))
+
+    async def _extract(self, blocks_in: asyncio.Queue, candidates_out: asyncio.Queue):
+        while True:
+            item = await blocks_in.get()
+            if item is _DONE:
+                return
+            block_numbers, blocks = item
+            extract = self.scanner.extract_births if self.discover_by_logs else self.scanner.extract_candidates
+            candidates, failed_blocks = await asyncio.to_thread(extract, block_numbers, blocks)
+            await candidates_out.put((block_numbers, candidates, failed_blocks))
+
+    async def _enrich(self, candidates_in: asyncio.Queue, results_out: asyncio.Queue):
+        while True:
+            item = await candidates_in.get()
+            if item is _DONE:
+                return
+            block_numbers, candidates, failed_blocks = item
+            results = []
+            if candidates:
+                results = await asyncio.to_thread(
+                    self.scanner.enrich_candidates, candidates, block_numbers[0], self.end_block
+                )
+            await results_out.put((block_numbers, results, failed_blocks))
+
+    async def _sink(self, results_in: asyncio.Queue, collected: List[Dict]):
+        while True:
+            item = await results_in.get()
+            if item is _DONE:
+                return
+            block_numbers, results, failed_blocks = item
+            for result in results:
+                print(f"✅ Contract saved: {result['metadata']['symbol']} - LP={result['lp_info']['status']}")
+            collected.extend(results)
+            if self.on_batch:
+                self.on_batch(results, block_numbers, failed_blocks)
+
+    async def _run_stage(self, workers: List, out_queue: Optional[asyncio.Queue], downstream_workers: int):
+        """Wait for a stage's workers, then tell every downstream worker to stop"""
+        await asyncio.gather(*workers)
+        if out_queue is not None:
+            for _ in range(downstream_workers):
+                await out_queue.put(_DONE)
+
+    async def run(self, start_block: int, end_block: int) -> List[Dict]:
+        """Scan [start_block, end_block] and return results ordered by block"""
+        self.end_block = end_block
+        batch_queue = asyncio.Queue()
+        for block_numbers in self._batches(start_block, end_block):
+            batch_queue.put_nowait(block_numbers)
+        for _ in range(self.block_fetchers):
+            batch_queue.put_nowait(_DONE)
+
+        blocks_queue = asyncio.Queue(maxsize=self.queue_size)
+        candidates_queue = asyncio.Queue(maxsize=self.queue_size)
+        results_queue = asyncio.Queue(maxsize=self.queue_size)
+        collected: List[Dict] = []
+
+        await asyncio.gather(
+            self._run_stage(
+                [self._prefetch(batch_queue, blocks_queue) for _ in range(self.block_fetchers)],
+                blocks_queue, 1
+            ),
+            self._run_stage([self._extract(blocks_queue, candidates_queue)], candidates_queue, self.enrich_workers),
+            self._run_stage(
+                [self._enrich(candidates_queue, results_queue) for _ in range(self.enrich_workers)],
+                results_queue, 1
+            ),
+            self._run_stage([self._sink(results_queue, collected)], None, 0),
+        )
+
+        collected.sort(key=lambda r: (r["block"], r["hash"]))
+        return collected
@@ -2,33 +2,59 @@
 from web3 import Web3
 from datetime import datetime
 import json
-import time
+import os
+from http_pool import get_web3
+from adaptive_limiter import get_limiter, retry_with_backoff
+from rpc_batch import BatchRPCClient
+from receipts import ReceiptsProvider
+from scan_cursor import ScanCursorStore
 
 class SimpleContractScanner:
     def __init__(self):
         # Base chain ile başlayalım (en stabil)
-        self.w3 = Web3(Web3.HTTPProvider("https://mainnet.base.org"))
+        self.w3 = get_web3("https://mainnet.base.org")
         self.chain_name = "base"
+        self.chain_id = 8453
+        self.rpc = BatchRPCClient("https://mainnet.base.org", batch_size=10)
+        # Blok başına sabit sleep yerine AIMD limiter (rpc client ile aynı endpoint limiti)
+        self.limiter = get_limiter("https://mainnet.base.org")
+        self.receipts = ReceiptsProvider(self.rpc, chain_id=self.chain_id)
         
-    def scan_latest_blocks(self, block_count=5):
-        """Son N bloku tarayarak contract deployment'ları bul"""
+    def scan_latest_blocks(self, block_count=5, cursor_store=None):
+        """Son N bloku tarayarak contract deployment'ları bul.
+        cursor_store verilirse son checkpoint'ten devam eder."""
         print(f"🔍 Scanning last {block_count} blocks on {self.chain_name}...")
         
         try:
             latest_block = self.w3.eth.block_number
             start_block = latest_block - block_count
+            
+            if cursor_store is not None:
+                block_range = cursor_store.next_range(self.chain_id, latest_block, block_count)
+                if block_range is None:
+                    print(f"✅ Already scanned up to block {latest_block}")
+                    return []
+                start_block = block_range[0]
+            
             print(f"📊 Scanning blocks {start_block} to {latest_block}")
             
             results = []
+            checkpoint_held = False  # Hata olan bloktan sonra checkpoint ilerlemez
             
             for block_num in range(start_block, latest_block + 1):
                 print(f"📦 Scanning block {block_num}...")
+                block_results = []
                 
                 try:
                     # Block'u transaction'larıyla beraber al
-                    block = self.w3.eth.get_block(block_num, full_transactions=True)
+                    block = retry_with_backoff(self.w3.eth.get_block, block_num, full_transactions=True,
+                                               limiter=self.limiter)
                     print(f"   Found {len(block.transactions)} transactions")
                     
+                    # Deployment receipt'lerini blok başına tek seferde al
+                    deploy_hashes = [tx.hash for tx in block.transactions if tx.to is None]
+                    receipts = self.receipts.get_receipts(block_num, deploy_hashes)
+                    
                     for i, tx in enumerate(block.transactions):
                         # Contract deployment transaction'ı: to == None
                         if tx.to is None:
@@ -36,7 +62,10 @@ class SimpleContractScanner:
                             
                             # Transaction receipt'ini al
                             try:
-                                receipt = self.w3.eth.get_transaction_receipt(tx.hash)
+                                receipt = receipts.get(tx.hash)
+                                if receipt is None:
+                                    receipt = retry_with_backoff(self.w3.eth.get_transaction_receipt, tx.hash,
+                                                                 limiter=self.limiter)
                                 
                                 if receipt.contractAddress:
                                     contract_data = {
@@ -50,19 +79,22 @@ class SimpleContractScanner:
                                         "block_timestamp": block.timestamp
                                     }
                                     
-                                    results.append(contract_data)
+                                    block_results.append(contract_data)
                                     print(f"   📋 Contract: {receipt.contractAddress}")
                                     print(f"   👤 Deployer: {tx['from']}")
                                     print(f"   ⛽ Gas used: {receipt.gasUsed}")
                                     
                             except Exception as e:
                                 print(f"   ⚠️ Receipt error: {e}")
+                                checkpoint_held = True
                                 
                 except Exception as e:
                     print(f"⚠️ Block {block_num} error: {e}")
-                    
-                # Rate limiting
-                time.sleep(0.5)
+                    checkpoint_held = True
+                
+                results.extend(block_results)
+                if cursor_store is not None and not checkpoint_held:
+                    cursor_store.commit(self.chain_id, block_num, block_results)
             
             print(f"\n✅ Scan complete! Found {len(results)} contract deployments")
             return results
@@ -76,10 +108,13 @@ def main():
     
     scanner = SimpleContractScanner()
     
-    # Test: Son 5 bloku tara (fazla yapmayalım rate limiting için)
-    contracts = scanner.scan_latest_blocks(5)
+    # Son checkpoint'ten devam et (ilk çalıştırmada son 5 blok)
+    cursor_store = ScanCursorStore(os.path.join("cache", "simple_scanner_cursors.json"))
+    contracts = scanner.scan_latest_blocks(5, cursor_store=cursor_store)
     
-    if contracts:
+    # Kaydedilmeden çöken önceki çalıştırmanın sonuçları journal'da
+    pending = cursor_store.pending()
+    if contracts or pending:
         print(f"\n📋 Found {len(contracts)} contract deployments:")
         
         for i, contract in enumerate(contracts, 1):
@@ -89,9 +124,18 @@ def main():
             print(f"   Block: {contract['block']}")
             print(f"   Time: {contract['timestamp']}")
         
-        # JSON'a kaydet
+        # JSON'a kaydet (önceki çalıştırmaların kayıtları korunur)
+        saved = []
+        if os.path.exists("contract_deployments.json"):
+            try:
+                with open("contract_deployments.json") as f:
+                    saved = json.load(f)
+            except ValueError:
+                saved = []
+        merged = {c["contract_address"]: c for c in saved + pending + contracts}
         with open("contract_deployments.json", "w") as f:
-            json.dump(contracts, f, indent=2)
+            json.dump(list(merged.values()), f, indent=2)
+        cursor_store.clear_journal()
         
         print(f"\n💾 Results saved to contract_deployments.json")
         
@@ -0,0 +1,103 @@
+# test_chain_follower.py - ChainFollower against an in-memory chain (no RPC)
+import threading
+from types import SimpleNamespace
+
+from chain_follower import ChainFollower, LocalHeadSource
+
+
+def make_block(number: int, fork: str = "a") -> SimpleNamespace:
+    """Block `number` of branch `fork`; its parent is the same branch's previous block"""
+    return SimpleNamespace(
+        number=number,
+        hash=f"{fork}{number}".encode(),
+        parentHash=f"{fork}{number - 1}".encode()
+    )
+
+
+def make_chain(first: int, last: int, fork: str = "a", parent_fork: str = "a") -> list:
+    blocks = [make_block(n, fork) for n in range(first, last + 1)]
+    blocks[0].parentHash = f"{parent_fork}{first - 1}".encode()
+    return blocks
+
+
+class FakeScanner:
+    """One deployment per block, named after the block's hash"""
+
+    def __init__(self):
+        self.current_chain = SimpleNamespace(name="local", block_time=0.01)
+
+    def extract_candidates(self, block_numbers, blocks):
+        return [SimpleNamespace(block=block.number, hash=bytes(block.hash).decode()) for block in blocks], []
+
+    def enrich_candidates(self, candidates, since_block, to_block=None):
+        return [{
+            "block": c.block,
+            "hash": c.hash,
+            "contract_address": f"0x{c.hash}",
+            "metadata": {"symbol": c.hash.upper()},
+            "lp_info": {"status": "none"}
+        } for c in candidates]
+
+
+def test_step_processes_every_new_block():
+    source = LocalHeadSource(make_chain(0, 3))
+    follower = ChainFollower(FakeScanner(), source, start_block=1)
+
+    results = follower.step()
+
+    assert [r["hash"] for r in results] == ["a1", "a2", "a3"]
+    assert follower.last_block == 3
+    assert follower.step() == []
+
+
+def test_reorg_rolls_back_orphaned_results():
+    source = LocalHeadSource(make_chain(0, 5))
+    rolled_back = []
+    follower = ChainFollower(FakeScanner(), source, start_block=1, on_rollback=rolled_back.extend)
+    follower.step()
+
+    # Blocks 4-5 are replaced by a longer branch forking off block 3
+    source.reorg(make_chain(4, 6, fork="b"))
+    new_results = follower.step()
+
+    assert sorted(r["hash"] for r in rolled_back) == ["a4", "a5"]
+    assert [r["hash"] for r in new_results] == ["b4", "b5", "b6"]
+    assert [r["hash"] for r in follower.results] == ["a1", "a2", "a3", "b4", "b5", "b6"]
+    assert follower.last_block == 6
+
+
+def test_reorg_beyond_tracked_blocks_rescans_from_window_start():
+    source = LocalHeadSource(make_chain(0, 4))
+    rolled_back = []
+    follower = ChainFollower(FakeScanner(), source, start_block=1, reorg_depth=2, on_rollback=rolled_back.extend)
+    follower.step()
+
+    source.reorg(make_chain(3, 5, fork="b"))
+    follower.step()
+
+    assert sorted(r["hash"] for r in rolled_back) == ["a3", "a4"]
+    assert [r["hash"] for r in follower.results] == ["b4", "b5"]  # Window is 2 blocks deep
+
+
+class FlakyHeadSource(LocalHeadSource):
+    """Head source whose first `failures` waits raise, like an RPC that's down"""
+
+    def __init__(self, blocks, failures: int):
+        super().__init__(blocks)
+        self.failures = failures
+
+    def wait_for_new_head(self, last_seen, timeout=None):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("endpoint unreachable")
+        return super().wait_for_new_head(last_seen, timeout)
+
+
+def test_run_survives_head_source_errors():
+    source = FlakyHeadSource(make_chain(0, 3), failures=2)
+    follower = ChainFollower(FakeScanner(), source, start_block=1)
+
+    follower.run(max_blocks=3, stop_event=threading.Event())
+
+    assert source.failures == 0
+    assert [r["hash"] for r in follower.results] == ["a1", "a2", "a3"]
@@ -0,0 +1,23 @@
+# test_imports.py - CLI startup stays free of heavy dependencies, scripts import cleanly
+from backend.__main__ import HEAVY_MODULES, _import_profile, main
+
+# Standalone scripts (scan only from main()); importing them must work
+SCRIPT_MODULES = ("fetch_tokens", "fetch_tokens_with_chart")
+
+
+def test_cli_import_loads_no_heavy_modules():
+    profile = _import_profile("import backend.__main__")
+
+    assert profile["ok"], profile["error"]
+    assert not set(HEAVY_MODULES) & profile["packages"]
+
+
+def test_scripts_import_cleanly():
+    for module in SCRIPT_MODULES:
+        profile = _import_profile(f"import backend, {module}")
+
+        assert profile["ok"], f"{module}: {profile['error']}"
+
+
+def test_bench_rejects_unknown_commands():
+    assert main(["bench", "no-such-command"]) == 2
@@ -0,0 +1,25 @@
+# test_lp_resolver.py - Offline pool addresses against pairs deployed on-chain
+from lp_resolver import (
+    QUICKSWAP_V2_INIT_CODE_HASH, UNISWAP_V2_INIT_CODE_HASH, compute_v2_pair_address
+)
+
+
+def test_uniswap_v2_pair_address():
+    # Ethereum USDC/WETH
+    pair = compute_v2_pair_address(
+        "0x5C69bEe701ef814a2B6a3EDD4B1652CB9cc5aA6f",
+        "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2",
+        "0xA0b86991c6218b36c1d19D4a2e9Eb0cE3606eB48",
+        UNISWAP_V2_INIT_CODE_HASH
+    )
+    assert pair == "0xB4e16d0168e52d35CaCD2c6185b44281Ec28C9Dc"
+
+
+def test_quickswap_v2_pair_address():
+    # Polygon WMATIC/USDC.e, token order must not matter
+    factory = "0x5757371414417b8C6CAad45bAeF941aBc7d3Ab32"
+    wmatic = "0x0d500B1d8E8eF31E21C99d1Db9A6444d3ADf1270"
+    usdc = "0x2791Bca1f2de4661ED88A30C99A7a9449Aa84174"
+    expected = "0x6e7a5FAFcec6BB1e78bAE2A1F0B612012BF14827"
+    assert compute_v2_pair_address(factory, wmatic, usdc, QUICKSWAP_V2_INIT_CODE_HASH) == expected
+    assert compute_v2_pair_address(factory, usdc, wmatic, QUICKSWAP_V2_INIT_CODE_HASH) == expected
@@ -1,12 +1,13 @@
 # test_rpc.py - RPC Bağlantılarını Test Et
-from web3 import Web3
-import time
+from http_pool import get_web3
+from rpc_batch import BatchRPCClient
+from rpc_pool import EndpointPool
 
 def test_rpc_connection(chain_name, rpc_url):
     """RPC bağlantısını test et"""
     try:
         print(f"\n🔍 Testing {chain_name}...")
-        w3 = Web3(Web3.HTTPProvider(rpc_url))
+        w3 = get_web3(rpc_url)
         
         # Bağlantı test et
         is_connected = w3.is_connected()
@@ -29,22 +30,37 @@ def test_rpc_connection(chain_name, rpc_url):
         print(f"   ❌ Error: {e}")
         return False
 
+def check_endpoint_pool(chain_name, rpc_urls, rounds=3):
+    """Bir zincirin tüm endpoint'lerini ölç: latency, head lag, hata oranı"""
+    print(f"\n🔍 Probing {len(rpc_urls)} endpoints for {chain_name}...")
+    pool = EndpointPool(rpc_urls)
+    rpc = BatchRPCClient(rpc_urls[0], endpoints=pool)
+
+    # Birkaç tur ölçüm, tek seferlik bağlantı testinden daha güvenilir
+    for _ in range(rounds):
+        pool.probe_all(rpc.probe_head)
+
+    for endpoint in pool.report():
+        status = "✅" if endpoint["healthy"] and endpoint["head"] is not None else "❌"
+        print(f"   {status} {endpoint['url']}: latency={endpoint['latency_ms']}ms "
+              f"head={endpoint['head']} lag={endpoint['head_lag']} errors={endpoint['error_rate']}")
+    pool.stop_probes()
+
+    return any(e["healthy"] and e["head"] is not None for e in pool.report())
+
 def main():
+    from multichain_scanner import MultiChainTokenScanner
+
     print("🚀 Testing RPC Connections for Superchain...")
-    
-    # RPC endpoints
-    chains = {
-        "Base": "https://mainnet.base.org",
-        "OP Mainnet": "https://mainnet.optimism.io", 
-        "Ethereum": "https://ethereum.publicnode.com"
-    }
-    
+
+    # Her zincirin endpoint listesi ChainConfig'ten
+    chains = MultiChainTokenScanner().chains
+
     results = {}
-    
-    for chain_name, rpc_url in chains.items():
-        results[chain_name] = test_rpc_connection(chain_name, rpc_url)
-        time.sleep(1)  # Rate limiting
-    
+
+    for chain_name, config in chains.items():
+        results[chain_name] = check_endpoint_pool(chain_name, config.rpc_urls)
+
     print(f"\n📊 Test Results Summary:")
     print("=" * 30)
     for chain, success in results.items():
@@ -52,4 +68,4 @@ def main():
         print(f"{chain}: {status}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
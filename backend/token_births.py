@@ -0,0 +1,96 @@
+# token_births.py - Token Discovery from Zero-Address Transfer Mints
+from typing import Dict, List, Optional, Sequence
+from web3 import Web3
+from rpc_batch import BatchRPCClient
+from log_fetcher import LogRangeFetcher
+from block_timestamps import BlockTimestampCache
+
+TRANSFER_TOPIC = Web3.to_hex(Web3.keccak(text="Transfer(address,address,uint256)"))
+ZERO_TOPIC = "0x" + "00" * 32
+
+
+class TokenBirthDetector:
+    """Finds new tokens from Transfer(address(0), to, amount) mint logs.
+
+    One eth_getLogs per block range replaces downloading every transaction,
+    and it also catches tokens created by factories (internal CREATE/CREATE2),
+    which never show up as a `to is None` transaction. An emitter counts as
+    born in the range if it had no code right before the range starts.
+
+    That check reads state at the block before each range, so ranges older
+    than the node's state window (about 128 blocks on non-archive nodes)
+    need an archive endpoint. Emitters whose past code can't be read are
+    skipped, never reported as new."""
+
+    def __init__(self, rpc: BatchRPCClient, log_fetcher: Optional[LogRangeFetcher] = None,
+                 max_block_range: int = 2000, timestamps: Optional[BlockTimestampCache] = None):
+        self.rpc = rpc
+        self.log_fetcher = log_fetcher or LogRangeFetcher(rpc)
+        self.timestamps = timestamps or BlockTimestampCache(rpc)
+        self.max_block_range = max_block_range  # Blocks per scan batch; the fetcher splits them as needed
+        self.born = set()  # Emitters already reported as new
+        self.code_at: Dict[str, int] = {}  # Emitter -> earliest block it's known to have code at
+
+    def fetch_mint_logs(self, from_block: int, to_block: int) -> List:
+        return self.log_fetcher.get_logs({"topics": [TRANSFER_TOPIC, ZERO_TOPIC]}, from_block, to_block)
+
+    def _had_code_before(self, addresses: Sequence[str], block_number: int) -> Dict[str, Optional[bool]]:
+        """True if the address had code at `block_number` (i.e. it isn't new), None if unknown"""
+        codes = self.rpc.batch([("eth_getCode", [address, hex(block_number)]) for address in addresses])
+        had_code = {}
+        for address, code in zip(addresses, codes):
+            if isinstance(code, Exception):
+                had_code[address] = None  # e.g. state pruned on this node: old tokens would look new
+            else:
+                had_code[address] = code not in (None, "0x", "0x0", "")
+        return had_code
+
+    def births(self, logs: Sequence, from_block: int) -> List[Dict]:
+        """First mint of every token born in the range starting at `from_block`:
+        {"address", "block", "tx_hash", "timestamp"} ordered by block"""
+        first_mints = {}
+        for log in sorted(logs, key=lambda l: (l.blockNumber, l.logIndex)):
+            # ERC-721 mints share the topic but index the token id as a 4th topic
+            if len(log.topics) != 3:
+                continue
+            address = log.address
+            if address in self.born or self.code_at.get(address, from_block) < from_block:
+                continue  # Reported already / known to predate this range
+            first_mints.setdefault(address, log)
+        if not first_mints:
+            return []
+
+        # Ranges may finish out of order, so remember where code was seen rather than just "seen"
+        had_code = self._had_code_before(list(first_mints), from_block - 1)
+        born = []
+        unknown = 0
+        for address, log in first_mints.items():
+            if had_code[address] is None:
+                unknown += 1
+            elif had_code[address]:
+                self.code_at[address] = min(self.code_at.get(address, from_block - 1), from_block - 1)
+            else:
+                self.born.add(address)
+                born.append(log)
+        if unknown:
+            print(f"⚠️ Skipped {unknown} mint emitters: no state at block {from_block - 1} "
+                  f"(log discovery this far back needs an archive node)")
+
+        # One timestamp per block, computed on fixed-cadence chains, else from cached headers
+        timestamps = self.timestamps.get_many(sorted({log.blockNumber for log in born}))
+        return [{
+            "address": log.address,
+            "block": log.blockNumber,
+            "tx_hash": log.transactionHash,
+            "timestamp": timestamps.get(log.blockNumber, 0)
+        } for log in born]
+
+    def resolve_creators(self, tx_hashes: Sequence) -> Dict:
+        """Sender of each birth transaction (one batched eth_getTransactionByHash)"""
+        unique = list(dict.fromkeys(tx_hashes))
+        txs = self.rpc.batch([("eth_getTransactionByHash", [Web3.to_hex(tx_hash)]) for tx_hash in unique])
+        return {
+            tx_hash: Web3.to_checksum_address(tx["from"])
+            for tx_hash, tx in zip(unique, txs)
+            if isinstance(tx, dict) and tx.get("from")
+        }
@@ -2,83 +2,74 @@
 # token_checker.py - Contract'ların Token Olup Olmadığını Kontrol Et
 from web3 import Web3
 import json
+from http_pool import get_web3
+from multicall import Multicall3, TokenMetadataReader
+from metadata_cache import CachedMetadataReader, MetadataCache
 
 class TokenChecker:
     def __init__(self):
-        self.w3 = Web3(Web3.HTTPProvider("https://mainnet.base.org"))
+        self.w3 = get_web3("https://mainnet.base.org")
         
-        # ERC-20 ABI (basic functions)
-        self.erc20_abi = [
-            {"constant": True, "inputs": [], "name": "name", "outputs": [{"name": "", "type": "string"}], "type": "function"},
-            {"constant": True, "inputs": [], "name": "symbol", "outputs": [{"name": "", "type": "string"}], "type": "function"},
-            {"constant": True, "inputs": [], "name": "decimals", "outputs": [{"name": "", "type": "uint8"}], "type": "function"},
-            {"constant": True, "inputs": [], "name": "totalSupply", "outputs": [{"name": "", "type": "uint256"}], "type": "function"}
-        ]
+        # name/symbol/decimals/totalSupply tek Multicall3 çağrısında,
+        # daha önce görülen token'lar cache'ten gelir
+        self.metadata_reader = CachedMetadataReader(
+            TokenMetadataReader(Multicall3(self.w3)), MetadataCache(), chain_id=8453
+        )
     
-    def check_if_token(self, contract_address):
-        """Contract'ın ERC-20 token olup olmadığını kontrol et"""
-        print(f"\n🔍 Checking {contract_address}...")
+    def _build_metadata(self, raw):
+        """Multicall sonucunu eski metadata formatına çevir"""
+        metadata = {}
+        is_token = True
         
-        try:
-            contract = self.w3.eth.contract(
-                address=Web3.to_checksum_address(contract_address), 
-                abi=self.erc20_abi
-            )
-            
-            metadata = {}
-            is_token = True
-            
-            # Name function'ını dene
-            try:
-                metadata["name"] = contract.functions.name().call()
-                print(f"   ✅ Name: {metadata['name']}")
-            except Exception as e:
-                print(f"   ❌ Name function failed: {e}")
-                is_token = False
-                
-            # Symbol function'ını dene
-            try:
-                metadata["symbol"] = contract.functions.symbol().call()
-                print(f"   ✅ Symbol: {metadata['symbol']}")
-            except Exception as e:
-                print(f"   ❌ Symbol function failed: {e}")
-                is_token = False
-                
-            # Decimals function'ını dene
-            try:
-                metadata["decimals"] = contract.functions.decimals().call()
-                print(f"   ✅ Decimals: {metadata['decimals']}")
-            except Exception as e:
-                print(f"   ❌ Decimals function failed: {e}")
-                is_token = False
-                
-            # Total Supply function'ını dene
-            try:
-                total_supply = contract.functions.totalSupply().call()
-                metadata["totalSupply"] = total_supply
-                # Human readable format
-                if metadata.get("decimals"):
-                    readable_supply = total_supply / (10 ** metadata["decimals"])
-                    metadata["readableSupply"] = readable_supply
-                    print(f"   ✅ Total Supply: {readable_supply:,.2f} {metadata.get('symbol', 'tokens')}")
-                else:
-                    print(f"   ✅ Total Supply: {total_supply}")
-            except Exception as e:
-                print(f"   ❌ Total Supply function failed: {e}")
+        for field in ("name", "symbol", "decimals"):
+            if raw[field] is not None:
+                metadata[field] = raw[field]
+                print(f"   ✅ {field.capitalize()}: {raw[field]}")
+            else:
+                print(f"   ❌ {field.capitalize()} function failed")
                 is_token = False
-            
-            if is_token:
-                print(f"   🎯 This is a TOKEN! {metadata.get('symbol', 'UNKNOWN')}")
-                metadata["is_token"] = True
+        
+        total_supply = raw["totalSupply"]
+        if total_supply is not None:
+            metadata["totalSupply"] = total_supply
+            # Human readable format
+            if metadata.get("decimals"):
+                readable_supply = total_supply / (10 ** metadata["decimals"])
+                metadata["readableSupply"] = readable_supply
+                print(f"   ✅ Total Supply: {readable_supply:,.2f} {metadata.get('symbol', 'tokens')}")
             else:
-                print(f"   ℹ️ Not a standard ERC-20 token")
-                metadata["is_token"] = False
-                
-            return metadata
-            
+                print(f"   ✅ Total Supply: {total_supply}")
+        else:
+            print(f"   ❌ Total Supply function failed")
+            is_token = False
+        
+        if is_token:
+            print(f"   🎯 This is a TOKEN! {metadata.get('symbol', 'UNKNOWN')}")
+            metadata["is_token"] = True
+        else:
+            print(f"   ℹ️ Not a standard ERC-20 token")
+            metadata["is_token"] = False
+        
+        return metadata
+    
+    def check_many(self, contract_addresses):
+        """Birden fazla contract'ı tek seferde kontrol et"""
+        try:
+            raw_metadata = self.metadata_reader.read_many(contract_addresses)
         except Exception as e:
             print(f"   ❌ Contract check error: {e}")
-            return {"is_token": False, "error": str(e)}
+            return {address: {"is_token": False, "error": str(e)} for address in contract_addresses}
+        
+        results = {}
+        for contract_address in contract_addresses:
+            print(f"\n🔍 Checking {contract_address}...")
+            raw = raw_metadata[Web3.to_checksum_address(contract_address)]
+            results[contract_address] = self._build_metadata(raw)
+        return results
+    
+    def check_if_token(self, contract_address):
+        """Contract'ın ERC-20 token olup olmadığını kontrol et"""
+        return self.check_many([contract_address])[contract_address]
 
 def main():
     print("🚀 Token Checker Starting...")
@@ -91,9 +82,10 @@ def main():
     
     checker = TokenChecker()
     results = []
+    checked = checker.check_many(contracts_to_check)
     
     for contract_address in contracts_to_check:
-        metadata = checker.check_if_token(contract_address)
+        metadata = checked[contract_address]
         
         result = {
             "contract_address": contract_address,